@@ -0,0 +1,76 @@
+"""
+Per-organization cache generations.
+
+Cached data derived from an organization's rows is keyed by the
+organization's generation. Service writes bump the generation once their
+transaction commits, which invalidates every entry of that organization at
+once without enumerating keys. Generations live in the TENANT_CACHE cache.
+"""
+import time
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+GENERATION_KEY_PREFIX = 'tenant:generation:'
+
+
+def get_tenant_cache():
+    """Get the cache holding tenant-scoped entries and their generations."""
+    return caches[getattr(settings, 'TENANT_CACHE', 'default')]
+
+
+def _generation_key(organization_id) -> str:
+    return f'{GENERATION_KEY_PREFIX}{organization_id}'
+
+
+def get_generations(organization_ids) -> dict:
+    """
+    Get the current cache generation of organizations.
+
+    A generation that is not in the cache (never set, or evicted) is
+    started from the current time, so it never repeats an earlier value.
+
+    Args:
+        organization_ids: IDs of the organizations
+
+    Returns:
+        Dictionary mapping organization ID to generation
+    """
+    cache = get_tenant_cache()
+    keys = {_generation_key(organization_id): organization_id for organization_id in organization_ids}
+    found = cache.get_many(keys)
+    for key in keys.keys() - found.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        found[key] = cache.get(key)
+    return {keys[key]: generation for key, generation in found.items()}
+
+
+def invalidate_tenants(organization_ids):
+    """
+    Invalidate every cached entry of organizations now.
+
+    Args:
+        organization_ids: IDs of the organizations
+    """
+    cache = get_tenant_cache()
+    for organization_id in set(organization_ids):
+        key = _generation_key(organization_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_tenants_on_commit(organization_ids):
+    """
+    Invalidate organizations' cached entries once the current transaction commits.
+
+    Readers that run before the commit still see the old rows, so entries
+    they store stay under the old generation.
+
+    Args:
+        organization_ids: IDs of the organizations
+    """
+    transaction.on_commit(partial(invalidate_tenants, list(organization_ids)))
@@ -0,0 +1,74 @@
+"""
+Denormalized per-status counters.
+
+Projects count their tasks per status; organizations count their projects
+and tasks per status. Service writes adjust the counter columns with F()
+increments in the same transaction as the rows they count, and reads
+(statistics, progress bars) use the columns instead of counting rows.
+``manage.py recount`` repairs counters that drifted, e.g. after rows were
+written outside the services.
+"""
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import F, Q
+
+
+def counter_increments(fields: dict, deltas: dict) -> dict:
+    """
+    Build ``update()`` arguments that add deltas to per-status counter columns.
+
+    Args:
+        fields: Mapping of status to counter column
+        deltas: Mapping of status to the change of its count
+
+    Returns:
+        Dictionary of column to F() expression, for non-zero deltas of known statuses
+    """
+    return {
+        fields[status]: F(fields[status]) + delta
+        for status, delta in deltas.items()
+        if delta and status in fields
+    }
+
+
+def recount(queryset, scope_field: str, scope_ids, expected: dict) -> list:
+    """
+    Correct counter columns that differ from freshly computed counts.
+
+    The rows are locked before they are counted, so service writes wait
+    for the corrected values instead of having their increments
+    overwritten, and the counts include every write committed before.
+
+    Args:
+        queryset: Rows holding the counters
+        scope_field: Field ``scope_ids`` filter on
+        scope_ids: IDs to limit the recount to, or None for every row
+        expected: Mapping of counter column to the aggregate computing it
+
+    Returns:
+        List of the corrected instances
+    """
+    if scope_ids is not None:
+        queryset = queryset.filter(**{f'{scope_field}__in': scope_ids})
+    # NULL-safe: a column also differs when exactly one side is NULL
+    drifted = reduce(or_, (
+        (Q(**{f'{field}__isnull': True}) ^ Q(**{f'expected_{field}__isnull': True}))
+        | (Q(**{f'{field}__isnull': False}) & ~Q(**{field: F(f'expected_{field}')}))
+        for field in expected
+    ))
+    with transaction.atomic():
+        # A statement of its own, so the counting one below reads a
+        # snapshot taken after the locks are held
+        list(queryset.select_for_update().order_by('pk').values_list('pk', flat=True))
+        rows = list(
+            queryset.annotate(**{f'expected_{field}': count for field, count in expected.items()})
+            .filter(drifted)
+            .order_by()
+        )
+        for row in rows:
+            for field in expected:
+                setattr(row, field, getattr(row, f'expected_{field}'))
+        queryset.model.objects.bulk_update(rows, list(expected), batch_size=500)
+    return rows
@@ -0,0 +1,243 @@
+"""
+Publish/subscribe of change events.
+
+Services publish small JSON-serializable payloads on named channels once
+their transaction commits; subscribers (the GraphQL subscriptions) get
+them as async iterators. The broker class is chosen by the
+EVENT_BROKER setting: ``InProcessBroker`` delivers within one process,
+``PostgresBroker`` goes through Postgres LISTEN/NOTIFY so every process
+connected to the database sees every event.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+from collections import defaultdict
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    Async iterator over the events published on one channel.
+
+    Events are queued on the subscriber's event loop; when a slow
+    subscriber's queue is full the oldest event is dropped.
+    """
+
+    def __init__(self, broker, channel: str, max_queue_size: int):
+        self.broker = broker
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(max_queue_size)
+
+    def put(self, payload):
+        """Queue an event; safe to call from any thread."""
+        self.loop.call_soon_threadsafe(self._put, payload)
+
+    def _put(self, payload):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(payload)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.queue.get()
+
+    def close(self):
+        """Stop receiving events."""
+        self.broker.unsubscribe(self)
+
+    async def aclose(self):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+
+class InProcessBroker:
+    """Delivers events to subscribers in the current process."""
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, payload: dict):
+        """
+        Publish an event now.
+
+        Args:
+            channel: Channel name
+            payload: JSON-serializable event data
+        """
+        self.deliver(channel, payload)
+
+    def publish_many(self, channel: str, payloads: list):
+        """
+        Publish several events on one channel now.
+
+        Args:
+            channel: Channel name
+            payloads: JSON-serializable event data, in order
+        """
+        for payload in payloads:
+            self.publish(channel, payload)
+
+    def deliver(self, channel: str, payload: dict):
+        """Hand an event to this process's subscribers of a channel."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.put(payload)
+            except RuntimeError:
+                # The subscriber's event loop is gone
+                self.unsubscribe(subscription)
+
+    def subscribe(self, channel: str) -> Subscription:
+        """
+        Subscribe to a channel from the running event loop.
+
+        Args:
+            channel: Channel name
+
+        Returns:
+            Subscription, usable with ``async with`` and ``async for``
+        """
+        subscription = Subscription(self, channel, self.max_queue_size)
+        with self._lock:
+            self._subscriptions[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a subscription."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+
+class PostgresBroker(InProcessBroker):
+    """
+    Broker relaying events through Postgres LISTEN/NOTIFY.
+
+    Events are sent with ``pg_notify`` on the publisher's connection. The
+    first subscription in a process starts a thread that LISTENs on its
+    own connection and delivers notifications to local subscribers.
+    """
+
+    pg_channel = 'app_events'
+
+    def __init__(self, max_queue_size: int = 100, using: str = 'default'):
+        super().__init__(max_queue_size)
+        self.using = using
+        self._listener = None
+
+    def publish(self, channel: str, payload: dict):
+        message = json.dumps({'channel': channel, 'payload': payload}, cls=DjangoJSONEncoder)
+        with connections[self.using].cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.pg_channel, message])
+
+    def publish_many(self, channel: str, payloads: list):
+        messages = [
+            json.dumps({'channel': channel, 'payload': payload}, cls=DjangoJSONEncoder)
+            for payload in payloads
+        ]
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(
+                'SELECT pg_notify(%s, message) FROM unnest(%s::text[]) AS message',
+                [self.pg_channel, messages],
+            )
+
+    def subscribe(self, channel: str) -> Subscription:
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, name='event-broker-listener', daemon=True
+                )
+                self._listener.start()
+        return super().subscribe(channel)
+
+    def _listen(self):
+        """Deliver notifications forever, reconnecting after failures."""
+        while True:
+            try:
+                self._listen_once()
+            except Exception:
+                logger.exception("Event listener connection failed, reconnecting")
+                time.sleep(1)
+
+    def _listen_once(self):
+        wrapper = connections[self.using]
+        pg_connection = wrapper.Database.connect(**wrapper.get_connection_params())
+        try:
+            pg_connection.autocommit = True
+            with pg_connection.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.pg_channel}')
+            while True:
+                if select.select([pg_connection], [], [], 5) == ([], [], []):
+                    continue
+                pg_connection.poll()
+                while pg_connection.notifies:
+                    notify = pg_connection.notifies.pop(0)
+                    message = json.loads(notify.payload)
+                    self.deliver(message['channel'], message['payload'])
+        finally:
+            pg_connection.close()
+
+
+_broker = None
+
+
+def get_broker() -> InProcessBroker:
+    """Get the process-wide broker configured by the EVENT_BROKER setting."""
+    global _broker
+    if _broker is None:
+        broker_class = import_string(
+            getattr(settings, 'EVENT_BROKER', 'apps.core.events.InProcessBroker')
+        )
+        _broker = broker_class(max_queue_size=getattr(settings, 'EVENT_QUEUE_SIZE', 100))
+    return _broker
+
+
+def publish_on_commit(channel: str, payload: dict):
+    """
+    Publish an event once the current transaction commits.
+
+    Nothing is published if the transaction rolls back; outside a
+    transaction the event is published immediately.
+
+    Args:
+        channel: Channel name
+        payload: JSON-serializable event data
+    """
+    transaction.on_commit(partial(get_broker().publish, channel, payload))
+
+
+def publish_many_on_commit(channel: str, payloads: list):
+    """
+    Publish several events on one channel once the current transaction commits.
+
+    Args:
+        channel: Channel name
+        payloads: JSON-serializable event data, in order
+    """
+    if payloads:
+        transaction.on_commit(partial(get_broker().publish_many, channel, payloads))
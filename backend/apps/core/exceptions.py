@@ -11,3 +11,7 @@ class InvalidStatusTransitionError(Exception):
     """Raised when attempting an invalid status transition."""
     pass
 
+
+class ConcurrentUpdateError(Exception):
+    """Raised when a row changed since the version a client read."""
+    pass
@@ -15,3 +15,16 @@ class TimeStampedModel(models.Model):
     class Meta:
         abstract = True
 
+
+class VersionedModel(models.Model):
+    """
+    Abstract base class with a row version for optimistic concurrency.
+    
+    Every service update increments 'version'. Clients that send the
+    version they read get a conflict instead of overwriting a newer edit;
+    see ``apps.core.updates.save_changes``.
+    """
+    version = models.PositiveIntegerField(default=1, editable=False)
+
+    class Meta:
+        abstract = True
@@ -0,0 +1,103 @@
+"""
+Partial, optionally version-checked row updates.
+
+Update services apply the requested values to the instance they read,
+keep the names of the fields whose values actually changed, and write
+only those columns (plus updated_at and version) with one UPDATE. When the
+caller passes the version it read, the UPDATE also filters on it, so a
+concurrent edit makes it match no row and a ConcurrentUpdateError is
+raised instead of silently overwriting the other edit.
+"""
+from django.db.models import F
+from django.utils import timezone
+
+from .exceptions import ConcurrentUpdateError
+
+
+def apply_changes(instance, values: dict, exclude=()) -> list:
+    """
+    Set the given field values on an instance and report which changed.
+    
+    Args:
+        instance: Model instance to change
+        values: Mapping of field name to new value; names that are not
+            concrete fields of the model are ignored
+        exclude: Field names that may not be changed this way
+        
+    Returns:
+        List of the names of fields whose value differs from before
+    """
+    fields = {
+        name
+        for field in instance._meta.concrete_fields
+        if not field.primary_key and field.editable
+        for name in (field.name, field.attname)
+    }
+    changed = []
+    for field, value in values.items():
+        if field not in fields or field in exclude:
+            continue
+        if getattr(instance, field) != value:
+            setattr(instance, field, value)
+            changed.append(field)
+    return changed
+
+
+def check_version(instance, expected_version: int = None):
+    """
+    Raise ConcurrentUpdateError if the instance is not at the expected version.
+    
+    Args:
+        instance: Model instance that was read
+        expected_version: Version the client read, or None to skip the check
+        
+    Raises:
+        ConcurrentUpdateError: If the versions differ
+    """
+    if expected_version is not None and instance.version != expected_version:
+        raise ConcurrentUpdateError(
+            f"{instance._meta.verbose_name.capitalize()} {instance.pk} was changed by someone else "
+            f"(version {instance.version}, expected {expected_version})"
+        )
+
+
+def save_changes(instance, fields: list, expected_version: int = None) -> bool:
+    """
+    Write the changed fields of an instance with one narrow UPDATE.
+    
+    Callers either hold a row lock (no expected version) or pass the
+    version they read, which the UPDATE requires the row to still have.
+    Nothing is written when no field changed.
+    
+    Args:
+        instance: Model instance with the new values set
+        fields: Names of the changed fields, from ``apply_changes``
+        expected_version: Version the row must have, or None
+        
+    Returns:
+        True if a row was written
+        
+    Raises:
+        ConcurrentUpdateError: If the row no longer has the expected version
+    """
+    check_version(instance, expected_version)
+    if not fields:
+        return False
+    
+    now = timezone.now()
+    queryset = type(instance)._default_manager.filter(pk=instance.pk)
+    if expected_version is not None:
+        queryset = queryset.filter(version=expected_version)
+    updated = queryset.update(
+        updated_at=now,
+        version=F('version') + 1,
+        **{field: getattr(instance, field) for field in fields}
+    )
+    if not updated:
+        raise ConcurrentUpdateError(
+            f"{instance._meta.verbose_name.capitalize()} {instance.pk} was changed by someone else "
+            f"(expected version {expected_version})"
+        )
+    instance.updated_at = now
+    instance.version += 1
+    return True
@@ -0,0 +1,74 @@
+"""
+Create organizations in bulk from a CSV or NDJSON file.
+"""
+import csv
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.organizations.services import OrganizationService
+
+FIELDS = ('name', 'contact_email', 'slug')
+
+
+class Command(BaseCommand):
+    help = (
+        "Create organizations from a CSV file with a header row, or an NDJSON file with one "
+        "object per line. Columns/keys: name, contact_email and optionally slug. Taken slugs "
+        "get a numeric suffix; invalid records are reported and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to read, or - for standard input")
+        parser.add_argument(
+            '--format',
+            choices=['csv', 'ndjson'],
+            help="File format, by default guessed from the file extension (.csv or .ndjson/.jsonl)",
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help="Rows per INSERT, defaults to the ORGANIZATION_BULK_CREATE_BATCH_SIZE setting",
+        )
+
+    def handle(self, *args, path, format=None, batch_size=None, **options):
+        if format is None:
+            if path.endswith('.csv'):
+                format = 'csv'
+            elif path.endswith(('.ndjson', '.jsonl')):
+                format = 'ndjson'
+            else:
+                raise CommandError("Cannot tell the file format from its name, pass --format")
+
+        try:
+            if path == '-':
+                records = self._read(sys.stdin, format)
+            else:
+                with open(path, newline='', encoding='utf-8') as stream:
+                    records = self._read(stream, format)
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+
+        created, errors = OrganizationService.bulk_create_organizations(records, batch_size=batch_size)
+        for error in errors:
+            self.stderr.write(f"Record {error['index'] + 1}: {error['message']}")
+        self.stdout.write(f"Created {len(created)} of {len(records)} organizations")
+
+    def _read(self, stream, format) -> list:
+        """Read organization records as dicts of the known fields."""
+        if format == 'csv':
+            rows = csv.DictReader(stream)
+        else:
+            rows = []
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    raise CommandError(f"Line {line_number} is not valid JSON: {e}")
+                if not isinstance(row, dict):
+                    raise CommandError(f"Line {line_number} is not a JSON object")
+                rows.append(row)
+        return [{field: row.get(field) for field in FIELDS} for row in rows]
@@ -0,0 +1,33 @@
+"""
+Repair denormalized project and task counters.
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.organizations.services import OrganizationService
+from apps.projects.services import ProjectService
+
+
+class Command(BaseCommand):
+    help = "Recompute project and organization counters from the rows and fix the ones that drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            action='append',
+            type=int,
+            dest='organizations',
+            help="Only recount this organization (repeatable)",
+        )
+
+    def handle(self, *args, organizations=None, **options):
+        with transaction.atomic():
+            projects = ProjectService.recount_task_counts(organizations)
+            fixed = OrganizationService.recount_counters(organizations)
+            changed = {project.organization_id for project in projects}
+            changed.update(organization.id for organization in fixed)
+            if changed:
+                OrganizationService.bump_data_version(*changed)
+        self.stdout.write(
+            f"Fixed counters of {len(projects)} projects and {len(fixed)} organizations"
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 5.2 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='organization',
+            index=models.Index(fields=['created_at', 'id'], name='organizatio_created_b37cfd_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 06:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_organization_organizatio_created_b37cfd_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='data_version',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+    ]
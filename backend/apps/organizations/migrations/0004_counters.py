@@ -0,0 +1,72 @@
+# Generated by Django 5.2 on 2026-10-18 06:27
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+from apps.core.counters import recount
+
+PROJECT_STATUSES = ('ACTIVE', 'COMPLETED', 'ON_HOLD')
+TASK_STATUSES = ('TODO', 'IN_PROGRESS', 'DONE')
+
+
+def backfill_counters(apps, schema_editor):
+    Organization = apps.get_model('organizations', 'Organization')
+    Project = apps.get_model('projects', 'Project')
+    recount(Project.objects.all(), 'organization_id', None, {
+        f'{status.lower()}_task_count': Count('tasks', filter=Q(tasks__status=status))
+        for status in TASK_STATUSES
+    })
+    expected = {
+        f'{status.lower()}_project_count':
+            Count('projects', distinct=True, filter=Q(projects__status=status))
+        for status in PROJECT_STATUSES
+    }
+    expected.update({
+        f'{status.lower()}_task_count':
+            Count('projects__tasks', filter=Q(projects__tasks__status=status))
+        for status in TASK_STATUSES
+    })
+    recount(Organization.objects.all(), 'id', None, expected)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0003_organization_data_version'),
+        ('projects', '0003_task_counts'),
+        ('tasks', '0003_task_tasks_created_ad5b72_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='active_project_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='completed_project_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='done_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='in_progress_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='on_hold_project_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='todo_task_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 06:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
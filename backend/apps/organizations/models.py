@@ -2,19 +2,56 @@
 Organization domain models.
 """
 from django.db import models
-from apps.core.models import TimeStampedModel
+from apps.core.models import TimeStampedModel, VersionedModel
 
 
-class Organization(TimeStampedModel):
+class Organization(TimeStampedModel, VersionedModel):
     """Organization model for multi-tenancy."""
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
     contact_email = models.EmailField()
+    # Bumped by every service write to the organization's data; see
+    # OrganizationService.bump_data_version
+    data_version = models.BigIntegerField(default=0, editable=False)
+    # Projects and tasks per status, kept up to date by the project and
+    # task services; see the recount command
+    active_project_count = models.IntegerField(default=0, editable=False)
+    completed_project_count = models.IntegerField(default=0, editable=False)
+    on_hold_project_count = models.IntegerField(default=0, editable=False)
+    todo_task_count = models.IntegerField(default=0, editable=False)
+    in_progress_task_count = models.IntegerField(default=0, editable=False)
+    done_task_count = models.IntegerField(default=0, editable=False)
+
+    # Project status -> counter column
+    PROJECT_COUNT_FIELDS = {
+        'ACTIVE': 'active_project_count',
+        'COMPLETED': 'completed_project_count',
+        'ON_HOLD': 'on_hold_project_count',
+    }
+    # Task status -> counter column
+    TASK_COUNT_FIELDS = {
+        'TODO': 'todo_task_count',
+        'IN_PROGRESS': 'in_progress_task_count',
+        'DONE': 'done_task_count',
+    }
 
     class Meta:
         db_table = 'organizations'
         ordering = ['name']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     def __str__(self):
         return self.name
 
+    @property
+    def project_count(self) -> int:
+        """Total number of projects, from the counters."""
+        return self.active_project_count + self.completed_project_count + self.on_hold_project_count
+
+    @property
+    def task_count(self) -> int:
+        """Total number of tasks, from the counters."""
+        return self.todo_task_count + self.in_progress_task_count + self.done_task_count
+
@@ -1,14 +1,60 @@
 """
 Business logic for organization operations.
 """
-from django.db import transaction
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
 from django.utils.text import slugify
+from apps.core.cache import invalidate_tenants_on_commit
+from apps.core.counters import recount
+from apps.core.updates import apply_changes, save_changes
 from .models import Organization
 
 
 class OrganizationService:
     """Service class for organization-related business logic."""
     
+    # Attempts at inserting with freshly reserved slugs before giving up
+    # when concurrent creates keep taking them
+    SLUG_RESERVATION_ATTEMPTS = 3
+    
+    @staticmethod
+    def reserve_slugs(base_slugs: list) -> list:
+        """
+        Allocate unique slugs, suffixing taken ones with -1, -2, ...
+        
+        The taken slugs are read with one prefix query per distinct base
+        slug. Every candidate is checked against the stored slugs and those
+        already reserved by this call, so the result holds no duplicates
+        even where one base slug is another's suffixed form. A concurrent
+        create can still take a reserved slug before it is inserted;
+        callers retry on IntegrityError.
+        
+        Args:
+            base_slugs: Wanted slugs, in order
+            
+        Returns:
+            List of free slugs, in the order of ``base_slugs``
+        """
+        read = set()
+        reserved = set()
+        slugs = []
+        for base_slug in base_slugs:
+            if base_slug not in read:
+                read.add(base_slug)
+                reserved.update(
+                    Organization.objects.filter(slug__startswith=base_slug).values_list('slug', flat=True)
+                )
+            slug = base_slug
+            counter = 1
+            while slug in reserved:
+                slug = f"{base_slug}-{counter}"
+                counter += 1
+            reserved.add(slug)
+            slugs.append(slug)
+        return slugs
+    
     @staticmethod
     def create_organization(name: str, contact_email: str, slug: str = None) -> Organization:
         """
@@ -17,82 +63,264 @@ class OrganizationService:
         Args:
             name: Organization name
             contact_email: Contact email for the organization
-            slug: Optional custom slug, auto-generated if not provided
+            slug: Optional custom slug, auto-generated if not provided; a
+                taken slug is made unique with a numeric suffix
             
         Returns:
             Created Organization instance
+            
+        Raises:
+            IntegrityError: If concurrent creates took every reserved slug
         """
-        if not slug:
-            slug = slugify(name)
+        base_slug = slug or slugify(name)
+        for attempt in range(OrganizationService.SLUG_RESERVATION_ATTEMPTS):
+            slug, = OrganizationService.reserve_slugs([base_slug])
+            try:
+                with transaction.atomic():
+                    return Organization.objects.create(
+                        name=name,
+                        slug=slug,
+                        contact_email=contact_email
+                    )
+            except IntegrityError:
+                if attempt == OrganizationService.SLUG_RESERVATION_ATTEMPTS - 1:
+                    raise
+    
+    @staticmethod
+    def bulk_create_organizations(organizations: list, batch_size: int = None) -> tuple:
+        """
+        Create many organizations at once, e.g. when onboarding tenants.
         
-        # Ensure slug is unique
-        base_slug = slug
-        counter = 1
-        while Organization.objects.filter(slug=slug).exists():
-            slug = f"{base_slug}-{counter}"
-            counter += 1
+        Each item is validated against the model; invalid ones are reported
+        by their position in ``organizations``. Slugs of the valid items
+        are reserved with ``reserve_slugs`` and the rows inserted with
+        ``bulk_create`` in one transaction. If a concurrent create takes a
+        reserved slug, the insert is rolled back and retried with new
+        reservations.
         
-        organization = Organization.objects.create(
-            name=name,
-            slug=slug,
-            contact_email=contact_email
-        )
-        return organization
+        Args:
+            organizations: Dicts of organization fields (name,
+                contact_email, optional slug)
+            batch_size: Rows per INSERT, defaults to the
+                ORGANIZATION_BULK_CREATE_BATCH_SIZE setting
+            
+        Returns:
+            Tuple of (created Organization instances in input order,
+            list of {'index', 'message'} dicts for rejected items)
+            
+        Raises:
+            IntegrityError: If concurrent creates took reserved slugs on
+                every attempt
+        """
+        new_organizations = []
+        errors = []
+        for index, data in enumerate(organizations):
+            name = data.get('name') or ""
+            organization = Organization(
+                name=name,
+                slug=data.get('slug') or slugify(name),
+                contact_email=data.get('contact_email') or ""
+            )
+            try:
+                organization.full_clean(validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                errors.append({
+                    'index': index,
+                    'message': "; ".join(
+                        f"{field}: {' '.join(messages)}"
+                        for field, messages in e.message_dict.items()
+                    ),
+                })
+                continue
+            new_organizations.append(organization)
+        
+        if batch_size is None:
+            batch_size = getattr(settings, 'ORGANIZATION_BULK_CREATE_BATCH_SIZE', 1000)
+        base_slugs = [organization.slug for organization in new_organizations]
+        for attempt in range(OrganizationService.SLUG_RESERVATION_ATTEMPTS):
+            slugs = OrganizationService.reserve_slugs(base_slugs)
+            for organization, slug in zip(new_organizations, slugs):
+                organization.slug = slug
+            try:
+                with transaction.atomic():
+                    created = Organization.objects.bulk_create(new_organizations, batch_size=batch_size)
+                return created, errors
+            except IntegrityError:
+                if attempt == OrganizationService.SLUG_RESERVATION_ATTEMPTS - 1:
+                    raise
+                for organization in new_organizations:
+                    organization.pk = None
     
     @staticmethod
-    def update_organization(organization_id: int, **kwargs) -> Organization:
+    def update_organization(organization_id: int, expected_version: int = None, **kwargs) -> Organization:
         """
-        Update an organization.
+        Update an organization, writing only the fields that changed.
+        
+        If no field changes, nothing is written and the data version stays.
         
         Args:
             organization_id: ID of the organization
+            expected_version: Optional version the caller read; the update
+                fails instead of overwriting a newer edit
             **kwargs: Fields to update
             
         Returns:
             Updated Organization instance
+            
+        Raises:
+            ConcurrentUpdateError: If the organization is not at expected_version
         """
-        organization = Organization.objects.get(id=organization_id)
+        with transaction.atomic():
+            queryset = Organization.objects.all()
+            if expected_version is None:
+                queryset = queryset.select_for_update()
+            organization = queryset.get(id=organization_id)
+            
+            changed = apply_changes(organization, kwargs)
+            if not save_changes(organization, changed, expected_version):
+                return organization
+            OrganizationService.bump_data_version(organization.id)
+        return organization
+    
+    @staticmethod
+    def bump_data_version(*organization_ids: int, **increments):
+        """
+        Mark organizations' data as changed.
         
-        for field, value in kwargs.items():
-            if hasattr(organization, field):
-                setattr(organization, field, value)
+        Every service write calls this after its own statements, so the new
+        version commits together with the data it describes. Conditional
+        GraphQL responses are keyed on these versions, and cached results
+        of the organizations are invalidated once the write commits.
         
-        organization.save()
-        return organization
+        Args:
+            *organization_ids: IDs of the organizations whose data changed
+            **increments: Further column updates made by the same UPDATE,
+                such as counter increments from ``counter_increments``
+        """
+        Organization.objects.filter(id__in=set(organization_ids)).update(
+            data_version=F('data_version') + 1, **increments
+        )
+        invalidate_tenants_on_commit(organization_ids)
+    
+    @staticmethod
+    def counter_stats(organization: Organization) -> dict:
+        """
+        Get statistics of an organization from the counters of an instance.
+        
+        Args:
+            organization: Organization with its counter fields loaded
+            
+        Returns:
+            Dictionary with organization statistics
+        """
+        return {
+            'organization_id': organization.id,
+            'total_projects': organization.project_count,
+            'active_projects': organization.active_project_count,
+            'completed_projects': organization.completed_project_count,
+            'total_tasks': organization.task_count,
+            'completed_tasks': organization.done_task_count,
+        }
+    
+    @staticmethod
+    def _counter_queryset():
+        return Organization.objects.only(
+            'id',
+            *Organization.PROJECT_COUNT_FIELDS.values(),
+            *Organization.TASK_COUNT_FIELDS.values(),
+        )
     
     @staticmethod
     def get_organization_stats(organization_id: int) -> dict:
         """
-        Get statistics for an organization.
+        Get statistics for an organization from its counter columns.
         
         Args:
             organization_id: ID of the organization
             
         Returns:
             Dictionary with organization statistics
+            
+        Raises:
+            Organization.DoesNotExist: If the organization does not exist
         """
-        from apps.projects.models import Project
-        from apps.tasks.models import Task
-        
-        organization = Organization.objects.get(id=organization_id)
-        projects = Project.objects.filter(organization=organization)
+        organization = OrganizationService._counter_queryset().get(id=organization_id)
+        return OrganizationService.counter_stats(organization)
+    
+    @staticmethod
+    async def aget_organization_stats(organization_id: int) -> dict:
+        """
+        Get statistics for an organization using the async ORM.
         
-        total_projects = projects.count()
-        active_projects = projects.filter(status='ACTIVE').count()
-        completed_projects = projects.filter(status='COMPLETED').count()
+        Args:
+            organization_id: ID of the organization
+            
+        Returns:
+            Dictionary with organization statistics
+            
+        Raises:
+            Organization.DoesNotExist: If the organization does not exist
+        """
+        organization = await OrganizationService._counter_queryset().aget(id=organization_id)
+        return OrganizationService.counter_stats(organization)
+    
+    @staticmethod
+    def get_stats_for_organizations(organization_ids) -> dict:
+        """
+        Get statistics for many organizations with a single query.
         
-        # Get all tasks for this organization's projects
-        total_tasks = Task.objects.filter(project__organization=organization).count()
-        completed_tasks = Task.objects.filter(
-            project__organization=organization,
-            status='DONE'
-        ).count()
+        Args:
+            organization_ids: IDs of the organizations
+            
+        Returns:
+            Dictionary mapping organization ID to its statistics; IDs of
+            organizations that do not exist are left out
+        """
+        organizations = OrganizationService._counter_queryset().filter(id__in=organization_ids)
+        return {
+            organization.id: OrganizationService.counter_stats(organization)
+            for organization in organizations
+        }
+    
+    @staticmethod
+    async def aget_stats_for_organizations(organization_ids) -> dict:
+        """
+        Get statistics for many organizations using the async ORM.
         
+        Args:
+            organization_ids: IDs of the organizations
+            
+        Returns:
+            Dictionary mapping organization ID to its statistics; IDs of
+            organizations that do not exist are left out
+        """
+        organizations = OrganizationService._counter_queryset().filter(id__in=organization_ids)
         return {
-            'total_projects': total_projects,
-            'active_projects': active_projects,
-            'completed_projects': completed_projects,
-            'total_tasks': total_tasks,
-            'completed_tasks': completed_tasks,
+            organization.id: OrganizationService.counter_stats(organization)
+            async for organization in organizations
         }
-
+    
+    @staticmethod
+    def recount_counters(organization_ids=None) -> list:
+        """
+        Recompute organizations' project and task counters from the rows.
+        
+        Every figure comes from one grouped query of filtered counts; only
+        organizations whose counters drifted are written.
+        
+        Args:
+            organization_ids: IDs of the organizations, or None for all
+            
+        Returns:
+            List of the organizations whose counters were corrected
+        """
+        expected = {
+            field: Count('projects', distinct=True, filter=Q(projects__status=status))
+            for status, field in Organization.PROJECT_COUNT_FIELDS.items()
+        }
+        # Projects repeat once per task in the join, tasks appear once
+        expected.update({
+            field: Count('projects__tasks', filter=Q(projects__tasks__status=status))
+            for status, field in Organization.TASK_COUNT_FIELDS.items()
+        })
+        return recount(Organization.objects.all(), 'id', organization_ids, expected)
@@ -80,4 +80,177 @@ class TestOrganizationService:
         assert 'completed_projects' in stats
         assert 'total_tasks' in stats
         assert 'completed_tasks' in stats
+    
+    def test_stats_use_one_query(self, django_assert_num_queries):
+        """Test every figure is read from the counters in a single query, per organization or for many."""
+        from apps.projects.services import ProjectService
+        from apps.tasks.services import TaskService
+        
+        org = Organization.objects.create(name="Org 1", slug="org-1", contact_email="a@example.com")
+        other = Organization.objects.create(name="Org 2", slug="org-2", contact_email="b@example.com")
+        active = ProjectService.create_project(org.id, "Active")
+        ProjectService.create_project(org.id, "Done", status='COMPLETED')
+        TaskService.create_task(active.id, "Task 1", status='DONE')
+        TaskService.create_task(active.id, "Task 2")
+        expected = {
+            'organization_id': org.id,
+            'total_projects': 2,
+            'active_projects': 1,
+            'completed_projects': 1,
+            'total_tasks': 2,
+            'completed_tasks': 1,
+        }
+        
+        with django_assert_num_queries(1):
+            assert OrganizationService.get_organization_stats(org.id) == expected
+        with django_assert_num_queries(1):
+            stats = OrganizationService.get_stats_for_organizations([org.id, other.id, 0])
+        assert stats == {
+            org.id: expected,
+            other.id: {
+                'organization_id': other.id,
+                'total_projects': 0,
+                'active_projects': 0,
+                'completed_projects': 0,
+                'total_tasks': 0,
+                'completed_tasks': 0,
+            },
+        }
+        with pytest.raises(Organization.DoesNotExist):
+            OrganizationService.get_organization_stats(0)
+    
+    def test_writes_bump_data_version(self):
+        """Test every service write bumps only its organization's data version."""
+        from apps.projects.services import ProjectService
+        from apps.tasks.services import TaskService, TaskCommentService
+        
+        org = OrganizationService.create_organization(
+            name="Test Org",
+            contact_email="test@example.com"
+        )
+        other = OrganizationService.create_organization(
+            name="Other Org",
+            contact_email="other@example.com"
+        )
+        
+        def version():
+            org.refresh_from_db()
+            return org.data_version
+        
+        writes = [
+            lambda: OrganizationService.update_organization(org.id, name="Renamed"),
+            lambda: ProjectService.create_project(org.id, "Project"),
+            lambda: ProjectService.update_project(org.projects.get().id, name="Renamed"),
+            lambda: TaskService.create_task(org.projects.get().id, "Task"),
+            lambda: TaskService.bulk_create_tasks(org.projects.get().id, [{'title': "Bulk"}]),
+            lambda: TaskService.update_task(org.projects.get().tasks.first().id, status='DONE'),
+            lambda: TaskService.bulk_transition_tasks(
+                list(org.projects.get().tasks.values_list('id', flat=True)), 'IN_PROGRESS', org.id
+            ),
+            lambda: TaskCommentService.add_comment(org.projects.get().tasks.first().id, "Hi", "a@example.com"),
+            lambda: TaskCommentService.update_comment(
+                org.projects.get().tasks.first().comments.get().id, "Edited"
+            ),
+            lambda: TaskCommentService.delete_comment(org.projects.get().tasks.first().comments.get().id),
+            lambda: TaskService.delete_task(org.projects.get().tasks.first().id),
+            lambda: ProjectService.delete_project(org.projects.get().id),
+        ]
+        for expected, write in enumerate(writes, start=1):
+            write()
+            assert version() == expected
+        
+        other.refresh_from_db()
+        assert other.data_version == 0
 
+
+@pytest.mark.django_db
+class TestBulkOnboarding:
+    """Test slug reservation and bulk organization creation."""
+    
+    def test_reserve_slugs_one_query_per_base(self, django_assert_num_queries):
+        """Test taken and repeated slugs get suffixes from one prefix query per base slug."""
+        Organization.objects.create(name="Acme", slug="acme", contact_email="a@example.com")
+        Organization.objects.create(name="Acme 1", slug="acme-1", contact_email="a@example.com")
+        Organization.objects.create(name="Acme Corp", slug="acme-corp", contact_email="a@example.com")
+        
+        with django_assert_num_queries(2):
+            slugs = OrganizationService.reserve_slugs(["acme", "beta", "acme", "beta"])
+        
+        assert slugs == ["acme-2", "beta", "acme-3", "beta-1"]
+    
+    def test_reserve_slugs_checks_other_bases(self):
+        """Test a suffix reserved for one base slug is not handed out again for another."""
+        Organization.objects.create(name="Acme", slug="acme", contact_email="a@example.com")
+    
+        assert OrganizationService.reserve_slugs(["acme", "acme-1"]) == ["acme-1", "acme-1-1"]
+    
+        created, errors = OrganizationService.bulk_create_organizations([
+            {'name': "Acme", 'contact_email': "b@example.com"},
+            {'name': "Acme", 'contact_email': "c@example.com", 'slug': "acme-1"},
+        ])
+        assert errors == []
+        assert [organization.slug for organization in created] == ["acme-1", "acme-1-1"]
+    
+    def test_bulk_create_organizations(self, django_assert_max_num_queries):
+        """Test valid items are inserted together and invalid ones reported by position."""
+        Organization.objects.create(name="Acme", slug="acme", contact_email="a@example.com")
+        items = [
+            {'name': "Acme", 'contact_email': "b@example.com"},
+            {'name': "", 'contact_email': "c@example.com"},
+            {'name': "Beta", 'contact_email': "not-an-email"},
+            {'name': "Gamma", 'contact_email': "g@example.com", 'slug': "acme"},
+        ] + [{'name': f"Tenant {index}", 'contact_email': "t@example.com"} for index in range(50)]
+        
+        with django_assert_max_num_queries(58):
+            created, errors = OrganizationService.bulk_create_organizations(items, batch_size=20)
+        
+        assert [error['index'] for error in errors] == [1, 2]
+        assert "name" in errors[0]['message']
+        assert "contact_email" in errors[1]['message']
+        assert [organization.slug for organization in created[:2]] == ["acme-1", "acme-2"]
+        assert all(organization.pk for organization in created)
+        assert Organization.objects.count() == 53
+    
+    def test_retries_when_a_slug_is_taken_concurrently(self, monkeypatch):
+        """Test a slug taken between reservation and insert is replaced on retry."""
+        reserve = OrganizationService.reserve_slugs
+        calls = []
+        
+        def racing_reserve(base_slugs):
+            slugs = reserve(base_slugs)
+            if not calls:
+                # Another request creates the first reserved slug meanwhile
+                Organization.objects.create(name="Racer", slug=slugs[0], contact_email="r@example.com")
+            calls.append(slugs)
+            return slugs
+        
+        monkeypatch.setattr(OrganizationService, 'reserve_slugs', staticmethod(racing_reserve))
+        created, errors = OrganizationService.bulk_create_organizations(
+            [{'name': "Acme", 'contact_email': "a@example.com"}]
+        )
+        
+        assert calls == [["acme"], ["acme-1"]]
+        assert created[0].slug == "acme-1"
+        assert not errors
+    
+    def test_onboard_command(self, tmp_path):
+        """Test the command reads CSV and NDJSON files and reports rejected records."""
+        from io import StringIO
+        from django.core.management import call_command
+        
+        csv_file = tmp_path / "tenants.csv"
+        csv_file.write_text("name,contact_email,slug\nAcme,a@example.com,\nBeta,b@example.com,beta-co\n")
+        ndjson_file = tmp_path / "tenants.ndjson"
+        ndjson_file.write_text(
+            '{"name": "Acme", "contact_email": "a2@example.com"}\n\n{"name": "Bad", "contact_email": "x"}\n'
+        )
+        
+        out, err = StringIO(), StringIO()
+        call_command('onboard_organizations', str(csv_file), stdout=out, stderr=err)
+        call_command('onboard_organizations', str(ndjson_file), stdout=out, stderr=err)
+        
+        assert out.getvalue().splitlines() == [
+            "Created 2 of 2 organizations", "Created 1 of 2 organizations"
+        ]
+        assert err.getvalue().startswith("Record 2: contact_email:")
+        assert sorted(Organization.objects.values_list('slug', flat=True)) == ["acme", "acme-1", "beta-co"]
@@ -0,0 +1,17 @@
+"""
+Record today's burndown snapshots of the projects that changed.
+"""
+from django.core.management.base import BaseCommand
+
+from apps.projects.services import ProjectService
+
+
+class Command(BaseCommand):
+    help = (
+        "Snapshot the task counts of projects changed since the previous run. "
+        "Run it periodically (e.g. hourly); the last run of a day gives that day's counts."
+    )
+
+    def handle(self, *args, **options):
+        projects = ProjectService.rollup_snapshots()
+        self.stdout.write(f"Rolled up {projects} projects")
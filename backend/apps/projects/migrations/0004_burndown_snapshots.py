@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-18 06:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_counters'),
+        ('projects', '0003_task_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BurndownSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.IntegerField()),
+                ('recorded_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'burndown_snapshots',
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['updated_at'], name='projects_updated_ff62bb_idx'),
+        ),
+        migrations.AddField(
+            model_name='burndownsnapshot',
+            name='project',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='projects.project'),
+        ),
+        migrations.AddIndex(
+            model_name='burndownsnapshot',
+            index=models.Index(fields=['recorded_at'], name='burndown_sn_recorde_2b8dee_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='burndownsnapshot',
+            constraint=models.UniqueConstraint(fields=('project', 'date', 'status'), name='burndown_snapshot_unique_day'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0004_counters'),
+        ('projects', '0004_burndown_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='next_due_date',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['organization', 'next_due_date'], name='projects_organiz_2a375f_idx'),
+        ),
+    ]
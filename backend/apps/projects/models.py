@@ -2,11 +2,11 @@
 Project domain models.
 """
 from django.db import models
-from apps.core.models import TimeStampedModel
+from apps.core.models import TimeStampedModel, VersionedModel
 from apps.organizations.models import Organization
 
 
-class Project(TimeStampedModel):
+class Project(TimeStampedModel, VersionedModel):
     """Project model - organization dependent."""
     
     STATUS_CHOICES = [
@@ -28,14 +28,71 @@ class Project(TimeStampedModel):
         default='ACTIVE'
     )
     due_date = models.DateField(null=True, blank=True)
+    # Tasks per status, kept up to date by the task services; see
+    # ProjectService.adjust_task_counts and the recount command
+    todo_task_count = models.IntegerField(default=0, editable=False)
+    in_progress_task_count = models.IntegerField(default=0, editable=False)
+    done_task_count = models.IntegerField(default=0, editable=False)
+    # Earliest due date of the open (not DONE) tasks, maintained with the
+    # counters; None when no open task has a due date
+    next_due_date = models.DateTimeField(null=True, blank=True, editable=False)
+
+    # Task status -> counter column
+    TASK_COUNT_FIELDS = {
+        'TODO': 'todo_task_count',
+        'IN_PROGRESS': 'in_progress_task_count',
+        'DONE': 'done_task_count',
+    }
 
     class Meta:
         db_table = 'projects'
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['organization', 'status']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['organization', 'created_at', 'id']),
+            models.Index(fields=['updated_at']),
+            models.Index(fields=['organization', 'next_due_date']),
         ]
 
     def __str__(self):
         return f"{self.name} ({self.organization.name})"
 
+    @property
+    def task_count(self) -> int:
+        """Total number of tasks, from the counters."""
+        return self.todo_task_count + self.in_progress_task_count + self.done_task_count
+
+
+class BurndownSnapshot(models.Model):
+    """
+    Number of a project's tasks in one status at the end of a day.
+    
+    Written by ProjectService.rollup_snapshots for the projects that changed
+    since its previous run; days without a row repeat the previous one.
+    """
+    
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='snapshots'
+    )
+    date = models.DateField()
+    status = models.CharField(max_length=20)
+    count = models.IntegerField()
+    recorded_at = models.DateTimeField()
+    
+    class Meta:
+        db_table = 'burndown_snapshots'
+        ordering = ['date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'date', 'status'], name='burndown_snapshot_unique_day'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['recorded_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.project_id} {self.date} {self.status}: {self.count}"
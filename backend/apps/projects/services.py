@@ -1,16 +1,28 @@
 """
 Business logic for project operations.
 """
-from datetime import date
-from django.db.models import Count, Q
+from datetime import date, timedelta
+from django.db import transaction
+from django.db.models import Count, DateTimeField, F, Max, Min, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce, Least
+from django.utils import timezone
+from apps.core.counters import counter_increments, recount
 from apps.core.exceptions import OrganizationMismatchError
-from .models import Project
+from apps.core.updates import apply_changes, save_changes
+from .models import BurndownSnapshot, Project
 from apps.organizations.models import Organization
+from apps.organizations.services import OrganizationService
 
 
 class ProjectService:
     """Service class for project-related business logic."""
     
+    # Longest burndown returned, in days
+    BURNDOWN_MAX_DAYS = 366
+    # Rollups re-read projects updated this long before the previous rollup
+    ROLLUP_OVERLAP = timedelta(minutes=5)
+    ROLLUP_BATCH_SIZE = 1000
+    
     @staticmethod
     def create_project(
         organization_id: int,
@@ -34,23 +46,40 @@ class ProjectService:
         """
         organization = Organization.objects.get(id=organization_id)
         
-        project = Project.objects.create(
-            organization=organization,
-            name=name,
-            description=description,
-            status=status,
-            due_date=due_date
-        )
+        with transaction.atomic():
+            project = Project.objects.create(
+                organization=organization,
+                name=name,
+                description=description,
+                status=status,
+                due_date=due_date
+            )
+            OrganizationService.bump_data_version(
+                organization.id,
+                **counter_increments(Organization.PROJECT_COUNT_FIELDS, {status: 1})
+            )
         return project
     
     @staticmethod
-    def update_project(project_id: int, organization_id: int = None, **kwargs) -> Project:
+    def update_project(
+        project_id: int,
+        organization_id: int = None,
+        expected_version: int = None,
+        **kwargs
+    ) -> Project:
         """
-        Update a project.
+        Update a project, writing only the fields that changed.
+        
+        If no field changes, nothing is written and the data version stays.
+        Without an expected version the row is locked while it is read,
+        so the status counters move from the right status. With one, the
+        row is not locked; the UPDATE matches only the version that was
+        read, and a concurrent edit surfaces as a conflict.
         
         Args:
             project_id: ID of the project
             organization_id: Optional organization ID for validation
+            expected_version: Optional version the caller read
             **kwargs: Fields to update
             
         Returns:
@@ -58,20 +87,31 @@ class ProjectService:
             
         Raises:
             OrganizationMismatchError: If project doesn't belong to organization
+            ConcurrentUpdateError: If the project is not at expected_version
         """
-        project = Project.objects.select_related('organization').get(id=project_id)
-        
-        # Validate organization ownership if provided
-        if organization_id and project.organization_id != organization_id:
-            raise OrganizationMismatchError(
-                f"Project {project_id} does not belong to organization {organization_id}"
+        with transaction.atomic():
+            queryset = Project.objects.select_related('organization')
+            if expected_version is None:
+                queryset = queryset.select_for_update(of=('self',))
+            project = queryset.get(id=project_id)
+            
+            # Validate organization ownership if provided
+            if organization_id and project.organization_id != organization_id:
+                raise OrganizationMismatchError(
+                    f"Project {project_id} does not belong to organization {organization_id}"
+                )
+            
+            previous_status = project.status
+            changed = apply_changes(project, kwargs, exclude=('organization', 'organization_id'))
+            if not save_changes(project, changed, expected_version):
+                return project
+            deltas = {}
+            if project.status != previous_status:
+                deltas = {previous_status: -1, project.status: 1}
+            OrganizationService.bump_data_version(
+                project.organization_id,
+                **counter_increments(Organization.PROJECT_COUNT_FIELDS, deltas)
             )
-        
-        for field, value in kwargs.items():
-            if hasattr(project, field) and field != 'organization':
-                setattr(project, field, value)
-        
-        project.save()
         return project
     
     @staticmethod
@@ -98,37 +138,189 @@ class ProjectService:
         
         return queryset
     
+    @staticmethod
+    async def aget_projects_by_organization(
+        organization_id: int,
+        status: str = None
+    ) -> list:
+        """
+        Get all projects for an organization using the async ORM.
+        
+        Args:
+            organization_id: ID of the organization
+            status: Optional status filter
+            
+        Returns:
+            List of projects
+        """
+        queryset = ProjectService.get_projects_by_organization(organization_id, status)
+        return [project async for project in queryset]
+    
+    @staticmethod
+    def counter_stats(project: Project) -> dict:
+        """
+        Get statistics of a project from the counters of an instance.
+        
+        Args:
+            project: Project with its counter fields loaded
+            
+        Returns:
+            Dictionary with project statistics
+        """
+        total_tasks = project.task_count
+        completion_rate = (project.done_task_count / total_tasks * 100) if total_tasks > 0 else 0
+        return {
+            'project_id': project.id,
+            'total_tasks': total_tasks,
+            'todo_tasks': project.todo_task_count,
+            'in_progress_tasks': project.in_progress_task_count,
+            'completed_tasks': project.done_task_count,
+            'completion_rate': round(completion_rate, 2),
+        }
+    
+    @staticmethod
+    def _counter_queryset():
+        return Project.objects.only('id', *Project.TASK_COUNT_FIELDS.values())
+    
     @staticmethod
     def get_project_stats(project_id: int) -> dict:
         """
-        Get statistics for a specific project.
+        Get statistics for a specific project from its counter columns.
         
         Args:
             project_id: ID of the project
             
         Returns:
             Dictionary with project statistics
+            
+        Raises:
+            Project.DoesNotExist: If the project does not exist
+        """
+        return ProjectService.counter_stats(ProjectService._counter_queryset().get(id=project_id))
+    
+    @staticmethod
+    async def aget_project_stats(project_id: int) -> dict:
         """
+        Get statistics for a specific project using the async ORM.
+        
+        Args:
+            project_id: ID of the project
+            
+        Returns:
+            Dictionary with project statistics
+            
+        Raises:
+            Project.DoesNotExist: If the project does not exist
+        """
+        return ProjectService.counter_stats(await ProjectService._counter_queryset().aget(id=project_id))
+    
+    @staticmethod
+    def _next_due_date():
+        """Earliest open task due date of the outer project, read from the partial index."""
         from apps.tasks.models import Task
         
-        project = Project.objects.get(id=project_id)
-        tasks = Task.objects.filter(project=project)
+        return Subquery(
+            Task.objects.filter(project_id=OuterRef('pk'), due_date__isnull=False)
+            .exclude(status='DONE')
+            .order_by('due_date')
+            .values('due_date')[:1]
+        )
+    
+    @staticmethod
+    def adjust_task_counts(
+        project: Project,
+        deltas: dict,
+        added_due_dates=(),
+        removed_due_dates=()
+    ):
+        """
+        Apply per-status task count changes to a project and its organization.
         
-        total_tasks = tasks.count()
-        todo_tasks = tasks.filter(status='TODO').count()
-        in_progress_tasks = tasks.filter(status='IN_PROGRESS').count()
-        done_tasks = tasks.filter(status='DONE').count()
+        Called by every task write inside its transaction. The
+        organization's counters change in the UPDATE that bumps its data
+        version, so this also counts as the write's version bump.
         
-        completion_rate = (done_tasks / total_tasks * 100) if total_tasks > 0 else 0
+        The project's next due date changes in the same UPDATE as its
+        counters. Due dates that became open lower it with LEAST, which,
+        like the F() increments, applies to the row as concurrent writers
+        left it. Only when a due date that left the open set may have been
+        the minimum is the project row locked and the minimum recomputed
+        from the tasks; the lock makes the recomputation see every
+        committed task write.
         
-        return {
-            'project_id': project_id,
-            'total_tasks': total_tasks,
-            'todo_tasks': todo_tasks,
-            'in_progress_tasks': in_progress_tasks,
-            'completed_tasks': done_tasks,
-            'completion_rate': round(completion_rate, 2),
+        Finally the counters of ``project`` and its organization are
+        re-read into the instances. The rows this wrote stay locked until
+        the transaction ends, so the counters read back are the values it
+        commits, and no other writer can change them first.
+        
+        Args:
+            project: Project whose tasks changed
+            deltas: Mapping of task status to the change of its count
+            added_due_dates: Due dates of tasks that became open or got
+                a new due date while open (None entries are ignored)
+            removed_due_dates: Due dates of open tasks that were closed,
+                deleted or moved to another due date
+        """
+        updates = counter_increments(Project.TASK_COUNT_FIELDS, deltas)
+        added = min((due for due in added_due_dates if due is not None), default=None)
+        removed = min((due for due in removed_due_dates if due is not None), default=None)
+        if removed is not None:
+            current = Project.objects.select_for_update().values_list(
+                'next_due_date', flat=True
+            ).get(id=project.id)
+            if current is not None and removed <= current:
+                # Also covers the due dates added by this transaction
+                updates['next_due_date'] = ProjectService._next_due_date()
+                added = None
+        if added is not None:
+            added = Value(added, output_field=DateTimeField())
+            updates['next_due_date'] = Least(Coalesce(F('next_due_date'), added), added)
+        if updates:
+            # Touching updated_at queues the project for the burndown rollup
+            Project.objects.filter(id=project.id).update(updated_at=timezone.now(), **updates)
+        OrganizationService.bump_data_version(
+            project.organization_id,
+            **counter_increments(Organization.TASK_COUNT_FIELDS, deltas)
+        )
+        
+        project_fields = [*Project.TASK_COUNT_FIELDS.values(), 'next_due_date', 'updated_at']
+        organization_fields = [
+            *Organization.PROJECT_COUNT_FIELDS.values(),
+            *Organization.TASK_COUNT_FIELDS.values(),
+            'data_version',
+        ]
+        values = Project.objects.filter(id=project.id).values_list(
+            *project_fields, *(f'organization__{field}' for field in organization_fields)
+        ).get()
+        for field, value in zip(project_fields, values):
+            setattr(project, field, value)
+        for field, value in zip(organization_fields, values[len(project_fields):]):
+            setattr(project.organization, field, value)
+    
+    @staticmethod
+    def recount_task_counts(organization_ids=None) -> list:
+        """
+        Recompute projects' task counters and next due dates from the task rows.
+        
+        Args:
+            organization_ids: Limit to these organizations' projects, or None for all
+            
+        Returns:
+            List of the projects whose counters were corrected
+        """
+        expected = {
+            field: Count('tasks', filter=Q(tasks__status=status))
+            for status, field in Project.TASK_COUNT_FIELDS.items()
         }
+        expected['next_due_date'] = Min(
+            'tasks__due_date', filter=~Q(tasks__status='DONE')
+        )
+        fixed = recount(Project.objects.all(), 'organization_id', organization_ids, expected)
+        if fixed:
+            Project.objects.filter(id__in=[project.id for project in fixed]).update(
+                updated_at=timezone.now()
+            )
+        return fixed
     
     @staticmethod
     def delete_project(project_id: int, organization_id: int = None) -> bool:
@@ -145,13 +337,162 @@ class ProjectService:
         Raises:
             OrganizationMismatchError: If project doesn't belong to organization
         """
-        project = Project.objects.select_related('organization').get(id=project_id)
+        with transaction.atomic():
+            project = Project.objects.select_related('organization').select_for_update(
+                of=('self',)
+            ).get(id=project_id)
+            
+            if organization_id and project.organization_id != organization_id:
+                raise OrganizationMismatchError(
+                    f"Project {project_id} does not belong to organization {organization_id}"
+                )
+            
+            # The project's tasks go with it
+            task_deltas = {
+                status: -getattr(project, field)
+                for status, field in Project.TASK_COUNT_FIELDS.items()
+            }
+            project.delete()
+            OrganizationService.bump_data_version(
+                project.organization_id,
+                **counter_increments(Organization.PROJECT_COUNT_FIELDS, {project.status: -1}),
+                **counter_increments(Organization.TASK_COUNT_FIELDS, task_deltas)
+            )
+        return True
+    
+    @staticmethod
+    def rollup_snapshots(now=None) -> int:
+        """
+        Record today's task counts of the projects that changed since the last rollup.
+        
+        Every change of a project's counters touches its ``updated_at``, so
+        only projects updated since the previous rollup (with a small
+        overlap for writes that committed late) are read. Their counters
+        are upserted as today's snapshot rows, and their organizations'
+        data versions bumped so cached burndowns are revalidated.
         
-        if organization_id and project.organization_id != organization_id:
-            raise OrganizationMismatchError(
-                f"Project {project_id} does not belong to organization {organization_id}"
+        Args:
+            now: Time of the rollup, defaults to the current time
+            
+        Returns:
+            Number of projects whose snapshots were written
+        """
+        now = now or timezone.now()
+        today = timezone.localdate(now)
+        projects = Project.objects.only('id', 'organization_id', *Project.TASK_COUNT_FIELDS.values())
+        last_rollup = BurndownSnapshot.objects.aggregate(last=Max('recorded_at'))['last']
+        if last_rollup is not None:
+            projects = projects.filter(updated_at__gte=last_rollup - ProjectService.ROLLUP_OVERLAP)
+        
+        snapshots = []
+        organization_ids = set()
+        for project in projects.order_by().iterator(chunk_size=ProjectService.ROLLUP_BATCH_SIZE):
+            organization_ids.add(project.organization_id)
+            snapshots.extend(
+                BurndownSnapshot(
+                    project_id=project.id, date=today, status=status,
+                    count=getattr(project, field), recorded_at=now
+                )
+                for status, field in Project.TASK_COUNT_FIELDS.items()
             )
+        if snapshots:
+            with transaction.atomic():
+                BurndownSnapshot.objects.bulk_create(
+                    snapshots,
+                    batch_size=ProjectService.ROLLUP_BATCH_SIZE,
+                    update_conflicts=True,
+                    unique_fields=['project', 'date', 'status'],
+                    update_fields=['count', 'recorded_at'],
+                )
+                OrganizationService.bump_data_version(*organization_ids)
+        return len(snapshots) // len(Project.TASK_COUNT_FIELDS)
+    
+    @staticmethod
+    def _burndown_series(rows, start: date, end: date) -> list:
+        """
+        Expand snapshot rows into one point per day.
         
-        project.delete()
-        return True
-
+        Args:
+            rows: (date, status, count) tuples ordered by date; rows before
+                ``start`` give the counts the series starts from
+            start: First day of the series
+            end: Last day of the series
+            
+        Returns:
+            List of point dictionaries, one per day from start to end
+        """
+        counts = dict.fromkeys(Project.TASK_COUNT_FIELDS, 0)
+        rows = iter(rows)
+        pending = next(rows, None)
+        points = []
+        day = start
+        while day <= end:
+            while pending is not None and pending[0] <= day:
+                counts[pending[1]] = pending[2]
+                pending = next(rows, None)
+            points.append({
+                'date': day,
+                'todo_tasks': counts['TODO'],
+                'in_progress_tasks': counts['IN_PROGRESS'],
+                'completed_tasks': counts['DONE'],
+                'total_tasks': sum(counts.values()),
+                'remaining_tasks': counts['TODO'] + counts['IN_PROGRESS'],
+            })
+            day += timedelta(days=1)
+        return points
+    
+    @staticmethod
+    def _burndown_queryset(project_id: int, start: date, end: date):
+        """Snapshot rows of a project up to ``end``, starting with the last day before ``start``."""
+        if start > end:
+            raise ValueError("'from' must not be after 'to'")
+        if (end - start).days >= ProjectService.BURNDOWN_MAX_DAYS:
+            raise ValueError(f"Burndowns cover at most {ProjectService.BURNDOWN_MAX_DAYS} days")
+        snapshots = BurndownSnapshot.objects.filter(project_id=project_id)
+        previous = snapshots.filter(date__lt=start).order_by('-date').values('date')[:1]
+        return (
+            snapshots.filter(Q(date__gte=start) | Q(date=previous), date__lte=end)
+            .order_by('date')
+            .values_list('date', 'status', 'count')
+        )
+    
+    @staticmethod
+    def get_burndown(project_id: int, start: date, end: date) -> list:
+        """
+        Get a project's daily task counts per status from its snapshots.
+        
+        Days after the last snapshot repeat its counts, so the result only
+        changes when a rollup runs.
+        
+        Args:
+            project_id: ID of the project
+            start: First day
+            end: Last day
+            
+        Returns:
+            List of point dictionaries, one per day
+            
+        Raises:
+            ValueError: If the range is reversed or longer than BURNDOWN_MAX_DAYS
+        """
+        rows = ProjectService._burndown_queryset(project_id, start, end)
+        return ProjectService._burndown_series(list(rows), start, end)
+    
+    @staticmethod
+    async def aget_burndown(project_id: int, start: date, end: date) -> list:
+        """
+        Get a project's burndown using the async ORM.
+        
+        Args:
+            project_id: ID of the project
+            start: First day
+            end: Last day
+            
+        Returns:
+            List of point dictionaries, one per day
+            
+        Raises:
+            ValueError: If the range is reversed or longer than BURNDOWN_MAX_DAYS
+        """
+        rows = ProjectService._burndown_queryset(project_id, start, end)
+        return ProjectService._burndown_series([row async for row in rows], start, end)
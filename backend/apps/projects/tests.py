@@ -84,6 +84,22 @@ class TestProjectService:
         assert updated_project.name == "Updated Project"
         assert updated_project.status == "COMPLETED"
     
+    def test_update_project_with_version(self):
+        """Test a versioned update applies once and a stale one conflicts."""
+        from apps.core.exceptions import ConcurrentUpdateError
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = ProjectService.create_project(organization_id=org.id, name="Test Project")
+        
+        ProjectService.update_project(project.id, expected_version=1, status="COMPLETED")
+        with pytest.raises(ConcurrentUpdateError):
+            ProjectService.update_project(project.id, expected_version=1, name="Stale")
+        
+        project.refresh_from_db()
+        org.refresh_from_db()
+        assert (project.name, project.version) == ("Test Project", 2)
+        assert (org.active_project_count, org.completed_project_count) == (0, 1)
+    
     def test_update_project_wrong_organization(self):
         """Test updating project with wrong organization raises error."""
         org1 = Organization.objects.create(
@@ -134,4 +150,139 @@ class TestProjectService:
         assert 'project_id' in stats
         assert 'total_tasks' in stats
         assert 'completion_rate' in stats
+    
+    def test_get_project_stats_uses_one_query(self, django_assert_num_queries):
+        """Test project statistics are read from the counters in a single query."""
+        from apps.tasks.services import TaskService
+        
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = ProjectService.create_project(org.id, "Test Project")
+        for status in ('TODO', 'IN_PROGRESS', 'DONE', 'DONE'):
+            TaskService.create_task(project.id, "Task", status=status)
+        
+        with django_assert_num_queries(1):
+            stats = ProjectService.get_project_stats(project.id)
+        assert stats == {
+            'project_id': project.id,
+            'total_tasks': 4,
+            'todo_tasks': 1,
+            'in_progress_tasks': 1,
+            'completed_tasks': 2,
+            'completion_rate': 50.0,
+        }
+        with pytest.raises(Project.DoesNotExist):
+            ProjectService.get_project_stats(0)
+    
+    def test_counters_follow_writes(self):
+        """Test task and project writes keep the project and organization counters in step."""
+        from apps.tasks.services import TaskService
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = ProjectService.create_project(org.id, "Test Project")
+        todo = TaskService.create_task(project.id, "Task 1")
+        TaskService.create_task(project.id, "Task 2", status='DONE')
+        TaskService.update_task(todo.id, status='IN_PROGRESS')
+        
+        project.refresh_from_db()
+        assert (project.todo_task_count, project.in_progress_task_count, project.done_task_count) == (0, 1, 1)
+        
+        ProjectService.update_project(project.id, status='ON_HOLD')
+        TaskService.delete_task(todo.id)
+        org.refresh_from_db()
+        assert (org.active_project_count, org.on_hold_project_count) == (0, 1)
+        assert (org.in_progress_task_count, org.done_task_count) == (0, 1)
+        
+        ProjectService.delete_project(project.id)
+        org.refresh_from_db()
+        assert org.project_count == 0
+        assert org.task_count == 0
+    
+    def test_recount_repairs_drift(self):
+        """Test the recount command fixes counters of rows written outside the services."""
+        from io import StringIO
+        from django.core.management import call_command
+        from apps.tasks.models import Task
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        other = Organization.objects.create(name="Other Org", slug="other-org", contact_email="o@example.com")
+        project = Project.objects.create(organization=org, name="Test Project")
+        Task.objects.create(project=project, title="Task", status='DONE')
+        ProjectService.create_project(other.id, "Other Project")
+        
+        out = StringIO()
+        call_command('recount', stdout=out)
+        assert out.getvalue().strip() == "Fixed counters of 1 projects and 1 organizations"
+        
+        project.refresh_from_db()
+        org.refresh_from_db()
+        assert project.done_task_count == 1
+        assert (org.active_project_count, org.done_task_count) == (1, 1)
+        assert org.data_version == 1
+        
+        call_command('recount', '--organization', str(org.id), stdout=out)
+        assert out.getvalue().strip().endswith("Fixed counters of 0 projects and 0 organizations")
+
 
+@pytest.mark.django_db
+class TestBurndown:
+    """Test burndown snapshots and their rollup."""
+    
+    def test_rollup_only_reads_changed_projects(self, django_assert_num_queries):
+        """Test each rollup snapshots the projects changed since the previous one."""
+        from datetime import timedelta
+        from django.utils import timezone
+        from apps.projects.models import BurndownSnapshot
+        from apps.tasks.services import TaskService
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        busy = ProjectService.create_project(org.id, "Busy")
+        ProjectService.create_project(org.id, "Idle")
+        TaskService.create_task(busy.id, "Task", status='DONE')
+        
+        first = timezone.now() + timedelta(hours=1)
+        assert ProjectService.rollup_snapshots(first) == 2
+        assert BurndownSnapshot.objects.count() == 6
+        
+        # Nothing changed: the watermark lookup, the empty project scan
+        with django_assert_num_queries(2):
+            assert ProjectService.rollup_snapshots(first + timedelta(hours=1)) == 0
+        
+        TaskService.create_task(busy.id, "Another")
+        # As if the task had been added after the rollups
+        Project.objects.filter(id=busy.id).update(updated_at=first + timedelta(hours=2))
+        assert ProjectService.rollup_snapshots(first + timedelta(days=1)) == 1
+        assert BurndownSnapshot.objects.filter(project=busy, status='TODO').latest('date').count == 1
+        org.refresh_from_db()
+        assert org.data_version == 6
+    
+    def test_burndown_carries_counts_forward(self):
+        """Test days without snapshots repeat the previous day's counts."""
+        from datetime import datetime, timedelta
+        from django.utils import timezone
+        from apps.tasks.services import TaskService
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = ProjectService.create_project(org.id, "Test Project")
+        task = TaskService.create_task(project.id, "Task 1")
+        TaskService.create_task(project.id, "Task 2")
+        monday = timezone.make_aware(datetime(2026, 3, 2, 18))
+        ProjectService.rollup_snapshots(monday)
+        TaskService.update_task(task.id, status='DONE')
+        ProjectService.rollup_snapshots(monday + timedelta(days=2))
+        
+        points = ProjectService.get_burndown(project.id, date(2026, 3, 1), date(2026, 3, 5))
+        
+        assert [point['date'] for point in points] == [date(2026, 3, day) for day in range(1, 6)]
+        assert [point['remaining_tasks'] for point in points] == [0, 2, 2, 1, 1]
+        assert [point['completed_tasks'] for point in points] == [0, 0, 0, 1, 1]
+        assert points[3]['total_tasks'] == 2
+        # A range starting later picks up the counts it starts from
+        assert ProjectService.get_burndown(project.id, date(2026, 3, 3), date(2026, 3, 3)) == [points[2]]
+        with pytest.raises(ValueError):
+            ProjectService.get_burndown(project.id, date(2026, 3, 5), date(2026, 3, 1))
+        with pytest.raises(ValueError):
+            ProjectService.get_burndown(project.id, date(2024, 1, 1), date(2026, 1, 1))
@@ -0,0 +1,101 @@
+"""
+Change events published by task and comment writes.
+"""
+from apps.core.events import publish_many_on_commit, publish_on_commit
+
+
+def task_channel(project_id: int) -> str:
+    """Channel carrying task changes of a project."""
+    return f'tasks.project.{project_id}'
+
+
+def comment_channel(task_id: int) -> str:
+    """Channel carrying new comments on a task."""
+    return f'comments.task.{task_id}'
+
+
+def project_stats_channel(organization_id: int) -> str:
+    """Channel carrying task-count changes of an organization's projects."""
+    return f'project-stats.organization.{organization_id}'
+
+
+def publish_task_changed(task_id: int, project, action: str, stats_changed: bool = True):
+    """
+    Publish that a task was created, updated or deleted.
+
+    Args:
+        task_id: ID of the task
+        project: The task's project
+        action: 'CREATED', 'UPDATED' or 'DELETED'
+        stats_changed: Whether the project's per-status counts changed too
+    """
+    publish_on_commit(
+        task_channel(project.id),
+        {'action': action, 'task_id': task_id, 'project_id': project.id},
+    )
+    if stats_changed:
+        publish_on_commit(
+            project_stats_channel(project.organization_id),
+            {'project_id': project.id, 'organization_id': project.organization_id},
+        )
+
+
+def publish_tasks_created(task_ids: list, project):
+    """
+    Publish that tasks were created in bulk in one project.
+
+    Args:
+        task_ids: IDs of the new tasks
+        project: Their project
+    """
+    if not task_ids:
+        return
+    publish_many_on_commit(
+        task_channel(project.id),
+        [
+            {'action': 'CREATED', 'task_id': task_id, 'project_id': project.id}
+            for task_id in task_ids
+        ],
+    )
+    publish_on_commit(
+        project_stats_channel(project.organization_id),
+        {'project_id': project.id, 'organization_id': project.organization_id},
+    )
+
+
+def publish_tasks_updated(tasks: list, organization_id: int):
+    """
+    Publish that tasks changed status in bulk.
+
+    Args:
+        tasks: (task ID, project ID) pairs of the updated tasks
+        organization_id: Organization of their projects
+    """
+    by_project = {}
+    for task_id, project_id in tasks:
+        by_project.setdefault(project_id, []).append(task_id)
+    for project_id, task_ids in by_project.items():
+        publish_many_on_commit(
+            task_channel(project_id),
+            [
+                {'action': 'UPDATED', 'task_id': task_id, 'project_id': project_id}
+                for task_id in task_ids
+            ],
+        )
+        publish_on_commit(
+            project_stats_channel(organization_id),
+            {'project_id': project_id, 'organization_id': organization_id},
+        )
+
+
+def publish_comment_added(comment):
+    """
+    Publish that a comment was added to a task.
+
+    Args:
+        comment: The new comment
+    """
+    publish_on_commit(
+        comment_channel(comment.task_id),
+        {'comment_id': comment.id, 'task_id': comment.task_id},
+    )
@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-18 05:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_projects_created_702327_idx_and_more'),
+        ('tasks', '0002_task_priority_task_tasks_project_ef7265_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['created_at', 'id'], name='tasks_created_ad5b72_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'created_at', 'id'], name='tasks_project_d898a0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='taskcomment',
+            index=models.Index(fields=['task', 'created_at', 'id'], name='task_commen_task_id_ce880c_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2 on 2026-10-18 06:35
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_burndown_snapshots'),
+        ('tasks', '0003_task_tasks_created_ad5b72_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField()),
+                ('kind', models.CharField(choices=[('CREATED', 'Created'), ('UPDATED', 'Updated'), ('DELETED', 'Deleted')], max_length=20)),
+                ('from_status', models.CharField(blank=True, max_length=20)),
+                ('to_status', models.CharField(blank=True, max_length=20)),
+                ('assignee_email', models.EmailField(blank=True, max_length=254)),
+                ('occurred_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_events', to='projects.project')),
+            ],
+            options={
+                'db_table': 'task_events',
+                'ordering': ['occurred_at', 'id'],
+                'indexes': [models.Index(fields=['project', 'to_status', 'occurred_at'], name='task_events_project_eb20ef_idx'), models.Index(fields=['task_id', 'occurred_at'], name='task_events_task_id_4fe49f_idx')],
+            },
+        ),
+        # Existing tasks get a best-effort history: created as TODO, then
+        # moved to their current status when they were last updated
+        migrations.RunSQL(
+            """
+            INSERT INTO task_events
+                (task_id, project_id, kind, from_status, to_status, assignee_email, occurred_at)
+            SELECT id, project_id, 'CREATED', '', 'TODO', assignee_email, created_at FROM tasks;
+            INSERT INTO task_events
+                (task_id, project_id, kind, from_status, to_status, assignee_email, occurred_at)
+            SELECT id, project_id, 'UPDATED', 'TODO', status, assignee_email, updated_at
+            FROM tasks WHERE status <> 'TODO';
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_next_due_date'),
+        ('tasks', '0004_task_events'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('due_date__isnull', False), models.Q(('status', 'DONE'), _negated=True)), fields=['project', 'due_date'], name='tasks_open_due_idx'),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE projects SET next_due_date = (
+                SELECT min(due_date) FROM tasks
+                WHERE tasks.project_id = projects.id
+                  AND tasks.due_date IS NOT NULL AND tasks.status <> 'DONE'
+            )
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
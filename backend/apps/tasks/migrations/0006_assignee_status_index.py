@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 06:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_next_due_date'),
+        ('tasks', '0005_open_due_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assignee_email', 'status'], name='tasks_assigne_ee92a2_idx'),
+        ),
+    ]
@@ -2,11 +2,12 @@
 Task domain models.
 """
 from django.db import models
-from apps.core.models import TimeStampedModel
+from django.utils import timezone
+from apps.core.models import TimeStampedModel, VersionedModel
 from apps.projects.models import Project
 
 
-class Task(TimeStampedModel):
+class Task(TimeStampedModel, VersionedModel):
     """Task model - project dependent."""
     
     STATUS_CHOICES = [
@@ -48,6 +49,16 @@ class Task(TimeStampedModel):
         indexes = [
             models.Index(fields=['project', 'status']),
             models.Index(fields=['project', 'priority']),
+            models.Index(fields=['created_at', 'id']),
+            models.Index(fields=['project', 'created_at', 'id']),
+            # Tasks of one assignee, for workload and team-lead views
+            models.Index(fields=['assignee_email', 'status']),
+            # Due dates of open tasks, for overdue and due-soon lookups
+            models.Index(
+                fields=['project', 'due_date'],
+                condition=models.Q(due_date__isnull=False) & ~models.Q(status='DONE'),
+                name='tasks_open_due_idx',
+            ),
         ]
 
     def __str__(self):
@@ -68,7 +79,47 @@ class TaskComment(TimeStampedModel):
     class Meta:
         db_table = 'task_comments'
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['task', 'created_at', 'id']),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author_email} on {self.task.title}"
 
+
+class TaskEvent(models.Model):
+    """
+    Append-only record of a task write, for flow analytics.
+    
+    Every task service write adds one row per task in its transaction.
+    ``task_id`` is not a foreign key, so a task's history outlives it.
+    """
+    
+    KIND_CHOICES = [
+        ('CREATED', 'Created'),
+        ('UPDATED', 'Updated'),
+        ('DELETED', 'Deleted'),
+    ]
+    
+    task_id = models.BigIntegerField()
+    project = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='task_events'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    from_status = models.CharField(max_length=20, blank=True)
+    to_status = models.CharField(max_length=20, blank=True)
+    assignee_email = models.EmailField(blank=True)
+    occurred_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'task_events'
+        ordering = ['occurred_at', 'id']
+        indexes = [
+            models.Index(fields=['project', 'to_status', 'occurred_at']),
+            models.Index(fields=['task_id', 'occurred_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.kind} {self.task_id}: {self.from_status} -> {self.to_status}"
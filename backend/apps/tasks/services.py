@@ -1,12 +1,27 @@
 """
 Business logic for task operations.
 """
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime
 from typing import Optional
-from django.db import transaction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.utils import timezone
+from apps.core.cache import invalidate_tenants_on_commit
 from apps.core.exceptions import OrganizationMismatchError, InvalidStatusTransitionError
-from .models import Task, TaskComment
+from apps.core.updates import apply_changes, save_changes
+from . import analytics
+from .events import (
+    publish_comment_added, publish_task_changed, publish_tasks_created, publish_tasks_updated
+)
+from .models import Task, TaskComment, TaskEvent
+from apps.organizations.models import Organization
+from apps.organizations.services import OrganizationService
 from apps.projects.models import Project
+from apps.projects.services import ProjectService
 
 
 class TaskService:
@@ -19,6 +34,27 @@ class TaskService:
         'DONE': ['TODO', 'IN_PROGRESS'],
     }
     
+    # Longest range of flow metrics, in days
+    FLOW_METRICS_MAX_DAYS = 366
+    
+    @staticmethod
+    def _event(task: Task, kind: str, from_status: str = "") -> TaskEvent:
+        """Build the event log row of a write to a task."""
+        return TaskEvent(
+            task_id=task.id,
+            project_id=task.project_id,
+            kind=kind,
+            from_status=from_status,
+            to_status="" if kind == 'DELETED' else task.status,
+            assignee_email=task.assignee_email,
+            occurred_at=task.created_at if kind == 'CREATED' else timezone.now()
+        )
+    
+    @staticmethod
+    def _open_due_date(status: str, due_date: datetime = None) -> Optional[datetime]:
+        """Due date a task contributes to its project's next due date, if any."""
+        return due_date if status != 'DONE' else None
+    
     @staticmethod
     def create_task(
         project_id: int,
@@ -57,31 +93,124 @@ class TaskService:
                 f"Project {project_id} does not belong to organization {organization_id}"
             )
         
-        task = Task.objects.create(
-            project=project,
-            title=title,
-            description=description,
-            status=status,
-            priority=priority,
-            assignee_email=assignee_email,
-            due_date=due_date
-        )
+        with transaction.atomic():
+            task = Task.objects.create(
+                project=project,
+                title=title,
+                description=description,
+                status=status,
+                priority=priority,
+                assignee_email=assignee_email,
+                due_date=due_date
+            )
+            TaskService._event(task, 'CREATED').save()
+            ProjectService.adjust_task_counts(
+                project, {status: 1}, added_due_dates=[TaskService._open_due_date(status, due_date)]
+            )
+        publish_task_changed(task.id, project, 'CREATED')
         return task
     
+    @staticmethod
+    def bulk_create_tasks(
+        project_id: int,
+        tasks: list,
+        organization_id: int = None,
+        batch_size: int = None
+    ) -> tuple:
+        """
+        Create many tasks for a project.
+        
+        The project is fetched and its organization checked once. Each item
+        is validated against the model; valid items are inserted with
+        ``bulk_create`` in one transaction, invalid ones are reported by
+        their position in ``tasks``.
+        
+        Args:
+            project_id: ID of the parent project
+            tasks: Dicts of task fields (title, description, status, priority,
+                assignee_email, due_date)
+            organization_id: Optional organization ID for validation
+            batch_size: Rows per INSERT, defaults to the
+                TASK_BULK_CREATE_BATCH_SIZE setting
+            
+        Returns:
+            Tuple of (created Task instances in input order,
+            list of {'index', 'message'} dicts for rejected items)
+            
+        Raises:
+            OrganizationMismatchError: If project doesn't belong to organization
+        """
+        project = Project.objects.select_related('organization').get(id=project_id)
+        
+        # Validate organization ownership if provided
+        if organization_id and project.organization_id != organization_id:
+            raise OrganizationMismatchError(
+                f"Project {project_id} does not belong to organization {organization_id}"
+            )
+        
+        new_tasks = []
+        errors = []
+        for index, data in enumerate(tasks):
+            task = Task(
+                project=project,
+                title=data.get('title') or "",
+                description=data.get('description') or "",
+                status=data.get('status') or "TODO",
+                priority=data.get('priority') or "MEDIUM",
+                assignee_email=data.get('assignee_email') or "",
+                due_date=data.get('due_date')
+            )
+            try:
+                task.full_clean(exclude=['project'], validate_unique=False, validate_constraints=False)
+            except ValidationError as e:
+                errors.append({
+                    'index': index,
+                    'message': "; ".join(
+                        f"{field}: {' '.join(messages)}"
+                        for field, messages in e.message_dict.items()
+                    ),
+                })
+                continue
+            new_tasks.append(task)
+        
+        if batch_size is None:
+            batch_size = getattr(settings, 'TASK_BULK_CREATE_BATCH_SIZE', 1000)
+        with transaction.atomic():
+            created = Task.objects.bulk_create(new_tasks, batch_size=batch_size)
+            if created:
+                TaskEvent.objects.bulk_create(
+                    [TaskService._event(task, 'CREATED') for task in created], batch_size=batch_size
+                )
+                ProjectService.adjust_task_counts(
+                    project,
+                    Counter(task.status for task in created),
+                    added_due_dates=[TaskService._open_due_date(task.status, task.due_date) for task in created]
+                )
+            publish_tasks_created([task.id for task in created], project)
+        return created, errors
+    
     @staticmethod
     def update_task(
         task_id: int,
         organization_id: int = None,
         validate_transition: bool = False,
+        expected_version: int = None,
         **kwargs
     ) -> Task:
         """
-        Update a task.
+        Update a task, writing only the fields that changed.
+        
+        If no field changes, nothing is written, logged or published.
+        Without an expected version the row is locked while it is read,
+        so the status counters move from the right status. With one, the
+        row is not locked; the UPDATE matches only the version that was
+        read, and a concurrent edit surfaces as a conflict.
         
         Args:
             task_id: ID of the task
             organization_id: Optional organization ID for validation
             validate_transition: Whether to validate status transitions
+            expected_version: Optional version the caller read
             **kwargs: Fields to update
             
         Returns:
@@ -90,33 +219,268 @@ class TaskService:
         Raises:
             OrganizationMismatchError: If task doesn't belong to organization
             InvalidStatusTransitionError: If status transition is invalid
+            ConcurrentUpdateError: If the task is not at expected_version
         """
-        task = Task.objects.select_related('project__organization').get(id=task_id)
+        with transaction.atomic():
+            queryset = Task.objects.select_related('project__organization')
+            if expected_version is None:
+                # Locked so concurrent status changes count from the right status
+                queryset = queryset.select_for_update(of=('self',))
+            task = queryset.get(id=task_id)
+            
+            # Validate organization ownership if provided
+            if organization_id and task.project.organization_id != organization_id:
+                raise OrganizationMismatchError(
+                    f"Task {task_id} does not belong to organization {organization_id}"
+                )
+            
+            previous_status = task.status
+            previous_due_date = task.due_date
+            
+            # Validate status transition if requested
+            if validate_transition and 'status' in kwargs:
+                new_status = kwargs['status']
+                current_status = task.status
+                
+                if new_status != current_status:
+                    valid_next_statuses = TaskService.VALID_TRANSITIONS.get(current_status, [])
+                    if new_status not in valid_next_statuses:
+                        raise InvalidStatusTransitionError(
+                            f"Cannot transition from {current_status} to {new_status}"
+                        )
+            
+            changed = apply_changes(task, kwargs, exclude=('project', 'project_id'))
+            if not save_changes(task, changed, expected_version):
+                return task
+            TaskService._event(task, 'UPDATED', previous_status).save()
+            deltas = {}
+            if task.status != previous_status:
+                deltas = {previous_status: -1, task.status: 1}
+            previous_open_due = TaskService._open_due_date(previous_status, previous_due_date)
+            open_due = TaskService._open_due_date(task.status, task.due_date)
+            due_moved = open_due != previous_open_due
+            ProjectService.adjust_task_counts(
+                task.project,
+                deltas,
+                added_due_dates=[open_due] if due_moved else [],
+                removed_due_dates=[previous_open_due] if due_moved else []
+            )
+        publish_task_changed(
+            task.id, task.project, 'UPDATED', stats_changed=task.status != previous_status
+        )
+        return task
+    
+    @staticmethod
+    def bulk_transition_tasks(task_ids: list, to_status: str, organization_id: int) -> tuple:
+        """
+        Move many tasks of an organization to a status in one statement.
         
-        # Validate organization ownership if provided
-        if organization_id and task.project.organization_id != organization_id:
-            raise OrganizationMismatchError(
-                f"Task {task_id} does not belong to organization {organization_id}"
+        VALID_TRANSITIONS is enforced by the UPDATE's WHERE clause, so only
+        tasks of the organization whose current status may move to
+        ``to_status`` are changed. The same statement reads back why every
+        other requested task was left alone. Moves to DONE first lock the
+        tasks and then their projects, whose next due dates they may have
+        to recompute; single-task writes take the same locks in the same
+        order.
+        
+        Args:
+            task_ids: IDs of the tasks
+            to_status: Target status
+            organization_id: Organization the tasks must belong to
+            
+        Returns:
+            Tuple of (updated task IDs, list of {'task_id', 'reason'} dicts
+            for tasks that were not updated)
+            
+        Raises:
+            InvalidStatusTransitionError: If to_status is not a known status
+        """
+        if to_status not in TaskService.VALID_TRANSITIONS:
+            raise InvalidStatusTransitionError(f"Unknown status {to_status}")
+        
+        allowed_sources = [
+            status for status, targets in TaskService.VALID_TRANSITIONS.items()
+            if to_status in targets
+        ]
+        task_ids = list(dict.fromkeys(task_ids))
+        quote = connection.ops.quote_name
+        tasks_table = quote(Task._meta.db_table)
+        projects_table = quote(Project._meta.db_table)
+        organizations_table = quote(Organization._meta.db_table)
+        events_table = quote(TaskEvent._meta.db_table)
+        # Moved tasks per previous status, as columns moved_0, moved_1, ...
+        # in the order of the counter fields
+        statuses = list(Project.TASK_COUNT_FIELDS)
+        moved = ", ".join(
+            f"count(*) FILTER (WHERE previous_status = %s) AS moved_{index}"
+            for index in range(len(statuses))
+        )
+        
+        def adjust(fields):
+            return ", ".join(
+                f"{quote(fields[status])} = {quote(fields[status])} - moved.moved_{index}"
+                + (" + moved.total" if status == to_status else "")
+                for index, status in enumerate(statuses)
+            )
+        
+        # The organization's requested tasks, locked in ID order
+        lock_tasks = f"""
+            SELECT t.id, t.status
+            FROM {tasks_table} AS t
+            JOIN {projects_table} AS p ON p.id = t.project_id
+            WHERE t.id = ANY(%s) AND p.organization_id = %s
+            ORDER BY t.id
+            FOR UPDATE OF t
+        """
+        
+        if to_status == 'DONE':
+            # Closed tasks leave the open due dates. Where one of them held
+            # the project's next due date, it is recomputed from the open
+            # tasks that were not moved (from the partial index); the tasks
+            # and then the projects are locked first, so that sees every
+            # committed write.
+            min_due = "min(due_date)"
+            next_due_date = f"""CASE WHEN moved.min_due <= p.next_due_date THEN (
+                SELECT min(remaining.due_date) FROM {tasks_table} AS remaining
+                WHERE remaining.project_id = p.id AND remaining.due_date IS NOT NULL
+                  AND remaining.status <> 'DONE' AND remaining.id NOT IN (SELECT id FROM updated)
+            ) ELSE p.next_due_date END"""
+        else:
+            # Reopened tasks can only lower the next due date
+            min_due = "min(due_date) FILTER (WHERE previous_status = 'DONE')"
+            next_due_date = "LEAST(COALESCE(p.next_due_date, moved.min_due), moved.min_due)"
+        
+        # The organization's requested tasks are locked first; the moves and
+        # the counter deltas are computed from the statuses read under that
+        # lock, so a write committed while waiting for it is not counted
+        # against its old status. The outer SELECT sees the rows as they
+        # were before the UPDATEs. Counters of the projects and the
+        # organization are adjusted, the organization's data version bumped
+        # and the moves logged as task events by the same statement.
+        sql = f"""
+            WITH locked AS ({lock_tasks}), updated AS (
+                UPDATE {tasks_table} AS t
+                SET status = %s, updated_at = %s, version = t.version + 1
+                FROM locked
+                WHERE t.id = locked.id AND locked.status = ANY(%s)
+                RETURNING t.id, t.project_id, locked.status AS previous_status,
+                          t.assignee_email, t.due_date
+            ), counted AS (
+                UPDATE {projects_table} AS p
+                SET updated_at = %s, next_due_date = {next_due_date},
+                    {adjust(Project.TASK_COUNT_FIELDS)}
+                FROM (
+                    SELECT project_id, count(*) AS total, {min_due} AS min_due, {moved}
+                    FROM updated GROUP BY project_id
+                ) AS moved
+                WHERE p.id = moved.project_id
+            ), bumped AS (
+                UPDATE {organizations_table} AS o
+                SET data_version = data_version + 1, {adjust(Organization.TASK_COUNT_FIELDS)}
+                FROM (SELECT count(*) AS total, {moved} FROM updated) AS moved
+                WHERE o.id = %s AND moved.total > 0
+            ), logged AS (
+                INSERT INTO {events_table}
+                    (task_id, project_id, kind, from_status, to_status, assignee_email, occurred_at)
+                SELECT id, project_id, 'UPDATED', previous_status, %s, assignee_email, %s
+                FROM updated
             )
+            SELECT requested.id, updated.project_id, t.status, p.organization_id
+            FROM unnest(%s::bigint[]) WITH ORDINALITY AS requested(id, position)
+            LEFT JOIN updated ON updated.id = requested.id
+            LEFT JOIN {tasks_table} AS t ON t.id = requested.id
+            LEFT JOIN {projects_table} AS p ON p.id = t.project_id
+            ORDER BY requested.position
+        """
+        
+        now = timezone.now()
+        with transaction.atomic(), connection.cursor() as cursor:
+            if to_status == 'DONE':
+                cursor.execute(lock_tasks, [task_ids, organization_id])
+                cursor.execute(
+                    f"""
+                    SELECT p.id FROM {projects_table} AS p
+                    WHERE p.organization_id = %s
+                      AND p.id IN (SELECT project_id FROM {tasks_table} WHERE id = ANY(%s))
+                    ORDER BY p.id
+                    FOR UPDATE
+                    """,
+                    [organization_id, task_ids]
+                )
+            cursor.execute(sql, [
+                task_ids, organization_id, to_status, now, allowed_sources,
+                now, *statuses, *statuses, organization_id, to_status, now, task_ids
+            ])
+            rows = cursor.fetchall()
         
-        # Validate status transition if requested
-        if validate_transition and 'status' in kwargs:
-            new_status = kwargs['status']
-            current_status = task.status
+        updated = []
+        rejected = []
+        for task_id, project_id, previous_status, task_organization_id in rows:
+            if project_id is not None:
+                updated.append((task_id, project_id))
+            elif previous_status is None:
+                rejected.append({'task_id': task_id, 'reason': f"Task {task_id} does not exist"})
+            elif task_organization_id != organization_id:
+                rejected.append({
+                    'task_id': task_id,
+                    'reason': f"Task {task_id} does not belong to organization {organization_id}",
+                })
+            elif previous_status == to_status:
+                rejected.append({'task_id': task_id, 'reason': f"Task {task_id} is already {to_status}"})
+            else:
+                rejected.append({
+                    'task_id': task_id,
+                    'reason': f"Cannot transition from {previous_status} to {to_status}",
+                })
+        if updated:
+            invalidate_tenants_on_commit([organization_id])
+        publish_tasks_updated(updated, organization_id)
+        return [task_id for task_id, _ in updated], rejected
+    
+    @staticmethod
+    def get_flow_metrics(project_id: int, start: date, end: date) -> dict:
+        """
+        Get cycle time, lead time and throughput of a project from its task events.
+        
+        Args:
+            project_id: ID of the project
+            start: First day
+            end: Last day
+            
+        Returns:
+            Dictionary of flow metrics of the tasks completed in the range,
+            see ``analytics.flow_metrics``
             
-            if new_status != current_status:
-                valid_next_statuses = TaskService.VALID_TRANSITIONS.get(current_status, [])
-                if new_status not in valid_next_statuses:
-                    raise InvalidStatusTransitionError(
-                        f"Cannot transition from {current_status} to {new_status}"
-                    )
+        Raises:
+            ValueError: If the range is reversed or longer than FLOW_METRICS_MAX_DAYS
+        """
+        if start > end:
+            raise ValueError("'from' must not be after 'to'")
+        if (end - start).days >= TaskService.FLOW_METRICS_MAX_DAYS:
+            raise ValueError(f"Flow metrics cover at most {TaskService.FLOW_METRICS_MAX_DAYS} days")
+        metrics = analytics.flow_metrics(analytics.load_events(project_id, start, end), start, end)
+        return {'project_id': project_id, **metrics}
+    
+    @staticmethod
+    async def aget_flow_metrics(project_id: int, start: date, end: date) -> dict:
+        """
+        Get a project's flow metrics from async code.
         
-        for field, value in kwargs.items():
-            if hasattr(task, field) and field != 'project':
-                setattr(task, field, value)
+        The events are read with a raw cursor, so this runs the sync
+        version in a thread.
         
-        task.save()
-        return task
+        Args:
+            project_id: ID of the project
+            start: First day
+            end: Last day
+            
+        Returns:
+            Dictionary of flow metrics
+            
+        Raises:
+            ValueError: If the range is reversed or longer than FLOW_METRICS_MAX_DAYS
+        """
+        return await sync_to_async(TaskService.get_flow_metrics)(project_id, start, end)
     
     @staticmethod
     def get_tasks_by_project(
@@ -147,6 +511,169 @@ class TaskService:
         
         return queryset
     
+    @staticmethod
+    async def aget_tasks_by_project(
+        project_id: int,
+        status: str = None,
+        assignee_email: str = None
+    ) -> list:
+        """
+        Get all tasks for a project using the async ORM.
+        
+        Args:
+            project_id: ID of the project
+            status: Optional status filter
+            assignee_email: Optional assignee email filter
+            
+        Returns:
+            List of tasks
+        """
+        queryset = TaskService.get_tasks_by_project(project_id, status, assignee_email)
+        return [task async for task in queryset]
+    
+    @staticmethod
+    def get_open_tasks_due_between(organization_id: int, start: datetime = None, end: datetime = None):
+        """
+        Get an organization's open tasks with a due date in a range, earliest first.
+        
+        Projects are pruned by their precomputed next due date, and the
+        tasks of the rest read from the partial index on open tasks' due dates.
+        
+        Args:
+            organization_id: ID of the organization
+            start: Earliest due date, inclusive; None for no lower bound
+            end: Latest due date, exclusive; None for no upper bound
+            
+        Returns:
+            QuerySet of tasks
+        """
+        projects = Project.objects.filter(
+            organization_id=organization_id, next_due_date__isnull=False
+        )
+        tasks = Task.objects.filter(due_date__isnull=False).exclude(status='DONE')
+        if start is not None:
+            tasks = tasks.filter(due_date__gte=start)
+        if end is not None:
+            projects = projects.filter(next_due_date__lt=end)
+            tasks = tasks.filter(due_date__lt=end)
+        return tasks.filter(project__in=projects.values('id')).order_by('due_date', 'id')
+    
+    @staticmethod
+    def get_overdue_tasks(organization_id: int, now: datetime = None):
+        """
+        Get an organization's open tasks that are past their due date, most overdue first.
+        
+        Args:
+            organization_id: ID of the organization
+            now: Time to compare due dates to, defaults to the current time
+            
+        Returns:
+            QuerySet of tasks
+        """
+        return TaskService.get_open_tasks_due_between(organization_id, end=now or timezone.now())
+    
+    @staticmethod
+    def get_tasks_by_assignee(organization_id: int, assignee_email: str, status: str = None):
+        """
+        Get an organization's tasks assigned to one person.
+        
+        Reads the index on assignee and status, so only the assignee's
+        tasks are visited rather than every task of the organization.
+        
+        Args:
+            organization_id: ID of the organization
+            assignee_email: Email of the assignee
+            status: Optional status filter
+            
+        Returns:
+            QuerySet of tasks
+        """
+        queryset = Task.objects.filter(
+            assignee_email=assignee_email, project__organization_id=organization_id
+        ).select_related('project')
+        
+        if status:
+            queryset = queryset.filter(status=status)
+        
+        return queryset
+    
+    @staticmethod
+    def _workload_queryset(organization_id: int):
+        """Open task counts of an organization per assignee, status and priority."""
+        return (
+            Task.objects.filter(project__organization_id=organization_id)
+            .exclude(status='DONE')
+            .values_list('assignee_email', 'status', 'priority')
+            .annotate(count=Count('id'))
+            .order_by()
+        )
+    
+    @staticmethod
+    def _fold_workload(rows) -> list:
+        """
+        Fold per-status and priority counts into per-assignee totals.
+        
+        Args:
+            rows: (assignee_email, status, priority, count) tuples
+            
+        Returns:
+            List of workload dictionaries, busiest first
+        """
+        open_statuses = [status for status, _ in Task.STATUS_CHOICES if status != 'DONE']
+        priorities = [priority for priority, _ in Task.PRIORITY_CHOICES]
+        workload = {}
+        for assignee_email, status, priority, count in rows:
+            entry = workload.setdefault(assignee_email, {
+                'assignee_email': assignee_email,
+                'open_tasks': 0,
+                'by_status': Counter(),
+                'by_priority': Counter(),
+            })
+            entry['open_tasks'] += count
+            entry['by_status'][status] += count
+            entry['by_priority'][priority] += count
+        
+        for entry in workload.values():
+            entry['by_status'] = [
+                {'status': status, 'count': entry['by_status'][status]} for status in open_statuses
+            ]
+            entry['by_priority'] = [
+                {'priority': priority, 'count': entry['by_priority'][priority]}
+                for priority in priorities
+            ]
+        return sorted(workload.values(), key=lambda entry: (-entry['open_tasks'], entry['assignee_email']))
+    
+    @staticmethod
+    def get_workload(organization_id: int) -> list:
+        """
+        Get the open task counts of an organization's assignees.
+        
+        Counts come from one GROUP BY over assignee, status and priority
+        and are folded into per-assignee totals here.
+        
+        Args:
+            organization_id: ID of the organization
+            
+        Returns:
+            List of dictionaries with assignee_email (empty for unassigned
+            tasks), open_tasks, by_status and by_priority, busiest first
+        """
+        return TaskService._fold_workload(TaskService._workload_queryset(organization_id))
+    
+    @staticmethod
+    async def aget_workload(organization_id: int) -> list:
+        """
+        Get the open task counts of an organization's assignees using the async ORM.
+        
+        Args:
+            organization_id: ID of the organization
+            
+        Returns:
+            List of workload dictionaries, busiest first
+        """
+        rows = TaskService._workload_queryset(organization_id)
+        return TaskService._fold_workload([row async for row in rows])
+    
     @staticmethod
     def get_tasks_by_organization(
         organization_id: int,
@@ -172,7 +699,25 @@ class TaskService:
         return queryset
     
     @staticmethod
-    def delete_task(task_id: int, organization_id: int = None) -> bool:
+    async def aget_tasks_by_organization(
+        organization_id: int,
+        status: str = None
+    ) -> list:
+        """
+        Get all tasks for an organization using the async ORM.
+        
+        Args:
+            organization_id: ID of the organization
+            status: Optional status filter
+            
+        Returns:
+            List of tasks
+        """
+        queryset = TaskService.get_tasks_by_organization(organization_id, status)
+        return [task async for task in queryset]
+    
+    @staticmethod
+    def delete_task(task_id: int, organization_id: int = None) -> Task:
         """
         Delete a task.
         
@@ -181,20 +726,30 @@ class TaskService:
             organization_id: Optional organization ID for validation
             
         Returns:
-            True if deleted successfully
+            The deleted Task instance, with its project loaded
             
         Raises:
             OrganizationMismatchError: If task doesn't belong to organization
         """
-        task = Task.objects.select_related('project__organization').get(id=task_id)
-        
-        if organization_id and task.project.organization_id != organization_id:
-            raise OrganizationMismatchError(
-                f"Task {task_id} does not belong to organization {organization_id}"
+        with transaction.atomic():
+            task = Task.objects.select_related('project__organization').select_for_update(
+                of=('self',)
+            ).get(id=task_id)
+            
+            if organization_id and task.project.organization_id != organization_id:
+                raise OrganizationMismatchError(
+                    f"Task {task_id} does not belong to organization {organization_id}"
+                )
+            
+            TaskService._event(task, 'DELETED', task.status).save()
+            task.delete()
+            ProjectService.adjust_task_counts(
+                task.project,
+                {task.status: -1},
+                removed_due_dates=[TaskService._open_due_date(task.status, task.due_date)]
             )
-        
-        task.delete()
-        return True
+        publish_task_changed(task_id, task.project, 'DELETED')
+        return task
 
 
 class TaskCommentService:
@@ -235,6 +790,8 @@ class TaskCommentService:
             content=content,
             author_email=author_email
         )
+        OrganizationService.bump_data_version(task.project.organization_id)
+        publish_comment_added(comment)
         return comment
     
     @staticmethod
@@ -250,6 +807,19 @@ class TaskCommentService:
         """
         return TaskComment.objects.filter(task_id=task_id).select_related('task')
     
+    @staticmethod
+    async def aget_comments_by_task(task_id: int) -> list:
+        """
+        Get all comments for a task using the async ORM.
+        
+        Args:
+            task_id: ID of the task
+            
+        Returns:
+            List of comments
+        """
+        return [comment async for comment in TaskCommentService.get_comments_by_task(task_id)]
+    
     @staticmethod
     def update_comment(comment_id: int, content: str) -> TaskComment:
         """
@@ -262,9 +832,10 @@ class TaskCommentService:
         Returns:
             Updated TaskComment instance
         """
-        comment = TaskComment.objects.get(id=comment_id)
+        comment = TaskComment.objects.select_related('task__project').get(id=comment_id)
         comment.content = content
         comment.save()
+        OrganizationService.bump_data_version(comment.task.project.organization_id)
         return comment
     
     @staticmethod
@@ -278,7 +849,8 @@ class TaskCommentService:
         Returns:
             True if deleted successfully
         """
-        comment = TaskComment.objects.get(id=comment_id)
+        comment = TaskComment.objects.select_related('task__project').get(id=comment_id)
         comment.delete()
+        OrganizationService.bump_data_version(comment.task.project.organization_id)
         return True
 
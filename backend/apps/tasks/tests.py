@@ -7,7 +7,9 @@ from apps.organizations.models import Organization
 from apps.projects.models import Project
 from apps.tasks.models import Task, TaskComment
 from apps.tasks.services import TaskService, TaskCommentService
-from apps.core.exceptions import OrganizationMismatchError, InvalidStatusTransitionError
+from apps.core.exceptions import (
+    ConcurrentUpdateError, OrganizationMismatchError, InvalidStatusTransitionError
+)
 
 
 @pytest.mark.django_db
@@ -114,6 +116,112 @@ class TestTaskService:
         
         tasks = TaskService.get_tasks_by_project(project.id)
         assert len(tasks) == 2
+    
+    def test_bulk_create_tasks(self, django_assert_num_queries):
+        """Test bulk creation inserts valid items in batches and reports the rest."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=org, name="Test Project")
+        items = [{'title': f"Task {i}", 'priority': 'HIGH'} for i in range(5)]
+        items.insert(2, {'title': "Bad", 'status': 'BLOCKED'})
+        items.append({'title': "", 'assignee_email': "not-an-email"})
+        
+        # Project lookup, savepoint, three INSERTs of two tasks and of their
+        # events, project counters, organization counters and version,
+        # counters read back, release
+        with django_assert_num_queries(12):
+            created, errors = TaskService.bulk_create_tasks(
+                project.id, items, organization_id=org.id, batch_size=2
+            )
+        
+        assert [task.title for task in created] == [f"Task {i}" for i in range(5)]
+        assert all(task.pk and task.status == 'TODO' for task in created)
+        assert Task.objects.filter(project=project, priority='HIGH').count() == 5
+        assert [error['index'] for error in errors] == [2, 6]
+        assert "status" in errors[0]['message']
+        assert "title" in errors[1]['message'] and "assignee_email" in errors[1]['message']
+        project.refresh_from_db()
+        org.refresh_from_db()
+        assert project.todo_task_count == org.todo_task_count == 5
+    
+    def test_bulk_transition_tasks(self, django_assert_num_queries):
+        """Test bulk transitions update allowed tasks and explain the rest."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        other_org = Organization.objects.create(
+            name="Other Org",
+            slug="other-org",
+            contact_email="other@example.com"
+        )
+        project = Project.objects.create(organization=org, name="Test Project")
+        other_project = Project.objects.create(organization=other_org, name="Other Project")
+        todo = TaskService.create_task(project.id, "Todo")
+        in_progress = TaskService.create_task(project.id, "Doing", status='IN_PROGRESS')
+        done = TaskService.create_task(project.id, "Done", status='DONE')
+        foreign = TaskService.create_task(other_project.id, "Foreign")
+        
+        # Savepoint, locks of the tasks and then of the projects whose next
+        # due date may be recomputed, the transition statement, release
+        with django_assert_num_queries(5):
+            updated, rejected = TaskService.bulk_transition_tasks(
+                [todo.id, done.id, foreign.id, in_progress.id, 0], 'DONE', org.id
+            )
+        
+        assert updated == [todo.id, in_progress.id]
+        assert rejected == [
+            {'task_id': done.id, 'reason': f"Task {done.id} is already DONE"},
+            {'task_id': foreign.id, 'reason': f"Task {foreign.id} does not belong to organization {org.id}"},
+            {'task_id': 0, 'reason': "Task 0 does not exist"},
+        ]
+        assert set(Task.objects.filter(status='DONE').values_list('id', flat=True)) == {
+            todo.id, in_progress.id, done.id
+        }
+        todo.refresh_from_db()
+        assert todo.updated_at > todo.created_at
+        foreign.refresh_from_db()
+        assert foreign.status == 'TODO'
+        project.refresh_from_db()
+        org.refresh_from_db()
+        assert (project.todo_task_count, project.in_progress_task_count, project.done_task_count) == (0, 0, 3)
+        assert (org.todo_task_count, org.in_progress_task_count, org.done_task_count) == (0, 0, 3)
+        assert org.data_version == 4
+    
+    def test_bulk_transition_respects_valid_transitions(self, monkeypatch):
+        """Test sources not allowed by VALID_TRANSITIONS are rejected."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=org, name="Test Project")
+        done = Task.objects.create(project=project, title="Done", status='DONE')
+        monkeypatch.setitem(TaskService.VALID_TRANSITIONS, 'DONE', ['IN_PROGRESS'])
+        
+        updated, rejected = TaskService.bulk_transition_tasks([done.id], 'TODO', org.id)
+        
+        assert updated == []
+        assert rejected == [{'task_id': done.id, 'reason': "Cannot transition from DONE to TODO"}]
+        with pytest.raises(InvalidStatusTransitionError):
+            TaskService.bulk_transition_tasks([done.id], 'ARCHIVED', org.id)
+    
+    def test_bulk_create_tasks_checks_organization(self):
+        """Test bulk creation rejects a project of another organization."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=org, name="Test Project")
+        
+        with pytest.raises(OrganizationMismatchError):
+            TaskService.bulk_create_tasks(project.id, [{'title': "Task"}], organization_id=org.id + 1)
+        assert not Task.objects.exists()
 
 
 @pytest.mark.django_db
@@ -154,3 +262,573 @@ class TestTaskCommentService:
         comments = TaskCommentService.get_comments_by_task(task.id)
         assert len(comments) == 2
 
+
+class RecordingBroker:
+    """Broker stub collecting published events."""
+    
+    def __init__(self):
+        self.events = []
+    
+    def publish(self, channel, payload):
+        self.events.append((channel, payload))
+    
+    def publish_many(self, channel, payloads):
+        for payload in payloads:
+            self.publish(channel, payload)
+
+
+@pytest.mark.django_db
+class TestTaskEvents:
+    """Test change events published by task and comment writes."""
+    
+    @pytest.fixture
+    def broker(self, monkeypatch):
+        broker = RecordingBroker()
+        monkeypatch.setattr('apps.core.events._broker', broker)
+        return broker
+    
+    @pytest.fixture
+    def project(self):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        return Project.objects.create(organization=org, name="Test Project")
+    
+    def test_task_writes_publish_on_commit(self, broker, project, django_capture_on_commit_callbacks):
+        """Test create, update and delete publish task and stats events after commit."""
+        org_id = project.organization_id
+        with django_capture_on_commit_callbacks(execute=True):
+            task = TaskService.create_task(project_id=project.id, title="Task")
+            assert broker.events == []
+        
+        assert broker.events == [
+            (f'tasks.project.{project.id}', {'action': 'CREATED', 'task_id': task.id, 'project_id': project.id}),
+            (f'project-stats.organization.{org_id}', {'project_id': project.id, 'organization_id': org_id}),
+        ]
+        
+        broker.events.clear()
+        with django_capture_on_commit_callbacks(execute=True):
+            TaskService.update_task(task.id, title="Renamed")
+        # Same status, so the project's counts did not change
+        assert [channel for channel, _ in broker.events] == [f'tasks.project.{project.id}']
+        
+        broker.events.clear()
+        with django_capture_on_commit_callbacks(execute=True):
+            TaskService.delete_task(task.id)
+        assert broker.events[0][1] == {'action': 'DELETED', 'task_id': task.id, 'project_id': project.id}
+        assert len(broker.events) == 2
+    
+    def test_add_comment_publishes(self, broker, project, django_capture_on_commit_callbacks):
+        """Test adding a comment publishes on the task's comment channel."""
+        task = Task.objects.create(project=project, title="Task")
+        with django_capture_on_commit_callbacks(execute=True):
+            comment = TaskCommentService.add_comment(task.id, "Hello", "a@example.com")
+        
+        assert broker.events == [
+            (f'comments.task.{task.id}', {'comment_id': comment.id, 'task_id': task.id}),
+        ]
+    
+    def test_bulk_create_publishes_once_per_channel(self, broker, project, django_capture_on_commit_callbacks):
+        """Test bulk creation publishes every task and a single stats event."""
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            created, _ = TaskService.bulk_create_tasks(project.id, [{'title': "A"}, {'title': "B"}])
+        
+        # Cache invalidation, the task events and the stats event
+        assert len(callbacks) == 3
+        assert [payload.get('task_id') for _, payload in broker.events] == [
+            created[0].id, created[1].id, None
+        ]
+    
+    def test_rolled_back_write_publishes_nothing(self, broker, project, django_capture_on_commit_callbacks):
+        """Test events are dropped when the transaction rolls back."""
+        from django.db import transaction
+        
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    TaskService.create_task(project_id=project.id, title="Task")
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        
+        assert callbacks == []
+        assert broker.events == []
+
+
+@pytest.mark.django_db
+class TestTaskEventLog:
+    """Test the append-only task event log."""
+    
+    def test_every_write_is_logged(self):
+        """Test creations, updates, bulk transitions and deletions each add an event."""
+        from apps.tasks.models import TaskEvent
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = Project.objects.create(organization=org, name="Test Project")
+        task = TaskService.create_task(project.id, "Task", assignee_email="a@example.com")
+        TaskService.update_task(task.id, status='IN_PROGRESS')
+        TaskService.update_task(task.id, title="Renamed")
+        TaskService.bulk_transition_tasks([task.id], 'DONE', org.id)
+        TaskService.delete_task(task.id)
+        
+        events = TaskEvent.objects.filter(task_id=task.id).values_list(
+            'kind', 'from_status', 'to_status', 'assignee_email'
+        )
+        assert list(events) == [
+            ('CREATED', '', 'TODO', "a@example.com"),
+            ('UPDATED', 'TODO', 'IN_PROGRESS', "a@example.com"),
+            ('UPDATED', 'IN_PROGRESS', 'IN_PROGRESS', "a@example.com"),
+            ('UPDATED', 'IN_PROGRESS', 'DONE', "a@example.com"),
+            ('DELETED', 'DONE', '', "a@example.com"),
+        ]
+
+
+@pytest.mark.django_db
+class TestFlowMetrics:
+    """Test cycle time, lead time and throughput from the event log."""
+    
+    def _log(self, project, task_id, assignee, *changes):
+        from datetime import datetime
+        from django.utils import timezone
+        from apps.tasks.models import TaskEvent
+        
+        previous = ''
+        for index, (status, day, hour) in enumerate(changes):
+            TaskEvent.objects.create(
+                task_id=task_id, project=project, kind='UPDATED' if index else 'CREATED',
+                from_status=previous, to_status=status, assignee_email=assignee,
+                occurred_at=timezone.make_aware(datetime(2026, 3, day, hour)),
+            )
+            previous = status
+    
+    def test_metrics(self):
+        """Test only tasks finished in the range count, with per-week and per-assignee figures."""
+        from datetime import date
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = Project.objects.create(organization=org, name="Test Project")
+        self._log(project, 1, "a@example.com", ('TODO', 2, 9), ('IN_PROGRESS', 3, 9), ('DONE', 4, 9))
+        self._log(project, 2, "b@example.com", ('TODO', 2, 9), ('DONE', 2, 21))
+        self._log(project, 3, "a@example.com", ('TODO', 9, 9), ('IN_PROGRESS', 9, 10), ('DONE', 10, 10))
+        # Reopened, finished before the range, finished after it
+        self._log(project, 4, "a@example.com", ('TODO', 2, 9), ('DONE', 3, 9), ('TODO', 5, 9))
+        self._log(project, 5, "a@example.com", ('TODO', 1, 9), ('DONE', 1, 10))
+        self._log(project, 6, "a@example.com", ('TODO', 2, 9), ('DONE', 20, 9))
+        
+        metrics = TaskService.get_flow_metrics(project.id, date(2026, 3, 2), date(2026, 3, 15))
+        
+        assert metrics['completed_tasks'] == 3
+        assert metrics['cycle_time_hours'] == {'p50': 24.0, 'p85': 24.0, 'p95': 24.0}
+        assert metrics['lead_time_hours']['p50'] == 25.0
+        assert metrics['weekly_throughput'] == [
+            {'week_start': date(2026, 3, 2), 'completed_tasks': 2},
+            {'week_start': date(2026, 3, 9), 'completed_tasks': 1},
+        ]
+        assert metrics['assignees'] == [
+            {'assignee_email': "a@example.com", 'completed_tasks': 2,
+             'cycle_time_hours': {'p50': 24.0, 'p85': 24.0, 'p95': 24.0}},
+            {'assignee_email': "b@example.com", 'completed_tasks': 1,
+             'cycle_time_hours': {'p50': 12.0, 'p85': 12.0, 'p95': 12.0}},
+        ]
+    
+    def test_empty_range(self):
+        """Test a range without completed tasks has no percentiles and zero throughput."""
+        from datetime import date
+        
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = Project.objects.create(organization=org, name="Test Project")
+        
+        metrics = TaskService.get_flow_metrics(project.id, date(2026, 3, 4), date(2026, 3, 4))
+        
+        assert metrics == {
+            'project_id': project.id,
+            'completed_tasks': 0,
+            'cycle_time_hours': None,
+            'lead_time_hours': None,
+            'weekly_throughput': [{'week_start': date(2026, 3, 2), 'completed_tasks': 0}],
+            'assignees': [],
+        }
+        with pytest.raises(ValueError):
+            TaskService.get_flow_metrics(project.id, date(2026, 3, 4), date(2026, 3, 3))
+
+
+@pytest.mark.django_db
+class TestDueDates:
+    """Test next due dates of projects and the overdue and due-soon lookups."""
+    
+    @pytest.fixture
+    def project(self):
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        return Project.objects.create(organization=org, name="Test Project")
+    
+    def _next_due_date(self, project):
+        project.refresh_from_db()
+        return project.next_due_date
+    
+    def test_next_due_date_follows_writes(self, project):
+        """Test the earliest open due date is kept up to date by every task write."""
+        from datetime import timedelta
+        from django.utils import timezone
+        
+        now = timezone.now()
+        soon = TaskService.create_task(project.id, "Soon", due_date=now + timedelta(days=1))
+        later = TaskService.create_task(project.id, "Later", due_date=now + timedelta(days=5))
+        TaskService.create_task(project.id, "Undated")
+        assert self._next_due_date(project) == soon.due_date
+        
+        TaskService.update_task(later.id, due_date=now - timedelta(days=1))
+        assert self._next_due_date(project) == now - timedelta(days=1)
+        
+        TaskService.bulk_transition_tasks([later.id], 'DONE', project.organization_id)
+        assert self._next_due_date(project) == soon.due_date
+        
+        TaskService.bulk_transition_tasks([later.id], 'TODO', project.organization_id)
+        assert self._next_due_date(project) == now - timedelta(days=1)
+        
+        TaskService.update_task(later.id, status='DONE')
+        TaskService.delete_task(soon.id)
+        assert self._next_due_date(project) is None
+    
+    def test_next_due_date_keeps_concurrent_writes(self, project):
+        """Test writes lower the stored next due date instead of recomputing it from their snapshot."""
+        from datetime import timedelta
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from django.utils import timezone
+        
+        now = timezone.now()
+        later = TaskService.create_task(project.id, "Later", due_date=now + timedelta(days=5))
+        # A concurrent writer's earlier due date, from a task this
+        # transaction cannot see
+        Project.objects.filter(id=project.id).update(next_due_date=now)
+        
+        TaskService.create_task(project.id, "Sooner", due_date=now + timedelta(days=3))
+        assert self._next_due_date(project) == now
+        
+        # Closing a task that did not hold the minimum neither recomputes nor changes it
+        with CaptureQueriesContext(connection) as queries:
+            TaskService.update_task(later.id, status='DONE')
+        assert self._next_due_date(project) == now
+        assert not any(
+            query['sql'].startswith('UPDATE "projects"') and 'SELECT' in query['sql']
+            for query in queries
+        )
+    
+    def test_overdue_and_due_between(self, project):
+        """Test only open tasks of the organization in the range are returned, earliest first."""
+        from datetime import timedelta
+        from django.utils import timezone
+        
+        now = timezone.now()
+        other = Project.objects.create(
+            organization=Organization.objects.create(name="Other", slug="other", contact_email="o@example.com"),
+            name="Other Project"
+        )
+        late = TaskService.create_task(project.id, "Late", due_date=now - timedelta(days=2))
+        later = TaskService.create_task(project.id, "Later", due_date=now - timedelta(days=1), status='IN_PROGRESS')
+        TaskService.create_task(project.id, "Done", due_date=now - timedelta(days=3), status='DONE')
+        soon = TaskService.create_task(project.id, "Soon", due_date=now + timedelta(days=1))
+        TaskService.create_task(project.id, "Next month", due_date=now + timedelta(days=30))
+        TaskService.create_task(other.id, "Foreign", due_date=now - timedelta(days=2))
+        
+        overdue = TaskService.get_overdue_tasks(project.organization_id, now)
+        assert list(overdue) == [late, later]
+        due_soon = TaskService.get_open_tasks_due_between(project.organization_id, now, now + timedelta(days=7))
+        assert list(due_soon) == [soon]
+    
+    def test_lookups_use_the_partial_index(self, project):
+        """Test the open-task filter matches the partial index's predicate."""
+        from django.db import connection
+        from django.utils import timezone
+        
+        queryset = TaskService.get_overdue_tasks(project.organization_id, timezone.now())
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+            cursor.execute("SET LOCAL enable_seqscan = on")
+        assert 'tasks_open_due_idx' in plan
+
+
+@pytest.mark.django_db
+class TestWorkload:
+    """Test assignee lookups and workload counts."""
+    
+    @pytest.fixture
+    def project(self):
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        return Project.objects.create(organization=org, name="Test Project")
+    
+    def test_tasks_by_assignee(self, project):
+        """Test only the assignee's tasks in the organization are returned."""
+        other = Project.objects.create(
+            organization=Organization.objects.create(name="Other", slug="other", contact_email="o@example.com"),
+            name="Other Project"
+        )
+        mine = TaskService.create_task(project.id, "Mine", assignee_email="a@example.com")
+        done = TaskService.create_task(project.id, "Done", assignee_email="a@example.com", status='DONE')
+        TaskService.create_task(project.id, "Theirs", assignee_email="b@example.com")
+        TaskService.create_task(other.id, "Foreign", assignee_email="a@example.com")
+        
+        tasks = TaskService.get_tasks_by_assignee(project.organization_id, "a@example.com")
+        assert set(tasks) == {mine, done}
+        tasks = TaskService.get_tasks_by_assignee(project.organization_id, "a@example.com", 'DONE')
+        assert list(tasks) == [done]
+    
+    def test_workload_counts_open_tasks(self, project, django_assert_num_queries):
+        """Test open tasks are counted per assignee, status and priority in one query."""
+        for status, priority in [('TODO', 'HIGH'), ('TODO', 'HIGH'), ('IN_PROGRESS', 'LOW'), ('DONE', 'LOW')]:
+            TaskService.create_task(
+                project.id, "Task", status=status, priority=priority, assignee_email="a@example.com"
+            )
+        TaskService.create_task(project.id, "Unassigned")
+        
+        with django_assert_num_queries(1):
+            workload = TaskService.get_workload(project.organization_id)
+        
+        assert [entry['assignee_email'] for entry in workload] == ["a@example.com", ""]
+        busiest = workload[0]
+        assert busiest['open_tasks'] == 3
+        assert busiest['by_status'] == [
+            {'status': 'TODO', 'count': 2}, {'status': 'IN_PROGRESS', 'count': 1}
+        ]
+        assert busiest['by_priority'] == [
+            {'priority': 'LOW', 'count': 1},
+            {'priority': 'MEDIUM', 'count': 0},
+            {'priority': 'HIGH', 'count': 2},
+            {'priority': 'URGENT', 'count': 0},
+        ]
+        assert workload[1]['open_tasks'] == 1
+    
+    def test_assignee_lookup_uses_the_index(self, project):
+        """Test the assignee filter reads the assignee and status index."""
+        from django.db import connection
+        
+        # With statistics of a team's tasks rather than an empty table, the
+        # planner does not fall back to walking the created_at index
+        Task.objects.bulk_create([
+            Task(project=project, title="Task", assignee_email=f"user{index % 50}@example.com")
+            for index in range(2000)
+        ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE tasks")
+        queryset = TaskService.get_tasks_by_assignee(project.organization_id, "a@example.com", 'TODO')
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+            cursor.execute("SET LOCAL enable_seqscan = on")
+        assert 'tasks_assigne_ee92a2_idx' in plan
+
+
+@pytest.mark.django_db
+class TestPartialUpdates:
+    """Test narrow updates and version checks."""
+    
+    @pytest.fixture
+    def task(self):
+        org = Organization.objects.create(name="Test Org", slug="test-org", contact_email="test@example.com")
+        project = Project.objects.create(organization=org, name="Test Project")
+        return TaskService.create_task(project.id, "Task")
+    
+    def test_update_writes_only_changed_columns(self, task):
+        """Test the UPDATE sets the changed fields, updated_at and version only."""
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        
+        with CaptureQueriesContext(connection) as queries:
+            updated = TaskService.update_task(task.id, title="Renamed", description="")
+        
+        task_updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "tasks"')]
+        assert len(task_updates) == 1
+        set_clause = task_updates[0].split(' WHERE ')[0]
+        assert '"title"' in set_clause and '"version"' in set_clause
+        assert '"description"' not in set_clause and '"status"' not in set_clause
+        assert updated.version == 2
+        task.refresh_from_db()
+        assert (task.title, task.version) == ("Renamed", 2)
+    
+    def test_unchanged_values_write_nothing(self, task, monkeypatch, django_capture_on_commit_callbacks):
+        """Test an update that changes no field writes, logs and publishes nothing."""
+        from apps.organizations.services import OrganizationService
+        from apps.projects.services import ProjectService
+        from apps.tasks.models import TaskEvent
+        
+        broker = RecordingBroker()
+        monkeypatch.setattr('apps.core.events._broker', broker)
+        organization = task.project.organization
+        organization.refresh_from_db()
+        
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            updated = TaskService.update_task(task.id, title="Task", expected_version=1)
+            OrganizationService.update_organization(organization.id, name=organization.name)
+            ProjectService.update_project(task.project_id, name=task.project.name)
+        
+        assert updated.version == 1
+        assert TaskEvent.objects.filter(task_id=task.id, kind='UPDATED').count() == 0
+        assert not callbacks and not broker.events
+        data_version = organization.data_version
+        organization.refresh_from_db()
+        assert organization.data_version == data_version
+        with pytest.raises(ConcurrentUpdateError):
+            TaskService.update_task(task.id, title="Task", expected_version=2)
+    
+    def test_stale_version_conflicts(self, task):
+        """Test an update with an outdated version is rejected and changes nothing."""
+        TaskService.update_task(task.id, expected_version=1, status='IN_PROGRESS')
+        with pytest.raises(ConcurrentUpdateError):
+            TaskService.update_task(task.id, expected_version=1, status='DONE')
+        
+        task.refresh_from_db()
+        assert (task.status, task.version) == ('IN_PROGRESS', 2)
+        task.project.refresh_from_db()
+        assert (task.project.in_progress_task_count, task.project.done_task_count) == (1, 0)
+    
+    def test_bulk_transition_bumps_version(self, task):
+        """Test tasks moved in bulk get a new version, so stale edits conflict."""
+        TaskService.bulk_transition_tasks([task.id], 'IN_PROGRESS', task.project.organization_id)
+        with pytest.raises(ConcurrentUpdateError):
+            TaskService.update_task(task.id, expected_version=1, title="Stale")
+        assert TaskService.update_task(task.id, expected_version=2, title="Fresh").version == 3
+
+
+@pytest.mark.django_db(transaction=True)
+class TestConcurrentWrites:
+    """Test task writes racing each other on separate connections."""
+    
+    @pytest.fixture
+    def project(self):
+        organization = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        return Project.objects.create(organization=organization, name="Test Project")
+    
+    def _start(self, target):
+        """Run target in a thread, on its own database connection."""
+        import threading
+        from django.db import connection
+        
+        outcome = {}
+        
+        def run():
+            try:
+                outcome['result'] = target()
+            except Exception as e:
+                outcome['error'] = e
+            finally:
+                connection.close()
+        
+        thread = threading.Thread(target=run)
+        thread.start()
+        return thread, outcome
+    
+    def _wait_for_lock_wait(self):
+        """Wait until some connection is blocked on a lock."""
+        import time
+        from django.db import connection
+        
+        deadline = time.monotonic() + 5
+        with connection.cursor() as cursor:
+            while time.monotonic() < deadline:
+                cursor.execute(
+                    "SELECT count(*) FROM pg_stat_activity "
+                    "WHERE datname = current_database() AND wait_event_type = 'Lock'"
+                )
+                if cursor.fetchone()[0]:
+                    return
+                time.sleep(0.01)
+        raise AssertionError("No connection is waiting for a lock")
+    
+    def _race(self, writer, bulk):
+        """
+        Run writer until it holds its locks, then bulk, then let writer commit.
+        
+        writer gets two events: one to set once it holds its locks and one
+        to wait on before committing.
+        """
+        import threading
+        
+        locked, release = threading.Event(), threading.Event()
+        writer_thread, writer_outcome = self._start(lambda: writer(locked, release))
+        assert locked.wait(5)
+        bulk_thread, bulk_outcome = self._start(bulk)
+        try:
+            self._wait_for_lock_wait()
+        finally:
+            release.set()
+            writer_thread.join(10)
+            bulk_thread.join(10)
+        for outcome in (writer_outcome, bulk_outcome):
+            if 'error' in outcome:
+                raise outcome['error']
+        return bulk_outcome['result']
+    
+    def test_bulk_transition_counts_concurrently_changed_status(self, project):
+        """Test a bulk move counts a task by the status a concurrent write left it in."""
+        from django.db import transaction
+        
+        task = TaskService.create_task(project.id, "Task", status='DONE')
+        
+        def writer(locked, release):
+            with transaction.atomic():
+                TaskService.update_task(task.id, status='IN_PROGRESS')
+                locked.set()
+                release.wait(5)
+        
+        updated, rejected = self._race(
+            writer,
+            lambda: TaskService.bulk_transition_tasks([task.id], 'TODO', project.organization_id),
+        )
+        
+        assert updated == [task.id]
+        project.refresh_from_db()
+        organization = project.organization
+        organization.refresh_from_db()
+        counts = ('todo_task_count', 'in_progress_task_count', 'done_task_count')
+        assert tuple(getattr(project, field) for field in counts) == (1, 0, 0)
+        assert tuple(getattr(organization, field) for field in counts) == (1, 0, 0)
+    
+    def test_bulk_transition_to_done_locks_tasks_before_projects(self, project):
+        """Test a bulk move to DONE takes its locks in the order single-task writes do."""
+        from django.db import transaction
+        
+        task = TaskService.create_task(project.id, "Task")
+        
+        def writer(locked, release):
+            # update_task locks the task, then writes the project
+            with transaction.atomic():
+                Task.objects.select_for_update().get(id=task.id)
+                locked.set()
+                release.wait(5)
+                TaskService.update_task(task.id, status='IN_PROGRESS')
+        
+        updated, rejected = self._race(
+            writer,
+            lambda: TaskService.bulk_transition_tasks([task.id], 'DONE', project.organization_id),
+        )
+        
+        assert updated == [task.id]
+        project.refresh_from_db()
+        assert (project.in_progress_task_count, project.done_task_count) == (0, 1)
+    
+    def test_recount_keeps_concurrent_increments(self, project):
+        """Test a recount does not overwrite counter increments committed while it runs."""
+        from django.db import transaction
+        from apps.projects.services import ProjectService
+        
+        TaskService.create_task(project.id, "Task")
+        # Drift, e.g. from a row written outside the services
+        Project.objects.filter(id=project.id).update(todo_task_count=5)
+        
+        def writer(locked, release):
+            with transaction.atomic():
+                TaskService.create_task(project.id, "Concurrent")
+                locked.set()
+                release.wait(5)
+        
+        self._race(writer, ProjectService.recount_task_counts)
+        
+        project.refresh_from_db()
+        assert project.todo_task_count == 2
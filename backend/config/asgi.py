@@ -1,5 +1,8 @@
 """
 ASGI config for project management system.
+
+HTTP goes to Django; WebSocket connections to /graphql/ serve GraphQL
+subscriptions.
 """
 
 import os
@@ -7,6 +10,20 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.development')
+# Under ASGI, serve /graphql/ with the async view unless told otherwise
+os.environ.setdefault('GRAPHQL_ASYNC', 'True')
+
+django_application = get_asgi_application()
+
+# Imported once Django is set up
+from graphql_api.schema import schema  # noqa: E402
+from graphql_api.websocket import GraphQLWebSocketApp  # noqa: E402
+
+websocket_application = GraphQLWebSocketApp(schema, path='/graphql/')
 
-application = get_asgi_application()
 
+async def application(scope, receive, send):
+    if scope['type'] == 'websocket':
+        await websocket_application(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
@@ -94,11 +94,100 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 # Default primary key field type
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Keyset pagination: page size when 'first' is omitted, and the hard cap
+GRAPHQL_DEFAULT_PAGE_SIZE = env.int('GRAPHQL_DEFAULT_PAGE_SIZE', default=20)
+GRAPHQL_MAX_PAGE_SIZE = env.int('GRAPHQL_MAX_PAGE_SIZE', default=100)
+
+# Number of parsed and validated GraphQL documents kept in memory
+GRAPHQL_DOCUMENT_CACHE_SIZE = env.int('GRAPHQL_DOCUMENT_CACHE_SIZE', default=256)
+
+# Automatic persisted queries: hashes registered by clients are kept in this
+# cache; the frontend's operations are known from startup
+GRAPHQL_PERSISTED_QUERIES_CACHE = 'default'
+GRAPHQL_PERSISTED_QUERIES_SEED_DIRS = [BASE_DIR.parent / 'frontend' / 'src' / 'graphql']
+
+# max-age for successful GET queries; 0 makes caches revalidate with the ETag
+GRAPHQL_GET_CACHE_MAX_AGE = env.int('GRAPHQL_GET_CACHE_MAX_AGE', default=0)
+
+# ETags from per-organization data versions on every query response;
+# If-None-Match is answered with 304 without executing the query
+GRAPHQL_CONDITIONAL_REQUESTS = env.bool('GRAPHQL_CONDITIONAL_REQUESTS', default=True)
+
+# Query cost analysis: objects cost 1 each (scalars 0) times the expected
+# list sizes; GRAPHQL_FIELD_COSTS overrides weights as {'Type.field': cost}
+GRAPHQL_MAX_QUERY_COST = env.int('GRAPHQL_MAX_QUERY_COST', default=10000)
+GRAPHQL_MAX_QUERY_DEPTH = env.int('GRAPHQL_MAX_QUERY_DEPTH', default=10)
+GRAPHQL_COST_DEFAULT_LIST_SIZE = env.int('GRAPHQL_COST_DEFAULT_LIST_SIZE', default=50)
+GRAPHQL_COST_ENFORCE = env.bool('GRAPHQL_COST_ENFORCE', default=True)
+GRAPHQL_FIELD_COSTS = {
+    'Query.organizationStats': 5,
+    'Query.organizationsStats': 5,
+    'Query.projectStats': 5,
+    'Query.projectFlowMetrics': 10,
+}
+
+# Resolver and SQL metrics, exposed at /metrics. Operation names are
+# client-supplied, so distinct names beyond the cap are folded into 'other'.
+# Clients sending 'X-DB-Stats: 1' get X-DB-Queries/X-DB-Time response headers.
+GRAPHQL_METRICS_MAX_OPERATIONS = env.int('GRAPHQL_METRICS_MAX_OPERATIONS', default=200)
+GRAPHQL_METRICS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+GRAPHQL_DB_STATS_HEADERS = env.bool('GRAPHQL_DB_STATS_HEADERS', default=True)
+
+# Most operations accepted in one POST sent as a JSON array; 0 disables batching
+GRAPHQL_MAX_BATCH_SIZE = env.int('GRAPHQL_MAX_BATCH_SIZE', default=10)
+
+# Serve /graphql/ with the async view; enable when running under ASGI
+GRAPHQL_ASYNC = env.bool('GRAPHQL_ASYNC', default=False)
+
+# Change events behind GraphQL subscriptions. InProcessBroker only reaches
+# subscribers in the publishing process; with several ASGI workers use
+# 'apps.core.events.PostgresBroker' (LISTEN/NOTIFY)
+EVENT_BROKER = env('EVENT_BROKER', default='apps.core.events.InProcessBroker')
+EVENT_QUEUE_SIZE = env.int('EVENT_QUEUE_SIZE', default=100)
+GRAPHQL_WS_CONNECTION_INIT_TIMEOUT = env.int('GRAPHQL_WS_CONNECTION_INIT_TIMEOUT', default=3)
+
+# Cache of tenant-scoped data: per-organization generations bumped by
+# service writes, and the GraphQL result cache. Local memory is per
+# process; point TENANT_CACHE_BACKEND at FileBasedCache (with a directory
+# as TENANT_CACHE_LOCATION) to share entries between processes on a host
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'tenant': {
+        'BACKEND': env(
+            'TENANT_CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': env('TENANT_CACHE_LOCATION', default='tenant'),
+        'OPTIONS': {'MAX_ENTRIES': env.int('TENANT_CACHE_MAX_ENTRIES', default=5000)},
+    },
+}
+TENANT_CACHE = 'tenant'
+
+# Root query fields whose results are cached when scoped by organizationId;
+# entries are fresh for TTL seconds, then served stale for STALE_TTL more
+# while a background refresh runs
+GRAPHQL_RESULT_CACHE_FIELDS = env.list(
+    'GRAPHQL_RESULT_CACHE_FIELDS',
+    default=['organizationStats', 'organizationsStats', 'projects', 'tasksByOrganization'],
+)
+GRAPHQL_RESULT_CACHE_TTL = env.int('GRAPHQL_RESULT_CACHE_TTL', default=60)
+GRAPHQL_RESULT_CACHE_STALE_TTL = env.int('GRAPHQL_RESULT_CACHE_STALE_TTL', default=30)
+
+# Rows per INSERT statement in bulk task creation
+TASK_BULK_CREATE_BATCH_SIZE = env.int('TASK_BULK_CREATE_BATCH_SIZE', default=1000)
+
+# Rows per INSERT statement in bulk organization onboarding
+ORGANIZATION_BULK_CREATE_BATCH_SIZE = env.int('ORGANIZATION_BULK_CREATE_BATCH_SIZE', default=1000)
+
 # Graphene settings
 GRAPHENE = {
     'SCHEMA': 'graphql_api.schema.schema',
     'MIDDLEWARE': [
-        'graphene_django.debug.DjangoDebugMiddleware',
+        'graphql_api.optimizer.QueryOptimizerMiddleware',
+        'graphql_api.execution.AsyncExecutionMiddleware',
+        'graphql_api.loaders.DataLoaderMiddleware',
+        'graphql_api.metrics.MetricsMiddleware',
     ],
 }
 
@@ -1,14 +1,18 @@
 """
 URL configuration for project management system.
-Only /admin and /graphql endpoints.
+/admin, /graphql and the Prometheus /metrics endpoint.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
 from django.views.decorators.csrf import csrf_exempt
-from graphene_django.views import GraphQLView
+from graphql_api.views import AsyncGraphQLView, GraphQLView, metrics_view
+
+graphql_view = AsyncGraphQLView if settings.GRAPHQL_ASYNC else GraphQLView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('graphql/', csrf_exempt(GraphQLView.as_view(graphiql=True))),
+    path('graphql/', csrf_exempt(graphql_view.as_view(graphiql=True))),
+    path('metrics', metrics_view),
 ]
 
@@ -8,14 +8,23 @@ from django.conf import settings
 @pytest.fixture(scope='session')
 def django_db_setup():
     """Set up test database."""
-    settings.DATABASES['default'] = {
+    # Update in place so the defaults Django filled in (ATOMIC_REQUESTS, ...)
+    # survive for tests that go through the request handler
+    settings.DATABASES['default'].update({
         'ENGINE': 'django.db.backends.postgresql',
         'NAME': 'test_project_management_db',
-        'USER': settings.DATABASES['default']['USER'],
-        'PASSWORD': settings.DATABASES['default']['PASSWORD'],
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+    })
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty caches, so no result leaks between tests."""
+    from django.core.cache import caches
+    
+    for cache in caches.all():
+        cache.clear()
 
 
 @pytest.fixture
@@ -37,12 +46,12 @@ def organization_factory():
 
 @pytest.fixture
 def project_factory():
-    """Factory for creating test projects."""
-    from apps.projects.models import Project
+    """Factory for creating test projects, through the service so counters stay right."""
+    from apps.projects.services import ProjectService
     
     def create_project(organization, name="Test Project", status="ACTIVE"):
-        return Project.objects.create(
-            organization=organization,
+        return ProjectService.create_project(
+            organization_id=organization.id,
             name=name,
             status=status
         )
@@ -52,12 +61,12 @@ def project_factory():
 
 @pytest.fixture
 def task_factory():
-    """Factory for creating test tasks."""
-    from apps.tasks.models import Task
+    """Factory for creating test tasks, through the service so counters stay right."""
+    from apps.tasks.services import TaskService
     
     def create_task(project, title="Test Task", status="TODO"):
-        return Task.objects.create(
-            project=project,
+        return TaskService.create_task(
+            project_id=project.id,
             title=title,
             status=status
         )
@@ -0,0 +1,218 @@
+"""
+Static query cost and depth analysis.
+
+Every object a query can return costs its field weight (1 unless
+overridden in GRAPHQL_FIELD_COSTS), multiplied by the number of items the
+enclosing lists are expected to hold: the requested ``first`` for
+connections, the requested ``first`` or GRAPHQL_MAX_PAGE_SIZE for capped
+lists, GRAPHQL_COST_DEFAULT_LIST_SIZE for other lists. Scalars
+are free unless weighted. The estimate runs before execution so nested
+``organization -> projects -> tasks -> comments`` fan-outs are rejected
+up front; the actual cost is measured afterwards from the result data.
+"""
+from django.conf import settings
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    InlineFragmentNode,
+    IntValueNode,
+    OperationType,
+    VariableNode,
+    get_named_type,
+    get_nullable_type,
+    is_composite_type,
+    is_list_type,
+)
+from graphene.relay import Connection
+
+
+class QueryTooComplexError(GraphQLError):
+    """Raised when an operation exceeds the cost or depth budget."""
+
+    def __init__(self, message, **extensions):
+        super().__init__(message, extensions={'code': 'QUERY_TOO_COMPLEX', **extensions})
+
+
+def _get_root_type(schema, operation):
+    if operation.operation == OperationType.MUTATION:
+        return schema.mutation_type
+    if operation.operation == OperationType.SUBSCRIPTION:
+        return schema.subscription_type
+    return schema.query_type
+
+
+def _is_connection(graphql_type) -> bool:
+    graphene_type = getattr(get_named_type(graphql_type), 'graphene_type', None)
+    return isinstance(graphene_type, type) and issubclass(graphene_type, Connection)
+
+
+class CostAnalyzer:
+    """Estimates and measures the cost of one GraphQL operation."""
+
+    def __init__(self, schema, document, operation, variables=None):
+        self.schema = schema
+        self.operation = operation
+        self.variables = variables or {}
+        self.fragments = {
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        }
+        self.field_costs = getattr(settings, 'GRAPHQL_FIELD_COSTS', {})
+        self.default_list_size = getattr(settings, 'GRAPHQL_COST_DEFAULT_LIST_SIZE', 50)
+        self.default_page_size = getattr(settings, 'GRAPHQL_DEFAULT_PAGE_SIZE', 20)
+        self.max_page_size = getattr(settings, 'GRAPHQL_MAX_PAGE_SIZE', 100)
+
+    def estimate(self) -> tuple:
+        """
+        Estimate the operation's cost from its selections and arguments.
+
+        Returns:
+            Tuple of (estimated cost, maximum depth)
+        """
+        root_type = _get_root_type(self.schema, self.operation)
+        return self._estimate(self.operation.selection_set, root_type)
+
+    def measure(self, data) -> int:
+        """
+        Measure the cost of the data an execution actually returned.
+
+        Args:
+            data: ``ExecutionResult.data``
+
+        Returns:
+            Actual cost
+        """
+        if not data:
+            return 0
+        root_type = _get_root_type(self.schema, self.operation)
+        return self._measure(self.operation.selection_set, root_type, data)
+
+    def _fields(self, selection_set, parent_type):
+        """Yield (field node, parent type) pairs, flattening fragments."""
+        for selection in selection_set.selections:
+            if isinstance(selection, FieldNode):
+                if not selection.name.value.startswith('__'):
+                    yield selection, parent_type
+            elif isinstance(selection, (InlineFragmentNode, FragmentSpreadNode)):
+                fragment = selection
+                if isinstance(selection, FragmentSpreadNode):
+                    fragment = self.fragments.get(selection.name.value)
+                    if fragment is None:
+                        continue
+                fragment_type = parent_type
+                if fragment.type_condition is not None:
+                    fragment_type = self.schema.get_type(fragment.type_condition.name.value)
+                yield from self._fields(fragment.selection_set, fragment_type)
+
+    def _weight(self, parent_type, field_name, field_type) -> int:
+        key = f'{parent_type.name}.{field_name}'
+        if key in self.field_costs:
+            return self.field_costs[key]
+        return 1 if is_composite_type(get_named_type(field_type)) else 0
+
+    def _argument(self, field_node, name):
+        for argument in field_node.arguments or ():
+            if argument.name.value != name:
+                continue
+            if isinstance(argument.value, VariableNode):
+                return self.variables.get(argument.value.name.value)
+            if isinstance(argument.value, IntValueNode):
+                return int(argument.value.value)
+        return None
+
+    def _page_size(self, field_node) -> int:
+        first = self._argument(field_node, 'first')
+        if first is None:
+            return self.default_page_size
+        return max(1, min(first, self.max_page_size))
+
+    def _list_size(self, field, field_node) -> int:
+        if 'first' not in field.args:
+            return self.default_list_size
+        first = self._argument(field_node, 'first')
+        if first is None:
+            return self.max_page_size
+        return max(1, min(first, self.max_page_size))
+
+    def _estimate(self, selection_set, parent_type, page_size=None) -> tuple:
+        cost, depth = 0, 0
+        for field_node, field_parent in self._fields(selection_set, parent_type):
+            field = field_parent.fields.get(field_node.name.value)
+            if field is None:
+                continue
+            weight = self._weight(field_parent, field_node.name.value, field.type)
+            named_type = get_named_type(field.type)
+            if field_node.selection_set is None or not is_composite_type(named_type):
+                cost += weight
+                depth = max(depth, 1)
+                continue
+
+            child_page_size = self._page_size(field_node) if _is_connection(field.type) else None
+            child_cost, child_depth = self._estimate(
+                field_node.selection_set, named_type, child_page_size
+            )
+            if is_list_type(get_nullable_type(field.type)):
+                items = page_size if page_size is not None else self._list_size(field, field_node)
+            else:
+                items = 1
+            cost += items * (weight + child_cost)
+            depth = max(depth, child_depth + 1)
+        return cost, depth
+
+    def _measure(self, selection_set, parent_type, data) -> int:
+        cost = 0
+        for field_node, field_parent in self._fields(selection_set, parent_type):
+            field = field_parent.fields.get(field_node.name.value)
+            key = field_node.alias.value if field_node.alias else field_node.name.value
+            if field is None or not isinstance(data, dict) or data.get(key) is None:
+                continue
+            weight = self._weight(field_parent, field_node.name.value, field.type)
+            named_type = get_named_type(field.type)
+            if field_node.selection_set is None or not is_composite_type(named_type):
+                cost += weight
+                continue
+
+            value = data[key]
+            for item in value if isinstance(value, list) else [value]:
+                if item is not None:
+                    cost += weight + self._measure(field_node.selection_set, named_type, item)
+        return cost
+
+
+def check_cost(analyzer: CostAnalyzer) -> int:
+    """
+    Estimate an operation's cost and enforce the configured limits.
+
+    Args:
+        analyzer: CostAnalyzer for the operation
+
+    Returns:
+        Estimated cost
+
+    Raises:
+        QueryTooComplexError: If the operation exceeds GRAPHQL_MAX_QUERY_COST
+            or GRAPHQL_MAX_QUERY_DEPTH while GRAPHQL_COST_ENFORCE is on
+    """
+    cost, depth = analyzer.estimate()
+    if not getattr(settings, 'GRAPHQL_COST_ENFORCE', True):
+        return cost
+
+    max_depth = getattr(settings, 'GRAPHQL_MAX_QUERY_DEPTH', None)
+    if max_depth and depth > max_depth:
+        raise QueryTooComplexError(
+            f"Query depth {depth} exceeds the maximum of {max_depth}",
+            depth=depth,
+            maxDepth=max_depth,
+        )
+
+    max_cost = getattr(settings, 'GRAPHQL_MAX_QUERY_COST', None)
+    if max_cost and cost > max_cost:
+        raise QueryTooComplexError(
+            f"Query cost {cost} exceeds the maximum of {max_cost}",
+            cost=cost,
+            maxCost=max_cost,
+        )
+    return cost
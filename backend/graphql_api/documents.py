@@ -0,0 +1,117 @@
+"""
+Cache of parsed and validated GraphQL documents.
+
+The frontend sends the same few dozen operations over and over; parsing
+and validating them against the merged schema is pure CPU, so results
+are kept in a bounded LRU keyed by the hash of the query text.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from graphql import parse, validate
+
+
+def hash_document(query: str) -> str:
+    """
+    Hash a GraphQL query string.
+
+    Args:
+        query: GraphQL document source
+
+    Returns:
+        Hex SHA-256 digest of the source
+    """
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+class CachedDocument:
+    """A parsed document and the errors validating it produced."""
+
+    __slots__ = ('document', 'errors')
+
+    def __init__(self, document, errors):
+        self.document = document
+        self.errors = errors
+
+
+class DocumentCache:
+    """Thread-safe LRU cache of parsed and validated documents."""
+
+    def __init__(self, max_size: int = 256):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, schema, query: str, validation_rules=None, max_errors=None) -> CachedDocument:
+        """
+        Get the parsed and validated form of a query.
+
+        Args:
+            schema: GraphQL schema to validate against
+            query: GraphQL document source
+            validation_rules: Optional validation rules, defaults to the spec rules
+            max_errors: Optional cap on reported validation errors
+
+        Returns:
+            CachedDocument for the query
+
+        Raises:
+            GraphQLError: If the query cannot be parsed (not cached)
+        """
+        key = hash_document(query)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        document = parse(query)
+        entry = CachedDocument(document, validate(schema, document, validation_rules, max_errors))
+
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        """Drop every cached document and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with size, max_size, hits, misses and hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_document_cache = None
+
+
+def get_document_cache() -> DocumentCache:
+    """Get the process-wide document cache, sized by GRAPHQL_DOCUMENT_CACHE_SIZE."""
+    global _document_cache
+    if _document_cache is None:
+        _document_cache = DocumentCache(getattr(settings, 'GRAPHQL_DOCUMENT_CACHE_SIZE', 256))
+    return _document_cache
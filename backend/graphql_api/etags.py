@@ -0,0 +1,221 @@
+"""
+Version-based ETags for read operations.
+
+Every service write bumps ``Organization.data_version``, so a query's
+result can only change when the versions of the organizations it reads
+change. The ETag of a query is a hash of its document, operation name,
+variables and those versions; it is computed before execution, so a
+client revalidating with ``If-None-Match`` gets 304 without any resolver
+running.
+
+The organizations a query reads are found from the arguments of its root
+fields (ROOT_FIELD_SCOPES). Root fields that are not scoped to an
+organization, or whose scoping lookup finds nothing, depend on every
+organization and use a version derived from all of them.
+"""
+import hashlib
+import json
+
+from django.db.models import Count, Max, Sum
+from django.utils.http import quote_etag
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    InlineFragmentNode,
+    VariableNode,
+    print_schema,
+    value_from_ast_untyped,
+)
+
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.tasks.models import Task
+
+# Root query field -> (argument, what the argument identifies), tried in order
+ROOT_FIELD_SCOPES = {
+    'organization': [('id', 'organization')],
+    'organizationBySlug': [('slug', 'slug')],
+    'organizationStats': [('organizationId', 'organization')],
+    'organizationsStats': [('ids', 'organization')],
+    'projects': [('organizationId', 'organization')],
+    'projectsConnection': [('organizationId', 'organization')],
+    'projectsByOrganization': [('organizationId', 'organization')],
+    'project': [('id', 'project')],
+    'projectStats': [('projectId', 'project')],
+    'projectBurndown': [('projectId', 'project')],
+    'projectFlowMetrics': [('projectId', 'project')],
+    'tasks': [('projectId', 'project'), ('organizationId', 'organization')],
+    'tasksConnection': [('projectId', 'project'), ('organizationId', 'organization')],
+    'tasksByProject': [('projectId', 'project')],
+    'tasksByOrganization': [('organizationId', 'organization')],
+    'tasksDueBetween': [('organizationId', 'organization')],
+    'tasksByAssignee': [('organizationId', 'organization')],
+    'workload': [('organizationId', 'organization')],
+    'task': [('id', 'task')],
+    'taskComments': [('taskId', 'task')],
+    'taskCommentsConnection': [('taskId', 'task')],
+}
+
+# Root query fields whose results change with the current time, not only
+# with data versions; operations selecting them get no version-based ETag
+# and are never served from the result cache
+TIME_DEPENDENT_ROOT_FIELDS = frozenset({'overdueTasks'})
+
+# Lookups returning (key, organization ID, organization data version) rows
+_SCOPE_LOOKUPS = {
+    'organization': lambda keys: (
+        (organization_id, organization_id, version)
+        for organization_id, version in Organization.objects.filter(id__in=keys).values_list(
+            'id', 'data_version'
+        )
+    ),
+    'slug': lambda keys: Organization.objects.filter(slug__in=keys).values_list(
+        'slug', 'id', 'data_version'
+    ),
+    'project': lambda keys: Project.objects.filter(id__in=keys).values_list(
+        'id', 'organization_id', 'organization__data_version'
+    ),
+    'task': lambda keys: Task.objects.filter(id__in=keys).values_list(
+        'id', 'project__organization_id', 'project__organization__data_version'
+    ),
+}
+
+_schema_fingerprints = {}
+
+
+def _schema_fingerprint(schema) -> str:
+    """Hash of the schema, so deploys that change it change every ETag."""
+    key = id(schema)
+    if key not in _schema_fingerprints:
+        _schema_fingerprints[key] = hashlib.sha256(print_schema(schema).encode()).hexdigest()
+    return _schema_fingerprints[key]
+
+
+def _fields(selection_set, fragments):
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from _fields(selection.selection_set, fragments)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                yield from _fields(fragment.selection_set, fragments)
+
+
+def root_fields(document, operation_ast) -> list:
+    """
+    Get the root fields an operation selects, through fragments.
+
+    Args:
+        document: Parsed document
+        operation_ast: The operation
+
+    Returns:
+        List of FieldNode
+    """
+    fragments = {
+        definition.name.value: definition
+        for definition in document.definitions
+        if isinstance(definition, FragmentDefinitionNode)
+    }
+    return list(_fields(operation_ast.selection_set, fragments))
+
+
+def _argument_value(field, name, variables):
+    for argument in field.arguments or ():
+        if argument.name.value == name:
+            if isinstance(argument.value, VariableNode):
+                return variables.get(argument.value.name.value)
+            return value_from_ast_untyped(argument.value, variables)
+    return None
+
+
+def operation_scopes(document, operation_ast, variables) -> dict:
+    """
+    Find what a query's root fields are scoped to.
+
+    Args:
+        document: Parsed document
+        operation_ast: The query operation
+        variables: Operation variables
+
+    Returns:
+        Dict of scope kind ('organization', 'slug', 'project', 'task') to
+        set of keys, or None if some root field reads every organization
+    """
+    scopes = {}
+    for field in root_fields(document, operation_ast):
+        name = field.name.value
+        if name.startswith('__'):
+            continue
+        for argument, kind in ROOT_FIELD_SCOPES.get(name, ()):
+            value = _argument_value(field, argument, variables or {})
+            if isinstance(value, list):
+                scopes.setdefault(kind, set()).update(value)
+                break
+            if value is not None:
+                scopes.setdefault(kind, set()).add(value)
+                break
+        else:
+            return None
+    return scopes
+
+
+def is_time_dependent(document, operation_ast) -> bool:
+    """Whether an operation selects a root field listed in TIME_DEPENDENT_ROOT_FIELDS."""
+    return any(
+        field.name.value in TIME_DEPENDENT_ROOT_FIELDS
+        for field in root_fields(document, operation_ast)
+    )
+
+
+def organization_versions(scopes) -> list:
+    """
+    Look up the data versions a query depends on.
+
+    Args:
+        scopes: Result of ``operation_scopes``
+
+    Returns:
+        Sorted list of (organization ID, data version) pairs; ``[('*', ...)]``
+        summarizing all organizations when the query is unscoped
+    """
+    versions = set()
+    if scopes is not None:
+        for kind, keys in scopes.items():
+            rows = list(_SCOPE_LOOKUPS[kind](keys))
+            if len(rows) < len(keys):
+                # Something the query asks for does not exist (yet)
+                scopes = None
+                break
+            versions.update((organization_id, version) for _, organization_id, version in rows)
+    if scopes is None:
+        summary = Organization.objects.aggregate(
+            count=Count('id'), last=Max('id'), total=Sum('data_version')
+        )
+        return [('*', summary['count'], summary['last'], summary['total'])]
+    return sorted(versions)
+
+
+def compute_etag(schema, document_hash, operation_name, variables, versions) -> str:
+    """
+    Build the ETag of a read operation.
+
+    Args:
+        schema: GraphQL schema
+        document_hash: Hash of the query text
+        operation_name: Executed operation name
+        variables: Operation variables
+        versions: Result of ``organization_versions``
+
+    Returns:
+        Quoted ETag
+    """
+    key = json.dumps(
+        [_schema_fingerprint(schema), document_hash, operation_name, variables or {}, versions],
+        sort_keys=True,
+        default=str,
+    )
+    return quote_etag(hashlib.sha256(key.encode()).hexdigest())
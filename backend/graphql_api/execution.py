@@ -0,0 +1,109 @@
+"""
+Helpers for running the schema under async execution.
+
+``AsyncGraphQLView`` marks the request with ``graphql_async``; resolvers
+and loaders check it with ``is_async`` and return awaitables that use
+Django's async ORM instead of blocking the event loop. graphql-core
+gathers awaitable root fields, so independent root fields of a query
+resolve concurrently.
+
+Most resolvers stay synchronous and return querysets:
+``AsyncExecutionMiddleware`` evaluates those, and lazy foreign-key loads
+the optimizer did not join, off the event loop.
+"""
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, QuerySet
+from graphene.utils.str_converters import to_snake_case
+
+from graphql_api.optimizer import optimize_queryset
+
+
+def is_async(info) -> bool:
+    """Whether the current operation is executing asynchronously."""
+    return getattr(info.context, 'graphql_async', False)
+
+
+def then(value, callback):
+    """
+    Apply a callback to a value that may be awaitable.
+
+    Args:
+        value: Plain value or awaitable
+        callback: Function of the resolved value
+
+    Returns:
+        ``callback(value)``, or an awaitable of it when ``value`` is awaitable
+    """
+    if isawaitable(value):
+        async def chained():
+            return callback(await value)
+        return chained()
+    return callback(value)
+
+
+async def aget_object(queryset: QuerySet, info):
+    """
+    Fetch the single object a root field resolves to, optimized for its selection.
+
+    Args:
+        queryset: Queryset filtered down to the object
+        info: GraphQL resolve info
+
+    Returns:
+        Model instance, or None if it does not exist
+    """
+    return await optimize_queryset(queryset, info).afirst()
+
+
+async def _evaluate(queryset: QuerySet) -> list:
+    return [instance async for instance in queryset]
+
+
+_forward_relations = {}
+
+
+def _forward_relation(model, field_name: str):
+    """The forward FK/one-to-one field a GraphQL field reads, if any."""
+    key = (model, field_name)
+    if key not in _forward_relations:
+        try:
+            field = model._meta.get_field(to_snake_case(field_name))
+        except FieldDoesNotExist:
+            field = None
+        if field is not None and not (
+            field.is_relation and field.concrete and (field.many_to_one or field.one_to_one)
+        ):
+            field = None
+        _forward_relations[key] = field
+    return _forward_relations[key]
+
+
+class AsyncExecutionMiddleware:
+    """
+    Graphene middleware keeping synchronous ORM access off the event loop.
+
+    Under async execution, unevaluated querysets returned by resolvers are
+    fetched with ``async for``, and foreign keys that were not loaded with
+    ``select_related`` are resolved in the request's sync thread. Does
+    nothing for synchronous execution.
+    """
+
+    def resolve(self, next, root, info, **args):
+        if not is_async(info):
+            return next(root, info, **args)
+
+        if isinstance(root, Model):
+            field = _forward_relation(type(root), info.field_name)
+            # A missing attname means the FK column itself was deferred
+            if field is not None and not field.is_cached(root) and (
+                root.__dict__.get(field.attname, True) is not None
+            ):
+                return sync_to_async(next)(root, info, **args)
+
+        result = next(root, info, **args)
+        if isinstance(result, QuerySet) and result._result_cache is None:
+            return _evaluate(result)
+        return result
@@ -0,0 +1,235 @@
+"""
+Request-scoped DataLoaders for batching per-object lookups.
+
+Rather than deferring resolvers, the loaders rely on
+``DataLoaderMiddleware`` announcing every model instance returned by a
+list field. The first ``load()`` for any of those instances then fetches
+the whole announced batch with a single query. ``TaskCommentCountsLoader``
+batches the comment counts of the tasks in a list this way; the project
+and organization counts are read from counter columns instead.
+
+Under sync execution ``load()`` returns the value directly. Under async
+execution it returns an awaitable for keys that are not cached yet;
+sibling loads share the in-flight batch, which runs in the request's sync
+thread.
+"""
+import asyncio
+from collections import defaultdict
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Model, QuerySet
+from graphene.relay import Connection
+
+from apps.tasks.models import Task, TaskComment
+
+
+class DataLoader:
+    """
+    Base class for synchronous, request-scoped batching loaders.
+
+    Subclasses set ``model`` to the model whose primary keys they are
+    keyed by and implement ``batch_load``.
+    """
+    model = None
+
+    def __init__(self, registry):
+        self.registry = registry
+        self._cache = {}
+        self._inflight = {}
+
+    def batch_load(self, keys: list) -> dict:
+        """
+        Load values for many keys at once.
+
+        Args:
+            keys: Keys that are not cached yet
+
+        Returns:
+            Dictionary mapping keys to values; missing keys get ``default()``
+        """
+        raise NotImplementedError
+
+    def default(self, key):
+        """Value used for keys that ``batch_load`` returned nothing for."""
+        return None
+
+    def load(self, key):
+        """
+        Load a single key, batching it with every announced sibling key.
+
+        Args:
+            key: Key to load
+
+        Returns:
+            Loaded value, or an awaitable of it under async execution
+        """
+        if key not in self._cache:
+            if self.registry.is_async:
+                return self._load_async([key], many=False)
+            keys = {key} | self.registry.expected_keys(self.model)
+            self._fetch(keys - self._cache.keys())
+        return self._cache[key]
+
+    def load_many(self, keys) -> list:
+        """
+        Load several keys with at most one batch query.
+
+        Args:
+            keys: Keys to load
+
+        Returns:
+            List of values in the order of ``keys``, or an awaitable of it
+            under async execution
+        """
+        keys = list(keys)
+        if self.registry.is_async and not self._cache.keys() >= set(keys):
+            return self._load_async(keys, many=True)
+        missing = (set(keys) | self.registry.expected_keys(self.model)) - self._cache.keys()
+        if missing:
+            self._fetch(missing)
+        return [self._cache[key] for key in keys]
+
+    def prime(self, key, value):
+        """Store a value for a key without querying."""
+        self._cache.setdefault(key, value)
+
+    def clear(self, key=None):
+        """Forget one cached key, or every key when none is given."""
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key, None)
+
+    def _fetch(self, keys):
+        keys = list(keys)
+        values = self.batch_load(keys)
+        for key in keys:
+            self._cache[key] = values[key] if key in values else self.default(key)
+
+    async def _load_async(self, keys: list, many: bool):
+        """
+        Wait for in-flight batches covering ``keys`` and fetch the rest.
+
+        The batch is collected when the awaitable first runs rather than
+        when ``load()`` is called, by which point graphql-core has
+        completed every sibling list and announced all of its instances.
+        """
+        pending = {self._inflight[key] for key in keys if key in self._inflight}
+        missing = (
+            (set(keys) | self.registry.expected_keys(self.model))
+            - self._cache.keys()
+            - self._inflight.keys()
+        )
+        if missing:
+            future = asyncio.ensure_future(sync_to_async(self._fetch)(missing))
+            future.add_done_callback(lambda _: self._forget(missing))
+            for key in missing:
+                self._inflight[key] = future
+            pending.add(future)
+        await asyncio.gather(*pending)
+        if many:
+            return [self._cache[key] for key in keys]
+        return self._cache[keys[0]]
+
+    def _forget(self, keys):
+        for key in keys:
+            self._inflight.pop(key, None)
+
+
+class LoaderRegistry:
+    """Loaders and announced keys for a single request."""
+
+    def __init__(self, is_async: bool = False):
+        self.is_async = is_async
+        self._loaders = {}
+        self._expected = defaultdict(set)
+
+    def get(self, loader_class):
+        """Get (or create) the request's instance of a loader class."""
+        loader = self._loaders.get(loader_class)
+        if loader is None:
+            loader = self._loaders[loader_class] = loader_class(self)
+        return loader
+
+    def expect(self, instances):
+        """Announce model instances whose keys should be batched together."""
+        for instance in instances:
+            self._expected[type(instance)].add(instance.pk)
+
+    def expected_keys(self, model) -> set:
+        """Keys announced so far for a model."""
+        return self._expected.get(model, set())
+
+
+def get_loaders(info) -> LoaderRegistry:
+    """
+    Get the loader registry bound to the current request.
+
+    Args:
+        info: GraphQL resolve info
+
+    Returns:
+        LoaderRegistry stored on the request context
+    """
+    context = info.context
+    if context is None:
+        return LoaderRegistry()
+
+    registry = getattr(context, 'loaders', None)
+    if registry is None:
+        registry = LoaderRegistry()
+        context.loaders = registry
+    registry.is_async = getattr(context, 'graphql_async', False)
+    return registry
+
+
+def get_loader(info, loader_class) -> DataLoader:
+    """Shortcut for ``get_loaders(info).get(loader_class)``."""
+    return get_loaders(info).get(loader_class)
+
+
+class DataLoaderMiddleware:
+    """
+    Graphene middleware announcing list results to the request's loaders.
+
+    QuerySets are evaluated here; their result cache is reused when the
+    list is completed, so this does not add a query. Connections announce
+    the nodes of their edges. Awaitable results are announced once they
+    resolve.
+    """
+
+    def resolve(self, next, root, info, **args):
+        result = next(root, info, **args)
+        if isawaitable(result):
+            return self._announce_async(result, info)
+        return self._announce(result, info)
+
+    def _announce(self, result, info):
+        if isinstance(result, Connection):
+            get_loaders(info).expect(edge.node for edge in result.edges)
+        elif isinstance(result, (QuerySet, list, tuple)):
+            instances = [obj for obj in result if isinstance(obj, Model)]
+            if instances:
+                get_loaders(info).expect(instances)
+        return result
+
+    async def _announce_async(self, result, info):
+        return self._announce(await result, info)
+
+
+class TaskCommentCountsLoader(DataLoader):
+    """Number of comments per task, keyed by task ID."""
+    model = Task
+
+    def batch_load(self, keys):
+        rows = (
+            TaskComment.objects.filter(task_id__in=keys)
+            .order_by()
+            .values('task_id')
+            .annotate(count=Count('id'))
+        )
+        return {row['task_id']: row['count'] for row in rows}
+
+    def default(self, key):
+        return 0
@@ -0,0 +1,407 @@
+"""
+Resolver timing and SQL metrics.
+
+``MetricsMiddleware`` times every resolver that does real work (default
+resolvers of scalar attributes are skipped, they are just ``getattr``),
+and the view wraps each operation in an ``OperationMetrics`` collector
+that counts SQL queries and database time through
+``connection.execute_wrapper``. Queries are attributed to the operation
+and to the innermost resolver running when they were issued; the
+current resolver is tracked in a context variable, so attribution holds
+for concurrently awaited resolvers under async execution too.
+
+Collectors are per request and merged into the process-wide
+``MetricsRegistry`` once the operation finishes, so the registry lock is
+taken once per operation rather than once per resolver call. Resolvers
+are labelled by schema coordinate (``ProjectType.taskCount``) to keep
+label cardinality bounded. Each worker process exposes its own counters
+at ``/metrics`` in the Prometheus text format.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from functools import partial
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
+from graphene.types.resolver import attr_resolver, dict_or_attr_resolver, dict_resolver
+from graphql import get_named_type, is_leaf_type
+
+from graphql_api.documents import get_document_cache
+from graphql_api.result_cache import get_result_cache
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+OTHER_OPERATIONS = 'other'
+ANONYMOUS_OPERATION = 'anonymous'
+
+_DEFAULT_RESOLVERS = (attr_resolver, dict_or_attr_resolver, dict_resolver)
+
+_current_resolver = ContextVar('graphql_current_resolver', default=None)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: 'Histogram'):
+        for index, count in enumerate(other.counts):
+            self.counts[index] += count
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative(self):
+        """Yield (upper bound, cumulative count) pairs, ending with +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class ResolverStats:
+    """Calls, latency and SQL issued by one resolver."""
+
+    __slots__ = ('calls', 'duration', 'db_queries', 'db_time')
+
+    def __init__(self, buckets):
+        self.calls = 0
+        self.duration = Histogram(buckets)
+        self.db_queries = 0
+        self.db_time = 0.0
+
+    def merge(self, other: 'ResolverStats'):
+        self.calls += other.calls
+        self.duration.merge(other.duration)
+        self.db_queries += other.db_queries
+        self.db_time += other.db_time
+
+
+class OperationStats:
+    """Executions, errors, latency and SQL of one named operation."""
+
+    __slots__ = ('count', 'errors', 'duration', 'db_queries', 'db_time')
+
+    def __init__(self, buckets):
+        self.count = 0
+        self.errors = 0
+        self.duration = Histogram(buckets)
+        self.db_queries = 0
+        self.db_time = 0.0
+
+
+class OperationMetrics:
+    """
+    Per-request collector for one GraphQL operation.
+
+    Used as a context manager around execution; while active it is also
+    the database execute wrapper for the current thread's connection.
+    Under async execution use ``async with``, which installs the wrapper
+    on the connection of the request's sync thread, where the async ORM
+    runs its queries.
+    """
+
+    def __init__(self, operation_name: str, operation_type: str, buckets=DEFAULT_BUCKETS):
+        self.operation_name = operation_name or ANONYMOUS_OPERATION
+        self.operation_type = operation_type
+        self.buckets = buckets
+        self.resolvers = {}
+        self.db_queries = 0
+        self.db_time = 0.0
+        self.duration = 0.0
+        self.failed = False
+        self._started = None
+        self._wrapper = None
+
+    def __enter__(self):
+        self._wrapper = connection.execute_wrapper(self)
+        self._wrapper.__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.duration = time.perf_counter() - self._started
+        self._wrapper.__exit__(exc_type, exc_value, traceback)
+        if exc_type is not None:
+            self.failed = True
+        return False
+
+    async def __aenter__(self):
+        return await sync_to_async(self.__enter__)()
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return await sync_to_async(self.__exit__)(exc_type, exc_value, traceback)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db_queries += 1
+            self.db_time += elapsed
+            stats = _current_resolver.get()
+            if stats is not None:
+                stats.db_queries += 1
+                stats.db_time += elapsed
+
+    def resolver_stats(self, resolver: str) -> ResolverStats:
+        """Get the stats of a resolver, counting a call."""
+        stats = self.resolvers.get(resolver)
+        if stats is None:
+            stats = self.resolvers[resolver] = ResolverStats(self.buckets)
+        stats.calls += 1
+        return stats
+
+
+class MetricsRegistry:
+    """Thread-safe, process-wide store of operation and resolver metrics."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, max_operations: int = 200):
+        self.buckets = tuple(buckets)
+        self.max_operations = max_operations
+        self.operations = {}
+        self.resolvers = {}
+        self._lock = threading.Lock()
+
+    def collector(self, operation_name: str, operation_type: str) -> OperationMetrics:
+        """
+        Create a collector for an operation about to execute.
+
+        Args:
+            operation_name: Client-supplied operation name, may be None
+            operation_type: 'query', 'mutation' or 'subscription'
+
+        Returns:
+            OperationMetrics using this registry's buckets
+        """
+        return OperationMetrics(operation_name, operation_type, self.buckets)
+
+    def record(self, metrics: OperationMetrics, errors: bool = False):
+        """
+        Merge a finished operation's collector into the registry.
+
+        Operation names beyond GRAPHQL_METRICS_MAX_OPERATIONS distinct
+        values are recorded as 'other', since they come from clients.
+
+        Args:
+            metrics: Collector that wrapped the execution
+            errors: Whether the result carried GraphQL errors
+        """
+        with self._lock:
+            key = (metrics.operation_name, metrics.operation_type)
+            if key not in self.operations and len(self.operations) >= self.max_operations:
+                key = (OTHER_OPERATIONS, metrics.operation_type)
+            operation = self.operations.get(key)
+            if operation is None:
+                operation = self.operations[key] = OperationStats(self.buckets)
+            operation.count += 1
+            operation.errors += int(errors or metrics.failed)
+            operation.duration.observe(metrics.duration)
+            operation.db_queries += metrics.db_queries
+            operation.db_time += metrics.db_time
+
+            for resolver, stats in metrics.resolvers.items():
+                resolver_key = (key[0], resolver)
+                total = self.resolvers.get(resolver_key)
+                if total is None:
+                    total = self.resolvers[resolver_key] = ResolverStats(self.buckets)
+                total.merge(stats)
+
+    def reset(self):
+        """Drop every recorded metric."""
+        with self._lock:
+            self.operations.clear()
+            self.resolvers.clear()
+
+    def render(self) -> str:
+        """
+        Render the registry in the Prometheus text exposition format.
+
+        Returns:
+            Metrics text, one sample per line
+        """
+        lines = []
+        with self._lock:
+            operations = sorted(self.operations.items())
+            resolvers = sorted(self.resolvers.items())
+
+            def operation_labels(key):
+                return {'operation': key[0], 'type': key[1]}
+
+            _counter(lines, 'graphql_operations_total', 'GraphQL operations executed.',
+                     [(operation_labels(k), s.count) for k, s in operations])
+            _counter(lines, 'graphql_operation_errors_total', 'GraphQL operations with errors.',
+                     [(operation_labels(k), s.errors) for k, s in operations])
+            _histogram(lines, 'graphql_operation_duration_seconds', 'GraphQL operation latency.',
+                       [(operation_labels(k), s.duration) for k, s in operations])
+            _counter(lines, 'graphql_operation_db_queries_total', 'SQL queries run by GraphQL operations.',
+                     [(operation_labels(k), s.db_queries) for k, s in operations])
+            _counter(lines, 'graphql_operation_db_seconds_total', 'Database time of GraphQL operations.',
+                     [(operation_labels(k), s.db_time) for k, s in operations])
+
+            def resolver_labels(key):
+                return {'operation': key[0], 'resolver': key[1]}
+
+            _counter(lines, 'graphql_resolver_calls_total', 'Resolver calls.',
+                     [(resolver_labels(k), s.calls) for k, s in resolvers])
+            _histogram(lines, 'graphql_resolver_duration_seconds', 'Resolver latency.',
+                       [(resolver_labels(k), s.duration) for k, s in resolvers])
+            _counter(lines, 'graphql_resolver_db_queries_total', 'SQL queries issued while a resolver ran.',
+                     [(resolver_labels(k), s.db_queries) for k, s in resolvers])
+            _counter(lines, 'graphql_resolver_db_seconds_total', 'Database time while a resolver ran.',
+                     [(resolver_labels(k), s.db_time) for k, s in resolvers])
+
+        documents = get_document_cache().stats()
+        _counter(lines, 'graphql_document_cache_hits_total', 'Document cache hits.',
+                 [({}, documents['hits'])])
+        _counter(lines, 'graphql_document_cache_misses_total', 'Document cache misses.',
+                 [({}, documents['misses'])])
+        _gauge(lines, 'graphql_document_cache_size', 'Documents in the document cache.',
+               [({}, documents['size'])])
+
+        results = get_result_cache().stats()
+        _counter(lines, 'graphql_result_cache_hits_total', 'Result cache hits.',
+                 [({'state': 'fresh'}, results['hits']), ({'state': 'stale'}, results['stale_hits'])])
+        _counter(lines, 'graphql_result_cache_misses_total', 'Result cache misses.',
+                 [({}, results['misses'])])
+        _counter(lines, 'graphql_result_cache_refreshes_total', 'Stale results refreshed in the background.',
+                 [({}, results['refreshes'])])
+        _gauge(lines, 'graphql_result_cache_hit_ratio', 'Share of result cache lookups served from the cache.',
+               [({}, results['hit_ratio'])])
+        if results['memory_bytes'] is not None:
+            _gauge(lines, 'graphql_result_cache_memory_bytes', 'Size of the tenant cache contents.',
+                   [({}, results['memory_bytes'])])
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _samples(lines, name, help_text, metric_type, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} {metric_type}')
+    for labels, value in samples:
+        lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+
+def _counter(lines, name, help_text, samples):
+    _samples(lines, name, help_text, 'counter', samples)
+
+
+def _gauge(lines, name, help_text, samples):
+    _samples(lines, name, help_text, 'gauge', samples)
+
+
+def _histogram(lines, name, help_text, samples):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, histogram in samples:
+        for bound, count in histogram.cumulative():
+            bucket_labels = {**labels, 'le': _format_value(bound)}
+            lines.append(f'{name}_bucket{_format_labels(bucket_labels)} {count}')
+        lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}')
+        lines.append(f'{name}_count{_format_labels(labels)} {histogram.count}')
+
+
+_instrumented = {}
+
+
+def is_instrumented(info) -> bool:
+    """
+    Whether a field's resolver is worth timing.
+
+    Scalar fields resolved by graphene's default attribute resolver are
+    skipped; everything with a custom resolver or an object/list type is
+    timed, so lazy foreign-key loads still show up.
+    """
+    key = (info.parent_type.name, info.field_name)
+    instrumented = _instrumented.get(key)
+    if instrumented is None:
+        field = info.parent_type.fields.get(info.field_name)
+        if field is None:
+            instrumented = False
+        else:
+            resolve = field.resolve
+            default = resolve is None or (
+                isinstance(resolve, partial) and resolve.func in _DEFAULT_RESOLVERS
+            )
+            instrumented = not (default and is_leaf_type(get_named_type(field.type)))
+        _instrumented[key] = instrumented
+    return instrumented
+
+
+class MetricsMiddleware:
+    """
+    Graphene middleware timing resolvers for the active OperationMetrics.
+
+    Listed last in GRAPHENE['MIDDLEWARE'] so it wraps the optimizer and
+    DataLoader middlewares and the SQL they trigger is attributed to the
+    field that caused it. Does nothing when the view did not set up a
+    collector (e.g. ``schema.execute`` in tests or scripts).
+    """
+
+    def resolve(self, next, root, info, **args):
+        metrics = getattr(info.context, 'graphql_metrics', None)
+        if metrics is None or not is_instrumented(info):
+            return next(root, info, **args)
+
+        stats = metrics.resolver_stats(f'{info.parent_type.name}.{info.field_name}')
+        started = time.perf_counter()
+        token = _current_resolver.set(stats)
+        try:
+            result = next(root, info, **args)
+        finally:
+            _current_resolver.reset(token)
+        if isawaitable(result):
+            return self._resolve_async(result, stats, started)
+        stats.duration.observe(time.perf_counter() - started)
+        return result
+
+    async def _resolve_async(self, result, stats, started):
+        token = _current_resolver.set(stats)
+        try:
+            return await result
+        finally:
+            _current_resolver.reset(token)
+            stats.duration.observe(time.perf_counter() - started)
+
+
+_registry = None
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the process-wide registry configured by the GRAPHQL_METRICS_* settings."""
+    global _registry
+    if _registry is None:
+        _registry = MetricsRegistry(
+            buckets=getattr(settings, 'GRAPHQL_METRICS_BUCKETS', DEFAULT_BUCKETS),
+            max_operations=getattr(settings, 'GRAPHQL_METRICS_MAX_OPERATIONS', 200),
+        )
+    return _registry
@@ -0,0 +1,248 @@
+"""
+Selection-set-aware queryset optimizer.
+
+Walks the fields a client selected and turns them into ``select_related``,
+``prefetch_related`` and ``only()`` calls, using the models behind the
+``DjangoObjectType``s in the schema. Columns the client did not select,
+including the large ``description``/``content`` text columns of rows
+joined via ``select_related``, are never read. ``QueryOptimizerMiddleware``
+applies it to every queryset a resolver returns, so resolvers only need to
+return a filtered queryset; single-object fields fetch through
+``get_object``.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Model, Prefetch, QuerySet, prefetch_related_objects
+from django.db.models.query import ModelIterable
+from graphene.utils.str_converters import to_snake_case
+from graphene_django import DjangoObjectType
+from graphql import FieldNode, FragmentSpreadNode, InlineFragmentNode, get_named_type
+
+
+class QueryPlan:
+    """Related lookups and columns needed to resolve a selection set."""
+
+    def __init__(self):
+        self.only = set()
+        self.select_related = set()
+        self.prefetch_related = []
+
+    def apply(self, queryset: QuerySet) -> QuerySet:
+        """
+        Apply the plan to a queryset.
+
+        Any ``select_related`` already on the queryset is replaced, since
+        joins the client did not ask for would conflict with ``only()``.
+        """
+        queryset = queryset.select_related(None)
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*sorted(self.only))
+        return queryset
+
+
+def get_django_type(graphql_type):
+    """
+    Get the DjangoObjectType behind a GraphQL output type.
+
+    Args:
+        graphql_type: GraphQL type, possibly wrapped in List/NonNull
+
+    Returns:
+        DjangoObjectType subclass, or None for any other type
+    """
+    graphene_type = getattr(get_named_type(graphql_type), 'graphene_type', None)
+    if isinstance(graphene_type, type) and issubclass(graphene_type, DjangoObjectType):
+        return graphene_type
+    return None
+
+
+def iter_field_nodes(selection_set, fragments):
+    """
+    Yield the field nodes of a selection set, flattening fragments.
+
+    Args:
+        selection_set: GraphQL selection set node
+        fragments: Fragment definitions of the operation, by name
+    """
+    if selection_set is None:
+        return
+    for selection in selection_set.selections:
+        if isinstance(selection, FieldNode):
+            yield selection
+        elif isinstance(selection, InlineFragmentNode):
+            yield from iter_field_nodes(selection.selection_set, fragments)
+        elif isinstance(selection, FragmentSpreadNode):
+            fragment = fragments.get(selection.name.value)
+            if fragment is not None:
+                yield from iter_field_nodes(fragment.selection_set, fragments)
+
+
+def build_plan(model, graphql_type, field_nodes, fragments, prefix='') -> QueryPlan:
+    """
+    Build the query plan for a model from the fields selected on it.
+
+    Args:
+        model: Django model being queried
+        graphql_type: GraphQL object type the model is resolved as
+        field_nodes: Field nodes whose sub-selections apply to the model
+        fragments: Fragment definitions of the operation, by name
+        prefix: Lookup prefix when planning a model joined via select_related
+
+    Returns:
+        QueryPlan for the selection
+    """
+    plan = QueryPlan()
+    plan.only.add(prefix + model._meta.pk.name)
+    graphql_type = get_named_type(graphql_type)
+    # Columns read by fields that are not model fields, e.g. counters
+    # behind computed totals
+    computed_columns = getattr(
+        getattr(graphql_type, 'graphene_type', None), 'optimizer_columns', {}
+    )
+
+    # Group by field so aliases and fragments selecting a relation twice
+    # produce a single join or prefetch
+    selections = {}
+    for field_node in field_nodes:
+        for selected in iter_field_nodes(field_node.selection_set, fragments):
+            selections.setdefault(selected.name.value, []).append(selected)
+
+    for graphql_name, nodes in selections.items():
+        graphql_field = graphql_type.fields.get(graphql_name)
+        if graphql_field is None:
+            continue
+        name = to_snake_case(graphql_name)
+        plan.only.update(prefix + column for column in computed_columns.get(name, ()))
+        try:
+            model_field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+
+        if not model_field.is_relation:
+            if model_field.concrete:
+                plan.only.add(prefix + name)
+        elif model_field.concrete and (model_field.many_to_one or model_field.one_to_one):
+            _plan_forward(plan, model_field, graphql_field, nodes, fragments, prefix)
+        elif (model_field.one_to_many or model_field.many_to_many) and not any(
+            node.arguments for node in nodes
+        ):
+            _plan_reverse(plan, model_field, graphql_field, nodes, fragments, prefix)
+
+    return plan
+
+
+def _plan_forward(plan, model_field, graphql_field, field_nodes, fragments, prefix):
+    """Join a forward foreign key and plan the related model's selection."""
+    if get_django_type(graphql_field.type) is None:
+        return
+    lookup = prefix + model_field.name
+    related = build_plan(
+        model_field.related_model, graphql_field.type, field_nodes, fragments, lookup + '__'
+    )
+    plan.only.add(lookup)
+    plan.only |= related.only
+    plan.select_related.add(lookup)
+    plan.select_related |= related.select_related
+    plan.prefetch_related.extend(related.prefetch_related)
+
+
+def _plan_reverse(plan, model_field, graphql_field, field_nodes, fragments, prefix):
+    """Prefetch a reverse relation with its own optimized queryset."""
+    if get_django_type(graphql_field.type) is None:
+        return
+    related_model = model_field.related_model
+    related = build_plan(related_model, graphql_field.type, field_nodes, fragments)
+    if model_field.one_to_many:
+        # The prefetch is matched back to its parent through this column
+        related.only.add(model_field.field.name)
+    queryset = related.apply(related_model._default_manager.all())
+    plan.prefetch_related.append(Prefetch(prefix + model_field.name, queryset=queryset))
+
+
+def optimize_queryset(queryset: QuerySet, info, field_nodes=None, graphql_type=None,
+                      required=()) -> QuerySet:
+    """
+    Optimize a queryset for the fields selected in the current resolver.
+
+    Args:
+        queryset: Unevaluated queryset returned by a resolver
+        info: GraphQL resolve info
+        field_nodes: Field nodes to plan for, defaults to ``info.field_nodes``
+        graphql_type: Type the rows resolve as, defaults to ``info.return_type``
+        required: Columns to load even if they are not selected
+
+    Returns:
+        Queryset with related lookups and column projection applied
+    """
+    graphql_type = graphql_type or info.return_type
+    django_type = get_django_type(graphql_type)
+    if django_type is None or django_type._meta.model is not queryset.model:
+        return queryset
+    plan = build_plan(
+        queryset.model, graphql_type, field_nodes or info.field_nodes, info.fragments
+    )
+    plan.only.update(required)
+    return plan.apply(queryset)
+
+
+def get_object(queryset: QuerySet, info):
+    """
+    Fetch the single object a field resolves to, optimized for its selection.
+
+    Args:
+        queryset: Queryset filtered down to the object
+        info: GraphQL resolve info
+
+    Returns:
+        Model instance, or None if it does not exist
+    """
+    return optimize_queryset(queryset, info).first()
+
+
+def optimize_instance(instance: Model, info) -> Model:
+    """
+    Prefetch the reverse relations selected below a single object.
+
+    Args:
+        instance: Model instance returned by a resolver
+        info: GraphQL resolve info
+
+    Returns:
+        The same instance, with selected relations prefetched
+    """
+    django_type = get_django_type(info.return_type)
+    if django_type is None or not isinstance(instance, django_type._meta.model):
+        return instance
+    plan = build_plan(type(instance), info.return_type, info.field_nodes, info.fragments)
+    if plan.prefetch_related:
+        prefetch_related_objects([instance], *plan.prefetch_related)
+    return instance
+
+
+class QueryOptimizerMiddleware:
+    """
+    Graphene middleware optimizing the querysets resolvers return.
+
+    Nested relations are usually covered by the root field's plan and come
+    back already prefetched; querysets that were not (fields with
+    arguments, objects returned by mutations) are planned where they are
+    resolved. Model instances returned by root fields get their selected
+    reverse relations prefetched.
+    """
+
+    def resolve(self, next, root, info, **args):
+        result = next(root, info, **args)
+        if (
+            isinstance(result, QuerySet)
+            and result._result_cache is None
+            and result._iterable_class is ModelIterable
+        ):
+            # Related managers attach the parent through these foreign keys
+            required = [field.name for field in result._known_related_objects]
+            return optimize_queryset(result, info, required=required)
+        if info.path.prev is None and isinstance(result, Model):
+            return optimize_instance(result, info)
+        return result
@@ -2,8 +2,10 @@
 GraphQL mutations for organizations.
 """
 import graphene
+from apps.core.exceptions import ConcurrentUpdateError
 from apps.organizations.services import OrganizationService
-from .types import OrganizationType
+from graphql_api.types import BulkItemErrorType
+from .types import OrganizationInput, OrganizationType
 
 
 class CreateOrganization(graphene.Mutation):
@@ -38,6 +40,37 @@ class CreateOrganization(graphene.Mutation):
             )
 
 
+class BulkCreateOrganizations(graphene.Mutation):
+    """Create many organizations at once."""
+    
+    class Arguments:
+        organizations = graphene.List(graphene.NonNull(OrganizationInput), required=True)
+    
+    organizations = graphene.List(OrganizationType)
+    errors = graphene.List(BulkItemErrorType)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, organizations):
+        try:
+            created, errors = OrganizationService.bulk_create_organizations(
+                [dict(organization) for organization in organizations]
+            )
+            return BulkCreateOrganizations(
+                organizations=created,
+                errors=[BulkItemErrorType(**error) for error in errors],
+                success=not errors,
+                message=f"Created {len(created)} of {len(organizations)} organizations"
+            )
+        except Exception as e:
+            return BulkCreateOrganizations(
+                organizations=[],
+                errors=[],
+                success=False,
+                message=str(e)
+            )
+
+
 class UpdateOrganization(graphene.Mutation):
     """Update an existing organization."""
     
@@ -46,22 +79,34 @@ class UpdateOrganization(graphene.Mutation):
         name = graphene.String()
         contact_email = graphene.String()
         slug = graphene.String()
+        version = graphene.Int(description="Version last read; a newer one fails with conflict")
     
     organization = graphene.Field(OrganizationType)
     success = graphene.Boolean()
     message = graphene.String()
+    conflict = graphene.Boolean(description="True if the organization changed since the given version")
     
-    def mutate(self, info, id, **kwargs):
+    def mutate(self, info, id, version=None, **kwargs):
         try:
             # Remove None values
             update_data = {k: v for k, v in kwargs.items() if v is not None}
             
-            organization = OrganizationService.update_organization(id, **update_data)
+            organization = OrganizationService.update_organization(
+                id, expected_version=version, **update_data
+            )
             return UpdateOrganization(
                 organization=organization,
                 success=True,
+                conflict=False,
                 message="Organization updated successfully"
             )
+        except ConcurrentUpdateError as e:
+            return UpdateOrganization(
+                organization=None,
+                success=False,
+                conflict=True,
+                message=str(e)
+            )
         except Exception as e:
             return UpdateOrganization(
                 organization=None,
@@ -73,5 +118,6 @@ class UpdateOrganization(graphene.Mutation):
 class OrganizationMutation(graphene.ObjectType):
     """Organization mutations."""
     create_organization = CreateOrganization.Field()
+    bulk_create_organizations = BulkCreateOrganizations.Field()
     update_organization = UpdateOrganization.Field()
 
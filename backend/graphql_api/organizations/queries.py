@@ -4,7 +4,34 @@ GraphQL queries for organizations.
 import graphene
 from apps.organizations.models import Organization
 from apps.organizations.services import OrganizationService
-from .types import OrganizationType, OrganizationStatsType
+from graphql_api.execution import aget_object, is_async
+from graphql_api.optimizer import get_object
+from graphql_api.pagination import paginate, slice_list
+from .types import OrganizationType, OrganizationStatsType, OrganizationConnection
+
+
+async def _aresolve_organization_stats(organization_id):
+    """Resolve organization statistics with the async ORM."""
+    try:
+        stats = await OrganizationService.aget_organization_stats(organization_id)
+        return OrganizationStatsType(**stats)
+    except Organization.DoesNotExist:
+        return None
+
+
+def _stats_in_order(stats, organization_ids):
+    """Statistics objects in the order of the requested IDs, skipping unknown ones."""
+    return [
+        OrganizationStatsType(**stats[organization_id])
+        for organization_id in organization_ids
+        if organization_id in stats
+    ]
+
+
+async def _aresolve_organizations_stats(organization_ids):
+    """Resolve statistics of many organizations with the async ORM."""
+    stats = await OrganizationService.aget_stats_for_organizations(organization_ids)
+    return _stats_in_order(stats, organization_ids)
 
 
 class OrganizationQuery(graphene.ObjectType):
@@ -13,9 +40,19 @@ class OrganizationQuery(graphene.ObjectType):
     # List all organizations
     organizations = graphene.List(
         OrganizationType,
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all organizations"
     )
     
+    # Paginated organizations
+    organizations_connection = graphene.Field(
+        OrganizationConnection,
+        first=graphene.Int(),
+        after=graphene.String(),
+        description="Get a page of organizations, newest first"
+    )
+    
     # Get single organization by ID
     organization = graphene.Field(
         OrganizationType,
@@ -37,29 +74,48 @@ class OrganizationQuery(graphene.ObjectType):
         description="Get statistics for an organization"
     )
     
-    def resolve_organizations(self, info):
+    # Get statistics of many organizations at once
+    organizations_stats = graphene.List(
+        OrganizationStatsType,
+        ids=graphene.List(graphene.NonNull(graphene.Int), required=True),
+        description="Get statistics for several organizations with one query"
+    )
+    
+    def resolve_organizations(self, info, first=None, offset=None):
         """Resolve all organizations."""
-        return Organization.objects.all()
+        return slice_list(Organization.objects.all(), first, offset)
+    
+    def resolve_organizations_connection(self, info, first=None, after=None):
+        """Resolve a page of organizations."""
+        return paginate(
+            Organization.objects.all(), info, OrganizationConnection, first=first, after=after
+        )
     
     def resolve_organization(self, info, id):
         """Resolve single organization by ID."""
-        try:
-            return Organization.objects.get(id=id)
-        except Organization.DoesNotExist:
-            return None
+        if is_async(info):
+            return aget_object(Organization.objects.filter(id=id), info)
+        return get_object(Organization.objects.filter(id=id), info)
     
     def resolve_organization_by_slug(self, info, slug):
         """Resolve organization by slug."""
-        try:
-            return Organization.objects.get(slug=slug)
-        except Organization.DoesNotExist:
-            return None
+        if is_async(info):
+            return aget_object(Organization.objects.filter(slug=slug), info)
+        return get_object(Organization.objects.filter(slug=slug), info)
     
     def resolve_organization_stats(self, info, organization_id):
         """Resolve organization statistics."""
+        if is_async(info):
+            return _aresolve_organization_stats(organization_id)
         try:
             stats = OrganizationService.get_organization_stats(organization_id)
             return OrganizationStatsType(**stats)
         except Organization.DoesNotExist:
             return None
-
+    
+    def resolve_organizations_stats(self, info, ids):
+        """Resolve statistics of many organizations."""
+        if is_async(info):
+            return _aresolve_organizations_stats(ids)
+        stats = OrganizationService.get_stats_for_organizations(ids)
+        return _stats_in_order(stats, ids)
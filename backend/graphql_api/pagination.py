@@ -0,0 +1,192 @@
+"""
+Keyset (cursor) pagination for Relay-style connections.
+
+Cursors encode the ``(created_at, id)`` of the last row on a page, so the
+next page is a range scan on a composite index rather than an OFFSET,
+and page 500 costs the same as page 1. Plain list fields are capped at
+GRAPHQL_MAX_PAGE_SIZE rows with ``slice_list``.
+"""
+import base64
+import binascii
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Q
+from graphene.relay import PageInfo
+from graphql import GraphQLError
+
+from graphql_api.execution import is_async
+from graphql_api.optimizer import iter_field_nodes, optimize_queryset
+
+CURSOR_PREFIX = 'keyset:'
+
+
+def encode_cursor(created_at: datetime, pk: int) -> str:
+    """
+    Encode a row position as an opaque cursor.
+
+    Args:
+        created_at: Row creation timestamp
+        pk: Row primary key
+
+    Returns:
+        Base64 cursor string
+    """
+    raw = f"{CURSOR_PREFIX}{created_at.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        Tuple of (created_at, pk)
+
+    Raises:
+        GraphQLError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        if not raw.startswith(CURSOR_PREFIX):
+            raise ValueError(raw)
+        created_at, pk = raw[len(CURSOR_PREFIX):].rsplit('|', 1)
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise GraphQLError(f"Invalid cursor: {cursor}")
+
+
+def get_page_size(first: int = None) -> int:
+    """
+    Resolve the requested page size against the server-side cap.
+
+    Args:
+        first: Page size requested by the client
+
+    Returns:
+        Page size between 1 and GRAPHQL_MAX_PAGE_SIZE
+    """
+    max_size = getattr(settings, 'GRAPHQL_MAX_PAGE_SIZE', 100)
+    if first is None:
+        return min(getattr(settings, 'GRAPHQL_DEFAULT_PAGE_SIZE', 20), max_size)
+    if first < 1:
+        raise GraphQLError("'first' must be a positive integer")
+    return min(first, max_size)
+
+
+def slice_list(queryset, first: int = None, offset: int = None):
+    """
+    Cap a plain list field at GRAPHQL_MAX_PAGE_SIZE rows.
+
+    Args:
+        queryset: Ordered queryset the field resolves to
+        first: Number of rows requested, defaults to GRAPHQL_MAX_PAGE_SIZE
+        offset: Number of rows to skip
+
+    Returns:
+        Sliced queryset of at most GRAPHQL_MAX_PAGE_SIZE rows
+
+    Raises:
+        GraphQLError: If ``first`` is not positive or ``offset`` is negative
+    """
+    max_size = getattr(settings, 'GRAPHQL_MAX_PAGE_SIZE', 100)
+    size = max_size if first is None else get_page_size(first)
+    offset = offset or 0
+    if offset < 0:
+        raise GraphQLError("'offset' must not be negative")
+    return queryset[offset:offset + size]
+
+
+def _node_field_nodes(info):
+    """Field nodes selected under ``edges { node { ... } }``."""
+    nodes = []
+    for field_node in info.field_nodes:
+        for edges in iter_field_nodes(field_node.selection_set, info.fragments):
+            if edges.name.value != 'edges':
+                continue
+            for node in iter_field_nodes(edges.selection_set, info.fragments):
+                if node.name.value == 'node':
+                    nodes.append(node)
+    return nodes
+
+
+def paginate(queryset, info, connection_type, first: int = None, after: str = None,
+             descending: bool = True):
+    """
+    Return one keyset page of a queryset as a connection.
+
+    Args:
+        queryset: Filtered queryset to paginate
+        info: GraphQL resolve info
+        connection_type: graphene Connection subclass to build
+        first: Requested page size, capped at GRAPHQL_MAX_PAGE_SIZE
+        after: Cursor of the last row of the previous page
+        descending: Newest rows first when True, oldest first otherwise
+
+    Returns:
+        Connection instance with edges and page info, or an awaitable of it
+        under async execution
+    """
+    page_size = get_page_size(first)
+
+    if descending:
+        queryset = queryset.order_by('-created_at', '-id')
+    else:
+        queryset = queryset.order_by('created_at', 'id')
+
+    if after:
+        # (created_at, id) < (c, i), written so the first condition bounds
+        # the index range scan
+        created_at, pk = decode_cursor(after)
+        if descending:
+            queryset = queryset.filter(
+                Q(created_at__lte=created_at)
+                & (Q(created_at__lt=created_at) | Q(id__lt=pk))
+            )
+        else:
+            queryset = queryset.filter(
+                Q(created_at__gte=created_at)
+                & (Q(created_at__gt=created_at) | Q(id__gt=pk))
+            )
+
+    node_type = connection_type._meta.node
+    node_nodes = _node_field_nodes(info)
+    if node_nodes:
+        queryset = optimize_queryset(
+            queryset,
+            info,
+            field_nodes=node_nodes,
+            graphql_type=info.schema.get_type(node_type._meta.name),
+            required=('created_at',),
+        )
+
+    queryset = queryset[:page_size + 1]
+    if is_async(info):
+        return _apage(queryset, connection_type, page_size, after)
+    return _page(list(queryset), connection_type, page_size, after)
+
+
+async def _apage(queryset, connection_type, page_size, after):
+    rows = [row async for row in queryset]
+    return _page(rows, connection_type, page_size, after)
+
+
+def _page(rows, connection_type, page_size, after):
+    """Build a connection from up to ``page_size + 1`` fetched rows."""
+    has_next_page = len(rows) > page_size
+    rows = rows[:page_size]
+
+    edges = [
+        connection_type.Edge(node=row, cursor=encode_cursor(row.created_at, row.pk))
+        for row in rows
+    ]
+    page_info = PageInfo(
+        start_cursor=edges[0].cursor if edges else None,
+        end_cursor=edges[-1].cursor if edges else None,
+        has_next_page=has_next_page,
+        has_previous_page=bool(after),
+    )
+    return connection_type(edges=edges, page_info=page_info)
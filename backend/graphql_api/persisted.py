@@ -0,0 +1,180 @@
+"""
+Automatic persisted queries.
+
+Clients send ``extensions.persistedQuery.sha256Hash`` instead of the full
+document. Unknown hashes are answered with ``PersistedQueryNotFound`` and
+the client retries once with the query, which is then registered. The
+registry is pre-seeded with the operations shipped in the frontend's
+``src/graphql/*.ts`` files, hashed in their printed form as clients hash
+them.
+"""
+import re
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import caches
+from graphql import GraphQLError, GraphQLSyntaxError, parse, print_ast
+
+from graphql_api.documents import hash_document
+
+GQL_TEMPLATE = re.compile(r'gql`(.*?)`', re.S)
+CACHE_KEY_PREFIX = 'graphql:pq:'
+
+
+class PersistedQueryNotFound(GraphQLError):
+    """Raised when a client sends a hash the registry does not know."""
+
+    def __init__(self):
+        super().__init__(
+            "PersistedQueryNotFound",
+            extensions={'code': 'PERSISTED_QUERY_NOT_FOUND'},
+        )
+
+
+class PersistedQueryHashMismatch(GraphQLError):
+    """Raised when a client sends a query that does not match its hash."""
+
+    def __init__(self):
+        super().__init__(
+            "provided sha does not match query",
+            extensions={'code': 'PERSISTED_QUERY_HASH_MISMATCH'},
+        )
+
+
+def extract_documents(source: str) -> list:
+    """
+    Extract GraphQL documents from ``gql`...``` templates.
+
+    Templates with ``${...}`` interpolations are skipped, since their final
+    text is only known at runtime.
+
+    Args:
+        source: TypeScript/JavaScript source code
+
+    Returns:
+        List of GraphQL document strings
+    """
+    return [
+        document.strip()
+        for document in GQL_TEMPLATE.findall(source)
+        if '${' not in document
+    ]
+
+
+def normalize_document(document: str) -> str:
+    """
+    Print a document the way graphql-js clients do before hashing it.
+
+    Args:
+        document: GraphQL document source
+
+    Returns:
+        Document source in canonical printed form
+
+    Raises:
+        GraphQLSyntaxError: If the document cannot be parsed
+    """
+    return print_ast(parse(document))
+
+
+def load_documents(directories) -> dict:
+    """
+    Load every GraphQL document found in a set of directories.
+
+    Args:
+        directories: Directories with .ts/.js/.graphql files
+
+    Returns:
+        Dictionary mapping hashes of the printed documents to the printed
+        documents; documents that do not parse are skipped
+    """
+    documents = {}
+    for directory in directories:
+        directory = Path(directory)
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.iterdir()):
+            if path.suffix in ('.ts', '.tsx', '.js'):
+                found = extract_documents(path.read_text(encoding='utf-8'))
+            elif path.suffix == '.graphql':
+                found = [path.read_text(encoding='utf-8').strip()]
+            else:
+                continue
+            for document in found:
+                try:
+                    document = normalize_document(document)
+                except GraphQLSyntaxError:
+                    continue
+                documents[hash_document(document)] = document
+    return documents
+
+
+class PersistedQueryRegistry:
+    """
+    Registry of persisted queries by SHA-256 hash.
+
+    Seeded documents live in process memory; documents registered by
+    clients go to the Django cache so every worker sharing that cache
+    sees them.
+    """
+
+    def __init__(self, cache_alias: str = 'default', seed_directories=()):
+        self.cache_alias = cache_alias
+        self.seed_directories = list(seed_directories)
+        self._seeded = None
+        self._lock = threading.Lock()
+
+    @property
+    def seeded(self) -> dict:
+        """Documents loaded from the seed directories, by hash."""
+        if self._seeded is None:
+            with self._lock:
+                if self._seeded is None:
+                    self._seeded = load_documents(self.seed_directories)
+        return self._seeded
+
+    def get(self, sha256_hash: str):
+        """
+        Look up a persisted query.
+
+        Args:
+            sha256_hash: Hex SHA-256 of the document
+
+        Returns:
+            Document string, or None if the hash is unknown
+        """
+        document = self.seeded.get(sha256_hash)
+        if document is None:
+            document = caches[self.cache_alias].get(CACHE_KEY_PREFIX + sha256_hash)
+        return document
+
+    def register(self, sha256_hash: str, query: str):
+        """
+        Register a query under its hash.
+
+        Args:
+            sha256_hash: Hash the client claims for the query
+            query: GraphQL document source
+
+        Raises:
+            PersistedQueryHashMismatch: If the hash does not match the query
+        """
+        if hash_document(query) != sha256_hash:
+            raise PersistedQueryHashMismatch()
+        if sha256_hash not in self.seeded:
+            caches[self.cache_alias].set(CACHE_KEY_PREFIX + sha256_hash, query, None)
+
+
+_registry = None
+
+
+def get_persisted_query_registry() -> PersistedQueryRegistry:
+    """Get the process-wide registry configured by the GRAPHQL_PERSISTED_QUERIES_* settings."""
+    global _registry
+    if _registry is None:
+        _registry = PersistedQueryRegistry(
+            cache_alias=getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_CACHE', 'default'),
+            seed_directories=getattr(settings, 'GRAPHQL_PERSISTED_QUERIES_SEED_DIRS', ()),
+        )
+    return _registry
@@ -4,7 +4,7 @@ GraphQL mutations for projects.
 import graphene
 from datetime import datetime
 from apps.projects.services import ProjectService
-from apps.core.exceptions import OrganizationMismatchError
+from apps.core.exceptions import ConcurrentUpdateError, OrganizationMismatchError
 from .types import ProjectType
 
 
@@ -54,12 +54,14 @@ class UpdateProject(graphene.Mutation):
         description = graphene.String()
         status = graphene.String()
         due_date = graphene.Date()
+        version = graphene.Int(description="Version last read; a newer one fails with conflict")
     
     project = graphene.Field(ProjectType)
     success = graphene.Boolean()
     message = graphene.String()
+    conflict = graphene.Boolean(description="True if the project changed since the given version")
     
-    def mutate(self, info, id, organization_id=None, **kwargs):
+    def mutate(self, info, id, organization_id=None, version=None, **kwargs):
         try:
             # Remove None values
             update_data = {k: v for k, v in kwargs.items() if v is not None}
@@ -67,13 +69,22 @@ class UpdateProject(graphene.Mutation):
             project = ProjectService.update_project(
                 project_id=id,
                 organization_id=organization_id,
+                expected_version=version,
                 **update_data
             )
             return UpdateProject(
                 project=project,
                 success=True,
+                conflict=False,
                 message="Project updated successfully"
             )
+        except ConcurrentUpdateError as e:
+            return UpdateProject(
+                project=None,
+                success=False,
+                conflict=True,
+                message=str(e)
+            )
         except OrganizationMismatchError as e:
             return UpdateProject(
                 project=None,
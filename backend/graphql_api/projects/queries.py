@@ -2,9 +2,31 @@
 GraphQL queries for projects.
 """
 import graphene
+from graphql import GraphQLError
 from apps.projects.models import Project
 from apps.projects.services import ProjectService
-from .types import ProjectType, ProjectStatsType
+from graphql_api.execution import aget_object, is_async
+from graphql_api.optimizer import get_object
+from graphql_api.pagination import paginate, slice_list
+from .types import BurndownPointType, ProjectType, ProjectStatsType, ProjectConnection
+
+
+async def _aresolve_project_stats(project_id):
+    """Resolve project statistics with the async ORM."""
+    try:
+        stats = await ProjectService.aget_project_stats(project_id)
+        return ProjectStatsType(**stats)
+    except Project.DoesNotExist:
+        return None
+
+
+async def _aresolve_project_burndown(project_id, start, end):
+    """Resolve a project's burndown with the async ORM."""
+    try:
+        points = await ProjectService.aget_burndown(project_id, start, end)
+    except ValueError as error:
+        raise GraphQLError(str(error))
+    return [BurndownPointType(**point) for point in points]
 
 
 class ProjectQuery(graphene.ObjectType):
@@ -15,9 +37,21 @@ class ProjectQuery(graphene.ObjectType):
         ProjectType,
         organization_id=graphene.Int(),
         status=graphene.String(),
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all projects, optionally filtered by organization and status"
     )
     
+    # Paginated projects (optionally filtered by organization)
+    projects_connection = graphene.Field(
+        ProjectConnection,
+        organization_id=graphene.Int(),
+        status=graphene.String(),
+        first=graphene.Int(),
+        after=graphene.String(),
+        description="Get a page of projects, newest first, optionally filtered"
+    )
+    
     # Get single project by ID
     project = graphene.Field(
         ProjectType,
@@ -30,6 +64,8 @@ class ProjectQuery(graphene.ObjectType):
         ProjectType,
         organization_id=graphene.Int(required=True),
         status=graphene.String(),
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all projects for an organization"
     )
     
@@ -40,9 +76,18 @@ class ProjectQuery(graphene.ObjectType):
         description="Get statistics for a project"
     )
     
-    def resolve_projects(self, info, organization_id=None, status=None):
+    # Get a project's daily task counts
+    project_burndown = graphene.List(
+        BurndownPointType,
+        project_id=graphene.Int(required=True),
+        from_=graphene.Date(required=True, name='from'),
+        to=graphene.Date(required=True),
+        description="Get a project's task counts per day, from the rolled-up snapshots"
+    )
+    
+    def resolve_projects(self, info, organization_id=None, status=None, first=None, offset=None):
         """Resolve all projects with optional filters."""
-        queryset = Project.objects.select_related('organization').all()
+        queryset = Project.objects.all()
         
         if organization_id:
             queryset = queryset.filter(organization_id=organization_id)
@@ -50,24 +95,49 @@ class ProjectQuery(graphene.ObjectType):
         if status:
             queryset = queryset.filter(status=status)
         
-        return queryset
+        return slice_list(queryset, first, offset)
+    
+    def resolve_projects_connection(self, info, organization_id=None, status=None,
+                                    first=None, after=None):
+        """Resolve a page of projects with optional filters."""
+        queryset = Project.objects.all()
+        
+        if organization_id:
+            queryset = queryset.filter(organization_id=organization_id)
+        
+        if status:
+            queryset = queryset.filter(status=status)
+        
+        return paginate(queryset, info, ProjectConnection, first=first, after=after)
     
     def resolve_project(self, info, id):
         """Resolve single project by ID."""
-        try:
-            return Project.objects.select_related('organization').get(id=id)
-        except Project.DoesNotExist:
-            return None
+        if is_async(info):
+            return aget_object(Project.objects.filter(id=id), info)
+        return get_object(Project.objects.filter(id=id), info)
     
-    def resolve_projects_by_organization(self, info, organization_id, status=None):
+    def resolve_projects_by_organization(self, info, organization_id, status=None,
+                                         first=None, offset=None):
         """Resolve projects for a specific organization."""
-        return ProjectService.get_projects_by_organization(organization_id, status)
+        queryset = ProjectService.get_projects_by_organization(organization_id, status)
+        return slice_list(queryset, first, offset)
     
     def resolve_project_stats(self, info, project_id):
         """Resolve project statistics."""
+        if is_async(info):
+            return _aresolve_project_stats(project_id)
         try:
             stats = ProjectService.get_project_stats(project_id)
             return ProjectStatsType(**stats)
         except Project.DoesNotExist:
             return None
-
+    
+    def resolve_project_burndown(self, info, project_id, from_, to):
+        """Resolve a project's burndown series."""
+        if is_async(info):
+            return _aresolve_project_burndown(project_id, from_, to)
+        try:
+            points = ProjectService.get_burndown(project_id, from_, to)
+        except ValueError as error:
+            raise GraphQLError(str(error))
+        return [BurndownPointType(**point) for point in points]
@@ -0,0 +1,37 @@
+"""
+GraphQL subscriptions for projects.
+"""
+import graphene
+from apps.core.events import get_broker
+from apps.projects.models import Project
+from apps.projects.services import ProjectService
+from apps.tasks.events import project_stats_channel
+from .types import ProjectStatsType
+
+
+async def _aproject_stats(project_id):
+    """Current statistics of a project, or None once it is deleted."""
+    try:
+        stats = await ProjectService.aget_project_stats(project_id)
+        return ProjectStatsType(**stats)
+    except Project.DoesNotExist:
+        return None
+
+
+class ProjectSubscription(graphene.ObjectType):
+    """Project subscriptions."""
+    
+    # Task-count changes of an organization's projects
+    project_stats_changed = graphene.Field(
+        ProjectStatsType,
+        organization_id=graphene.Int(required=True),
+        description="Receive a project's statistics whenever its task counts change"
+    )
+    
+    def subscribe_project_stats_changed(root, info, organization_id):
+        """Subscribe to an organization's project statistics."""
+        return get_broker().subscribe(project_stats_channel(organization_id))
+    
+    def resolve_project_stats_changed(event, info, organization_id):
+        """Resolve the statistics of the project named by the event."""
+        return _aproject_stats(event['project_id'])
@@ -3,12 +3,24 @@ GraphQL types for projects.
 """
 import graphene
 from graphene_django import DjangoObjectType
+from apps.core.utils import calculate_percentage
 from apps.projects.models import Project
 
+TASK_COUNT_COLUMNS = tuple(Project.TASK_COUNT_FIELDS.values())
+
 
 class ProjectType(DjangoObjectType):
     """GraphQL type for Project model."""
     
+    # Counter columns the computed fields read, for the query optimizer
+    optimizer_columns = {
+        'task_count': TASK_COUNT_COLUMNS,
+        'completed_tasks': ('done_task_count',),
+        'in_progress_tasks': ('in_progress_task_count',),
+        'todo_tasks': ('todo_task_count',),
+        'completion_rate': TASK_COUNT_COLUMNS,
+    }
+    
     task_count = graphene.Int()
     completed_tasks = graphene.Int()
     in_progress_tasks = graphene.Int()
@@ -18,37 +30,43 @@ class ProjectType(DjangoObjectType):
     
     class Meta:
         model = Project
-        fields = ('id', 'organization', 'name', 'description', 'status', 'due_date', 'created_at', 'updated_at', 'tasks')
+        fields = (
+            'id', 'organization', 'name', 'description', 'status', 'due_date', 'next_due_date',
+            'version', 'created_at', 'updated_at', 'tasks'
+        )
     
     def resolve_task_count(self, info):
         """Get total number of tasks."""
-        return self.tasks.count()
+        return self.task_count
     
     def resolve_completed_tasks(self, info):
         """Get number of completed tasks."""
-        return self.tasks.filter(status='DONE').count()
+        return self.done_task_count
     
     def resolve_in_progress_tasks(self, info):
         """Get number of in-progress tasks."""
-        return self.tasks.filter(status='IN_PROGRESS').count()
+        return self.in_progress_task_count
     
     def resolve_todo_tasks(self, info):
         """Get number of todo tasks."""
-        return self.tasks.filter(status='TODO').count()
+        return self.todo_task_count
     
     def resolve_completion_rate(self, info):
         """Calculate task completion rate."""
-        total = self.tasks.count()
-        if total == 0:
-            return 0.0
-        completed = self.tasks.filter(status='DONE').count()
-        return round((completed / total) * 100, 2)
+        return calculate_percentage(self.done_task_count, self.task_count)
     
     def resolve_tasks(self, info):
         """Get all tasks for this project."""
         return self.tasks.all()
 
 
+class ProjectConnection(graphene.relay.Connection):
+    """Keyset-paginated projects, newest first."""
+    
+    class Meta:
+        node = ProjectType
+
+
 class ProjectStatsType(graphene.ObjectType):
     """Statistics for a project."""
     project_id = graphene.Int()
@@ -58,3 +76,12 @@ class ProjectStatsType(graphene.ObjectType):
     completed_tasks = graphene.Int()
     completion_rate = graphene.Float()
 
+
+class BurndownPointType(graphene.ObjectType):
+    """A project's task counts at the end of one day."""
+    date = graphene.Date()
+    total_tasks = graphene.Int()
+    todo_tasks = graphene.Int()
+    in_progress_tasks = graphene.Int()
+    completed_tasks = graphene.Int()
+    remaining_tasks = graphene.Int()
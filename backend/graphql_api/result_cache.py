@@ -0,0 +1,236 @@
+"""
+Tenant-scoped cache of query results.
+
+Queries whose root fields are all listed in GRAPHQL_RESULT_CACHE_FIELDS
+and scoped by an ``organizationId`` argument are answered from the
+TENANT_CACHE cache. Entries are keyed by the document, operation name,
+variables and the cache generations of the organizations involved;
+service writes bump those generations on commit, so a write invalidates
+exactly its own organization's results.
+
+Entries are fresh for GRAPHQL_RESULT_CACHE_TTL seconds. For another
+GRAPHQL_RESULT_CACHE_STALE_TTL seconds they are still served while one
+background thread executes the query again and replaces them.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connections
+from graphql import execute
+
+from apps.core.cache import get_generations, get_tenant_cache
+from graphql_api.etags import TIME_DEPENDENT_ROOT_FIELDS, operation_scopes, root_fields
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = 'graphql:result:'
+
+
+class ResultCacheContext(SimpleNamespace):
+    """Context passed to resolvers while a stale result is refreshed."""
+
+
+class ResultCache:
+    """
+    Query result cache with per-organization invalidation.
+
+    Args:
+        fields: Root query fields whose results may be cached
+        ttl: Seconds an entry is fresh
+        stale_ttl: Seconds a stale entry may still be served while refreshing
+    """
+
+    def __init__(self, fields=(), ttl: int = 60, stale_ttl: int = 30):
+        self.fields = frozenset(fields)
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def cache(self):
+        return get_tenant_cache()
+
+    def get_key(self, prepared):
+        """
+        Get the cache key of an operation.
+
+        Args:
+            prepared: PreparedOperation
+
+        Returns:
+            Key string, or None if the operation may not be cached
+        """
+        if not self.fields or not prepared.is_query:
+            return None
+        field_names = {
+            field.name.value for field in root_fields(prepared.document, prepared.operation_ast)
+            if not field.name.value.startswith('__')
+        }
+        if (
+            not field_names
+            or not field_names <= self.fields
+            or field_names & TIME_DEPENDENT_ROOT_FIELDS
+        ):
+            return None
+        scopes = operation_scopes(prepared.document, prepared.operation_ast, prepared.variables)
+        if not scopes or scopes.keys() != {'organization'}:
+            return None
+        generations = get_generations(scopes['organization'])
+        key = json.dumps(
+            [prepared.document_hash, prepared.operation_name, prepared.variables or {},
+             sorted(generations.items())],
+            sort_keys=True,
+            default=str,
+        )
+        return CACHE_KEY_PREFIX + hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key: str):
+        """
+        Look up a result.
+
+        Args:
+            key: Key from ``get_key``
+
+        Returns:
+            Tuple of (data, fresh), or None on a miss
+        """
+        entry = self.cache.get(key)
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            fresh = time.time() - entry['stored_at'] < self.ttl
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return entry['data'], fresh
+
+    def set(self, key: str, data):
+        """Store a result for TTL plus the stale window."""
+        self.cache.set(
+            key, {'data': data, 'stored_at': time.time()}, timeout=self.ttl + self.stale_ttl
+        )
+
+    def refresh(self, key: str, schema, prepared, middleware):
+        """
+        Execute an operation again in the background and store its result.
+
+        Only one refresh per key runs at a time, across processes sharing
+        the cache.
+
+        Args:
+            key: Key of the stale entry
+            schema: GraphQL schema
+            prepared: The operation
+            middleware: Middleware to execute with
+        """
+        lock = key + ':refreshing'
+        if not self.cache.add(lock, 1, timeout=max(self.stale_ttl, 1)):
+            return
+        with self._lock:
+            self.refreshes += 1
+        self.start_refresh(self._refresh, key, lock, schema, prepared, middleware)
+
+    def start_refresh(self, function, *args):
+        """Run a refresh; in a daemon thread so the stale response is not delayed."""
+        def run():
+            try:
+                function(*args)
+            finally:
+                connections.close_all()
+
+        threading.Thread(target=run, name='graphql-result-refresh', daemon=True).start()
+
+    def _refresh(self, key, lock, schema, prepared, middleware):
+        try:
+            result = execute(
+                schema,
+                prepared.document,
+                context_value=ResultCacheContext(),
+                variable_values=prepared.variables,
+                operation_name=prepared.operation_name,
+                middleware=middleware,
+            )
+            if result.errors:
+                logger.warning("Refreshing cached result failed: %s", result.errors)
+            else:
+                self.set(key, result.data)
+        except Exception:
+            logger.exception("Refreshing cached result failed")
+        finally:
+            self.cache.delete(lock)
+
+    def memory_bytes(self):
+        """
+        Approximate size of the cache backend's contents.
+
+        Returns:
+            Bytes used by a local-memory or file cache, None for other backends
+        """
+        cache = self.cache
+        if isinstance(cache, LocMemCache):
+            with cache._lock:
+                return sum(len(value) for value in cache._cache.values())
+        if isinstance(cache, FileBasedCache):
+            total = 0
+            for path in cache._list_cache_files():
+                try:
+                    total += os.path.getsize(path)
+                except OSError:
+                    pass
+            return total
+        return None
+
+    def reset(self):
+        """Reset the counters."""
+        with self._lock:
+            self.hits = self.stale_hits = self.misses = self.refreshes = 0
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hits, stale_hits, misses, refreshes, hit_ratio
+            (stale hits count as hits) and memory_bytes
+        """
+        with self._lock:
+            hits = self.hits + self.stale_hits
+            lookups = hits + self.misses
+            stats = {
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            }
+        stats['memory_bytes'] = self.memory_bytes()
+        return stats
+
+
+_result_cache = None
+
+
+def get_result_cache() -> ResultCache:
+    """Get the process-wide result cache configured by the GRAPHQL_RESULT_CACHE_* settings."""
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache(
+            getattr(settings, 'GRAPHQL_RESULT_CACHE_FIELDS', ()),
+            getattr(settings, 'GRAPHQL_RESULT_CACHE_TTL', 60),
+            getattr(settings, 'GRAPHQL_RESULT_CACHE_STALE_TTL', 30),
+        )
+    return _result_cache
@@ -7,8 +7,10 @@ from graphql_api.organizations.queries import OrganizationQuery
 from graphql_api.organizations.mutations import OrganizationMutation
 from graphql_api.projects.queries import ProjectQuery
 from graphql_api.projects.mutations import ProjectMutation
+from graphql_api.projects.subscriptions import ProjectSubscription
 from graphql_api.tasks.queries import TaskQuery
 from graphql_api.tasks.mutations import TaskMutation
+from graphql_api.tasks.subscriptions import TaskSubscription
 
 
 class Query(
@@ -31,5 +33,14 @@ class Mutation(
     pass
 
 
-schema = graphene.Schema(query=Query, mutation=Mutation)
+class Subscription(
+    ProjectSubscription,
+    TaskSubscription,
+    graphene.ObjectType
+):
+    """Root Subscription"""
+    pass
+
+
+schema = graphene.Schema(query=Query, mutation=Mutation, subscription=Subscription)
 
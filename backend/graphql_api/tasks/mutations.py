@@ -3,12 +3,51 @@ GraphQL mutations for tasks.
 """
 import graphene
 from datetime import datetime
+from apps.organizations.services import OrganizationService
+from apps.projects.services import ProjectService
 from apps.tasks.services import TaskService, TaskCommentService
-from apps.core.exceptions import OrganizationMismatchError, InvalidStatusTransitionError
-from .types import TaskType, TaskCommentType
+from apps.core.exceptions import (
+    ConcurrentUpdateError, OrganizationMismatchError, InvalidStatusTransitionError
+)
+from graphql_api.organizations.types import OrganizationStatsType
+from graphql_api.projects.types import ProjectStatsType, ProjectType
+from graphql_api.types import BulkItemErrorType
+from .types import RejectedTaskType, TaskInput, TaskType, TaskCommentType
 
 
-class CreateTask(graphene.Mutation):
+class TaskAggregatesPayload:
+    """
+    Payload fields carrying the aggregates a task write changed.
+    
+    The task service reads the project's and organization's counters back
+    inside the write's transaction, while it holds their row locks (see
+    ``ProjectService.adjust_task_counts``). The fields resolve from those
+    values without further queries, so a client can update its cached
+    counts from the payload instead of refetching, and the counts are
+    exactly the ones the write committed.
+    """
+    
+    project = graphene.Field(ProjectType, description="The project the task belongs to")
+    project_stats = graphene.Field(ProjectStatsType, description="Updated statistics of the project")
+    organization_stats = graphene.Field(
+        OrganizationStatsType, description="Updated statistics of the project's organization"
+    )
+    
+    def resolve_project(self, info):
+        return self.project
+    
+    def resolve_project_stats(self, info):
+        if self.project is None:
+            return None
+        return ProjectStatsType(**ProjectService.counter_stats(self.project))
+    
+    def resolve_organization_stats(self, info):
+        if self.project is None:
+            return None
+        return OrganizationStatsType(**OrganizationService.counter_stats(self.project.organization))
+
+
+class CreateTask(TaskAggregatesPayload, graphene.Mutation):
     """Create a new task."""
     
     class Arguments:
@@ -40,6 +79,7 @@ class CreateTask(graphene.Mutation):
             )
             return CreateTask(
                 task=task,
+                project=task.project,
                 success=True,
                 message="Task created successfully"
             )
@@ -57,7 +97,50 @@ class CreateTask(graphene.Mutation):
             )
 
 
-class UpdateTask(graphene.Mutation):
+class BulkCreateTasks(TaskAggregatesPayload, graphene.Mutation):
+    """Create many tasks in a project at once."""
+    
+    class Arguments:
+        project_id = graphene.Int(required=True)
+        tasks = graphene.List(graphene.NonNull(TaskInput), required=True)
+        organization_id = graphene.Int()
+    
+    tasks = graphene.List(TaskType)
+    errors = graphene.List(BulkItemErrorType)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, project_id, tasks, organization_id=None):
+        try:
+            created, errors = TaskService.bulk_create_tasks(
+                project_id=project_id,
+                tasks=[dict(task) for task in tasks],
+                organization_id=organization_id
+            )
+            return BulkCreateTasks(
+                tasks=created,
+                project=created[0].project if created else None,
+                errors=[BulkItemErrorType(**error) for error in errors],
+                success=not errors,
+                message=f"Created {len(created)} of {len(tasks)} tasks"
+            )
+        except OrganizationMismatchError as e:
+            return BulkCreateTasks(
+                tasks=[],
+                errors=[],
+                success=False,
+                message=str(e)
+            )
+        except Exception as e:
+            return BulkCreateTasks(
+                tasks=[],
+                errors=[],
+                success=False,
+                message=str(e)
+            )
+
+
+class UpdateTask(TaskAggregatesPayload, graphene.Mutation):
     """Update an existing task."""
     
     class Arguments:
@@ -70,12 +153,14 @@ class UpdateTask(graphene.Mutation):
         due_date = graphene.DateTime()
         organization_id = graphene.Int()
         validate_transition = graphene.Boolean()
+        version = graphene.Int(description="Version last read; a newer one fails with conflict")
     
     task = graphene.Field(TaskType)
     success = graphene.Boolean()
     message = graphene.String()
+    conflict = graphene.Boolean(description="True if the task changed since the given version")
     
-    def mutate(self, info, id, organization_id=None, validate_transition=False, **kwargs):
+    def mutate(self, info, id, organization_id=None, validate_transition=False, version=None, **kwargs):
         try:
             # Remove None values
             update_data = {k: v for k, v in kwargs.items() if v is not None}
@@ -84,13 +169,23 @@ class UpdateTask(graphene.Mutation):
                 task_id=id,
                 organization_id=organization_id,
                 validate_transition=validate_transition,
+                expected_version=version,
                 **update_data
             )
             return UpdateTask(
                 task=task,
+                project=task.project,
                 success=True,
+                conflict=False,
                 message="Task updated successfully"
             )
+        except ConcurrentUpdateError as e:
+            return UpdateTask(
+                task=None,
+                success=False,
+                conflict=True,
+                message=str(e)
+            )
         except (OrganizationMismatchError, InvalidStatusTransitionError) as e:
             return UpdateTask(
                 task=None,
@@ -105,7 +200,49 @@ class UpdateTask(graphene.Mutation):
             )
 
 
-class DeleteTask(graphene.Mutation):
+class BulkTransitionTasks(graphene.Mutation):
+    """Move many tasks to a status, honoring the valid status transitions."""
+    
+    class Arguments:
+        task_ids = graphene.List(graphene.NonNull(graphene.Int), required=True)
+        to_status = graphene.String(required=True)
+        organization_id = graphene.Int(required=True)
+    
+    updated_ids = graphene.List(graphene.Int)
+    rejected = graphene.List(RejectedTaskType)
+    success = graphene.Boolean()
+    message = graphene.String()
+    
+    def mutate(self, info, task_ids, to_status, organization_id):
+        try:
+            updated_ids, rejected = TaskService.bulk_transition_tasks(
+                task_ids=task_ids,
+                to_status=to_status,
+                organization_id=organization_id
+            )
+            return BulkTransitionTasks(
+                updated_ids=updated_ids,
+                rejected=[RejectedTaskType(**item) for item in rejected],
+                success=not rejected,
+                message=f"Moved {len(updated_ids)} of {len(updated_ids) + len(rejected)} tasks to {to_status}"
+            )
+        except InvalidStatusTransitionError as e:
+            return BulkTransitionTasks(
+                updated_ids=[],
+                rejected=[],
+                success=False,
+                message=str(e)
+            )
+        except Exception as e:
+            return BulkTransitionTasks(
+                updated_ids=[],
+                rejected=[],
+                success=False,
+                message=str(e)
+            )
+
+
+class DeleteTask(TaskAggregatesPayload, graphene.Mutation):
     """Delete a task."""
     
     class Arguments:
@@ -117,8 +254,9 @@ class DeleteTask(graphene.Mutation):
     
     def mutate(self, info, id, organization_id=None):
         try:
-            TaskService.delete_task(id, organization_id)
+            task = TaskService.delete_task(id, organization_id)
             return DeleteTask(
+                project=task.project,
                 success=True,
                 message="Task deleted successfully"
             )
@@ -227,7 +365,9 @@ class DeleteTaskComment(graphene.Mutation):
 class TaskMutation(graphene.ObjectType):
     """Task mutations."""
     create_task = CreateTask.Field()
+    bulk_create_tasks = BulkCreateTasks.Field()
     update_task = UpdateTask.Field()
+    bulk_transition_tasks = BulkTransitionTasks.Field()
     delete_task = DeleteTask.Field()
     add_task_comment = AddTaskComment.Field()
     update_task_comment = UpdateTaskComment.Field()
@@ -2,9 +2,49 @@
 GraphQL queries for tasks.
 """
 import graphene
+from graphql import GraphQLError
 from apps.tasks.models import Task, TaskComment
 from apps.tasks.services import TaskService, TaskCommentService
-from .types import TaskType, TaskCommentType
+from graphql_api.execution import aget_object, is_async
+from graphql_api.optimizer import get_object
+from graphql_api.pagination import paginate, slice_list
+from .types import (
+    AssigneeWorkloadType, ProjectFlowMetricsType, TaskType, TaskCommentType, TaskConnection, TaskCommentConnection
+)
+
+
+def _filter_tasks(project_id=None, organization_id=None, status=None, assignee_email=None):
+    """Build the task queryset shared by the list and connection fields."""
+    queryset = Task.objects.all()
+    
+    if project_id:
+        queryset = queryset.filter(project_id=project_id)
+    
+    if organization_id:
+        queryset = queryset.filter(project__organization_id=organization_id)
+    
+    if status:
+        queryset = queryset.filter(status=status)
+    
+    if assignee_email:
+        queryset = queryset.filter(assignee_email=assignee_email)
+    
+    return queryset
+
+
+async def _aresolve_workload(organization_id):
+    """Resolve open task counts per assignee with the async ORM."""
+    workload = await TaskService.aget_workload(organization_id)
+    return [AssigneeWorkloadType(**entry) for entry in workload]
+
+
+async def _aresolve_project_flow_metrics(project_id, start, end):
+    """Resolve a project's flow metrics from async code."""
+    try:
+        metrics = await TaskService.aget_flow_metrics(project_id, start, end)
+    except ValueError as error:
+        raise GraphQLError(str(error))
+    return ProjectFlowMetricsType(**metrics)
 
 
 class TaskQuery(graphene.ObjectType):
@@ -17,9 +57,23 @@ class TaskQuery(graphene.ObjectType):
         organization_id=graphene.Int(),
         status=graphene.String(),
         assignee_email=graphene.String(),
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all tasks, optionally filtered"
     )
     
+    # Paginated tasks (optionally filtered)
+    tasks_connection = graphene.Field(
+        TaskConnection,
+        project_id=graphene.Int(),
+        organization_id=graphene.Int(),
+        status=graphene.String(),
+        assignee_email=graphene.String(),
+        first=graphene.Int(),
+        after=graphene.String(),
+        description="Get a page of tasks, newest first, optionally filtered"
+    )
+    
     # Get single task by ID
     task = graphene.Field(
         TaskType,
@@ -33,6 +87,8 @@ class TaskQuery(graphene.ObjectType):
         project_id=graphene.Int(required=True),
         status=graphene.String(),
         assignee_email=graphene.String(),
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all tasks for a project"
     )
     
@@ -41,50 +97,144 @@ class TaskQuery(graphene.ObjectType):
         TaskType,
         organization_id=graphene.Int(required=True),
         status=graphene.String(),
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all tasks for an organization"
     )
     
+    # Tasks assigned to one person in an organization
+    tasks_by_assignee = graphene.List(
+        TaskType,
+        organization_id=graphene.Int(required=True),
+        email=graphene.String(required=True),
+        status=graphene.String(),
+        first=graphene.Int(),
+        offset=graphene.Int(),
+        description="Get an organization's tasks assigned to one person"
+    )
+    
+    # Open task counts per assignee
+    workload = graphene.List(
+        AssigneeWorkloadType,
+        organization_id=graphene.Int(required=True),
+        description="Get open task counts per assignee, by status and priority, busiest first"
+    )
+    
+    # Open tasks past their due date
+    overdue_tasks = graphene.List(
+        TaskType,
+        organization_id=graphene.Int(required=True),
+        first=graphene.Int(),
+        offset=graphene.Int(),
+        description="Get an organization's open tasks past their due date, most overdue first"
+    )
+    
+    # Open tasks due in a time range
+    tasks_due_between = graphene.List(
+        TaskType,
+        organization_id=graphene.Int(required=True),
+        from_=graphene.DateTime(required=True, name='from'),
+        to=graphene.DateTime(required=True),
+        first=graphene.Int(),
+        offset=graphene.Int(),
+        description="Get an organization's open tasks due from 'from' up to (excluding) 'to'"
+    )
+    
     # Get comments for a task
     task_comments = graphene.List(
         TaskCommentType,
         task_id=graphene.Int(required=True),
+        first=graphene.Int(),
+        offset=graphene.Int(),
         description="Get all comments for a task"
     )
     
-    def resolve_tasks(self, info, project_id=None, organization_id=None, status=None, assignee_email=None):
+    # Paginated comments for a task
+    task_comments_connection = graphene.Field(
+        TaskCommentConnection,
+        task_id=graphene.Int(required=True),
+        first=graphene.Int(),
+        after=graphene.String(),
+        description="Get a page of comments for a task, oldest first"
+    )
+    
+    # Cycle time, lead time and throughput of a project
+    project_flow_metrics = graphene.Field(
+        ProjectFlowMetricsType,
+        project_id=graphene.Int(required=True),
+        from_=graphene.Date(required=True, name='from'),
+        to=graphene.Date(required=True),
+        description="Get flow metrics of the tasks a project completed between two days"
+    )
+    
+    def resolve_tasks(self, info, project_id=None, organization_id=None, status=None,
+                      assignee_email=None, first=None, offset=None):
         """Resolve all tasks with optional filters."""
-        queryset = Task.objects.select_related('project', 'project__organization').all()
-        
-        if project_id:
-            queryset = queryset.filter(project_id=project_id)
-        
-        if organization_id:
-            queryset = queryset.filter(project__organization_id=organization_id)
-        
-        if status:
-            queryset = queryset.filter(status=status)
-        
-        if assignee_email:
-            queryset = queryset.filter(assignee_email=assignee_email)
-        
-        return queryset
+        queryset = _filter_tasks(project_id, organization_id, status, assignee_email)
+        return slice_list(queryset, first, offset)
+    
+    def resolve_tasks_connection(self, info, project_id=None, organization_id=None, status=None,
+                                 assignee_email=None, first=None, after=None):
+        """Resolve a page of tasks with optional filters."""
+        queryset = _filter_tasks(project_id, organization_id, status, assignee_email)
+        return paginate(queryset, info, TaskConnection, first=first, after=after)
     
     def resolve_task(self, info, id):
         """Resolve single task by ID."""
-        try:
-            return Task.objects.select_related('project', 'project__organization').get(id=id)
-        except Task.DoesNotExist:
-            return None
+        if is_async(info):
+            return aget_object(Task.objects.filter(id=id), info)
+        return get_object(Task.objects.filter(id=id), info)
     
-    def resolve_tasks_by_project(self, info, project_id, status=None, assignee_email=None):
+    def resolve_tasks_by_project(self, info, project_id, status=None, assignee_email=None,
+                                 first=None, offset=None):
         """Resolve tasks for a specific project."""
-        return TaskService.get_tasks_by_project(project_id, status, assignee_email)
+        queryset = TaskService.get_tasks_by_project(project_id, status, assignee_email)
+        return slice_list(queryset, first, offset)
     
-    def resolve_tasks_by_organization(self, info, organization_id, status=None):
+    def resolve_tasks_by_organization(self, info, organization_id, status=None,
+                                      first=None, offset=None):
         """Resolve tasks for a specific organization."""
-        return TaskService.get_tasks_by_organization(organization_id, status)
+        queryset = TaskService.get_tasks_by_organization(organization_id, status)
+        return slice_list(queryset, first, offset)
+    
+    def resolve_tasks_by_assignee(self, info, organization_id, email, status=None,
+                                  first=None, offset=None):
+        """Resolve an organization's tasks assigned to one person."""
+        queryset = TaskService.get_tasks_by_assignee(organization_id, email, status)
+        return slice_list(queryset, first, offset)
+    
+    def resolve_workload(self, info, organization_id):
+        """Resolve open task counts per assignee of an organization."""
+        if is_async(info):
+            return _aresolve_workload(organization_id)
+        return [AssigneeWorkloadType(**entry) for entry in TaskService.get_workload(organization_id)]
     
-    def resolve_task_comments(self, info, task_id):
+    def resolve_overdue_tasks(self, info, organization_id, first=None, offset=None):
+        """Resolve overdue open tasks of an organization."""
+        return slice_list(TaskService.get_overdue_tasks(organization_id), first, offset)
+    
+    def resolve_tasks_due_between(self, info, organization_id, from_, to, first=None, offset=None):
+        """Resolve open tasks of an organization due in a range."""
+        queryset = TaskService.get_open_tasks_due_between(organization_id, from_, to)
+        return slice_list(queryset, first, offset)
+    
+    def resolve_task_comments(self, info, task_id, first=None, offset=None):
         """Resolve comments for a specific task."""
-        return TaskCommentService.get_comments_by_task(task_id)
-
+        return slice_list(TaskCommentService.get_comments_by_task(task_id), first, offset)
+    
+    def resolve_task_comments_connection(self, info, task_id, first=None, after=None):
+        """Resolve a page of comments for a specific task."""
+        queryset = TaskCommentService.get_comments_by_task(task_id)
+        return paginate(
+            queryset, info, TaskCommentConnection, first=first, after=after, descending=False
+        )
+    
+    def resolve_project_flow_metrics(self, info, project_id, from_, to):
+        """Resolve a project's flow metrics from its task events."""
+        if is_async(info):
+            return _aresolve_project_flow_metrics(project_id, from_, to)
+        try:
+            metrics = TaskService.get_flow_metrics(project_id, from_, to)
+        except ValueError as error:
+            raise GraphQLError(str(error))
+        return ProjectFlowMetricsType(**metrics)
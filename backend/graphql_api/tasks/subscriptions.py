@@ -0,0 +1,60 @@
+"""
+GraphQL subscriptions for tasks and comments.
+"""
+import graphene
+from apps.core.events import get_broker
+from apps.tasks.events import comment_channel, task_channel
+from apps.tasks.models import Task, TaskComment
+from graphql_api.execution import aget_object
+from .types import TaskType, TaskCommentType
+
+
+class TaskChangedEvent(graphene.ObjectType):
+    """A task was created, updated or deleted."""
+    
+    action = graphene.String(description="CREATED, UPDATED or DELETED")
+    task_id = graphene.Int()
+    project_id = graphene.Int()
+    task = graphene.Field(TaskType, description="The task as it is now, null once deleted")
+    
+    def resolve_task(self, info):
+        """Load the task's current state."""
+        return aget_object(Task.objects.filter(id=self.task_id), info)
+
+
+class TaskSubscription(graphene.ObjectType):
+    """Task subscriptions."""
+    
+    # Task changes within a project
+    task_changed = graphene.Field(
+        TaskChangedEvent,
+        project_id=graphene.Int(required=True),
+        description="Receive tasks of a project as they are created, updated or deleted"
+    )
+    
+    # New comments on a task
+    comment_added = graphene.Field(
+        TaskCommentType,
+        task_id=graphene.Int(required=True),
+        description="Receive comments added to a task"
+    )
+    
+    def subscribe_task_changed(root, info, project_id):
+        """Subscribe to a project's task changes."""
+        return get_broker().subscribe(task_channel(project_id))
+    
+    def resolve_task_changed(event, info, project_id):
+        """Resolve a published task change."""
+        return TaskChangedEvent(
+            action=event['action'],
+            task_id=event['task_id'],
+            project_id=event['project_id'],
+        )
+    
+    def subscribe_comment_added(root, info, task_id):
+        """Subscribe to a task's new comments."""
+        return get_broker().subscribe(comment_channel(task_id))
+    
+    def resolve_comment_added(event, info, task_id):
+        """Resolve a published comment."""
+        return aget_object(TaskComment.objects.filter(id=event['comment_id']), info)
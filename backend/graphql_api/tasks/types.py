@@ -4,6 +4,7 @@ GraphQL types for tasks.
 import graphene
 from graphene_django import DjangoObjectType
 from apps.tasks.models import Task, TaskComment
+from graphql_api.loaders import TaskCommentCountsLoader, get_loader
 
 
 class TaskType(DjangoObjectType):
@@ -14,11 +15,13 @@ class TaskType(DjangoObjectType):
     
     class Meta:
         model = Task
-        fields = ('id', 'project', 'title', 'description', 'status', 'priority', 'assignee_email', 'due_date', 'created_at', 'updated_at')
+        fields = ('id', 'project', 'title', 'description', 'status', 'priority', 'assignee_email', 'due_date', 'version', 'created_at', 'updated_at')
     
     def resolve_comment_count(self, info):
         """Get number of comments for this task."""
-        return self.comments.count()
+        if 'comments' in getattr(self, '_prefetched_objects_cache', {}):
+            return len(self.comments.all())
+        return get_loader(info, TaskCommentCountsLoader).load(self.pk)
     
     def resolve_comments(self, info):
         """Get all comments for this task."""
@@ -32,3 +35,84 @@ class TaskCommentType(DjangoObjectType):
         model = TaskComment
         fields = ('id', 'task', 'content', 'author_email', 'created_at', 'updated_at')
 
+
+class TaskConnection(graphene.relay.Connection):
+    """Keyset-paginated tasks, newest first."""
+    
+    class Meta:
+        node = TaskType
+
+
+class TaskCommentConnection(graphene.relay.Connection):
+    """Keyset-paginated task comments, oldest first."""
+    
+    class Meta:
+        node = TaskCommentType
+
+
+class TaskInput(graphene.InputObjectType):
+    """Fields of a task to create."""
+    title = graphene.String(required=True)
+    description = graphene.String()
+    status = graphene.String()
+    priority = graphene.String()
+    assignee_email = graphene.String()
+    due_date = graphene.DateTime()
+
+
+class RejectedTaskType(graphene.ObjectType):
+    """A task a bulk mutation left unchanged, and why."""
+    task_id = graphene.Int()
+    reason = graphene.String()
+
+
+class DurationPercentilesType(graphene.ObjectType):
+    """Percentiles of a duration, in hours."""
+    p50 = graphene.Float()
+    p85 = graphene.Float()
+    p95 = graphene.Float()
+
+
+class WeeklyThroughputType(graphene.ObjectType):
+    """Tasks completed in one week."""
+    week_start = graphene.Date(description="Monday the week starts on")
+    completed_tasks = graphene.Int()
+
+
+class AssigneeFlowMetricsType(graphene.ObjectType):
+    """Flow metrics of the tasks one assignee completed."""
+    assignee_email = graphene.String(description="Empty for unassigned tasks")
+    completed_tasks = graphene.Int()
+    cycle_time_hours = graphene.Field(DurationPercentilesType)
+
+
+class ProjectFlowMetricsType(graphene.ObjectType):
+    """Cycle time, lead time and throughput of a project's completed tasks."""
+    project_id = graphene.Int()
+    completed_tasks = graphene.Int()
+    cycle_time_hours = graphene.Field(
+        DurationPercentilesType, description="From first in progress to done"
+    )
+    lead_time_hours = graphene.Field(DurationPercentilesType, description="From creation to done")
+    weekly_throughput = graphene.List(WeeklyThroughputType)
+    assignees = graphene.List(AssigneeFlowMetricsType)
+
+
+class StatusCountType(graphene.ObjectType):
+    """Number of tasks in one status."""
+    status = graphene.String()
+    count = graphene.Int()
+
+
+class PriorityCountType(graphene.ObjectType):
+    """Number of tasks with one priority."""
+    priority = graphene.String()
+    count = graphene.Int()
+
+
+class AssigneeWorkloadType(graphene.ObjectType):
+    """Open tasks of one assignee."""
+    assignee_email = graphene.String(description="Empty for unassigned tasks")
+    open_tasks = graphene.Int()
+    by_status = graphene.List(StatusCountType)
+    by_priority = graphene.List(PriorityCountType)
@@ -0,0 +1,1687 @@
+"""
+Tests for the GraphQL API layer.
+"""
+import json
+
+import pytest
+from django.test import RequestFactory
+from apps.organizations.models import Organization
+from apps.projects.models import Project
+from apps.projects.services import ProjectService
+from apps.tasks.models import Task, TaskComment
+from apps.tasks.services import TaskService
+from graphql_api.schema import schema
+
+
+def execute(query, variables=None):
+    """Execute a query the way GraphQLView does, with a request as context."""
+    from graphene_django.settings import graphene_settings
+    from graphene_django.views import instantiate_middleware
+
+    request = RequestFactory().post('/graphql/')
+    result = schema.execute(
+        query,
+        variables=variables,
+        context_value=request,
+        middleware=list(instantiate_middleware(graphene_settings.MIDDLEWARE)),
+    )
+    assert result.errors is None, result.errors
+    return result.data
+
+
+@pytest.mark.django_db
+class TestProjectTaskCounts:
+    """Test task counters on ProjectType."""
+
+    QUERY = """
+        query {
+            projects {
+                id
+                taskCount
+                completedTasks
+                inProgressTasks
+                todoTasks
+                completionRate
+            }
+        }
+    """
+
+    def test_counts_are_correct(self):
+        """Test counters match the project's tasks."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = ProjectService.create_project(org.id, "Test Project")
+        ProjectService.create_project(org.id, "Empty Project")
+        TaskService.create_task(project.id, "Task 1", status="DONE")
+        TaskService.create_task(project.id, "Task 2", status="IN_PROGRESS")
+        TaskService.create_task(project.id, "Task 3", status="TODO")
+        TaskService.create_task(project.id, "Task 4", status="TODO")
+
+        data = execute(self.QUERY)
+        by_id = {int(p['id']): p for p in data['projects']}
+
+        assert by_id[project.id] == {
+            'id': str(project.id),
+            'taskCount': 4,
+            'completedTasks': 1,
+            'inProgressTasks': 1,
+            'todoTasks': 2,
+            'completionRate': 25.0,
+        }
+        empty = next(p for pid, p in by_id.items() if pid != project.id)
+        assert empty['taskCount'] == 0
+        assert empty['completionRate'] == 0.0
+
+    def test_counts_use_one_query(self, django_assert_num_queries):
+        """Test counters are read from the projects' own rows."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        for i in range(10):
+            project = ProjectService.create_project(org.id, f"Project {i}")
+            TaskService.create_task(project.id, "Task", status="DONE")
+
+        with django_assert_num_queries(1):
+            data = execute(self.QUERY)
+        assert len(data['projects']) == 10
+
+
+@pytest.mark.django_db
+class TestOrganizationProjectCounts:
+    """Test project counters on OrganizationType."""
+
+    QUERY = """
+        query {
+            organizations {
+                id
+                projectCount
+                activeProjectCount
+            }
+        }
+    """
+
+    def test_counts_use_one_query(self, django_assert_num_queries):
+        """Test counters are read from the organizations' own rows."""
+        for i in range(5):
+            org = Organization.objects.create(
+                name=f"Org {i}",
+                slug=f"org-{i}",
+                contact_email="test@example.com"
+            )
+            ProjectService.create_project(org.id, "Active", status="ACTIVE")
+            ProjectService.create_project(org.id, "Done", status="COMPLETED")
+
+        with django_assert_num_queries(1):
+            data = execute(self.QUERY)
+
+        assert len(data['organizations']) == 5
+        for org in data['organizations']:
+            assert org['projectCount'] == 2
+            assert org['activeProjectCount'] == 1
+
+
+@pytest.mark.django_db
+class TestQueryOptimizer:
+    """Test selection-set driven select_related/prefetch_related/only."""
+
+    def _create_tasks(self, count=5):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=org, name="Test Project")
+        for i in range(count):
+            task = Task.objects.create(project=project, title=f"Task {i}")
+            task.comments.create(content="Comment", author_email="test@example.com")
+        return project
+
+    def test_nested_foreign_keys_are_joined(self, django_assert_num_queries):
+        """Test project { organization } is joined instead of queried per row."""
+        project = self._create_tasks()
+        query = """
+            query ($projectId: Int!) {
+                tasksByProject(projectId: $projectId) {
+                    title
+                    project { name organization { name } }
+                }
+            }
+        """
+        with django_assert_num_queries(1):
+            data = execute(query, {'projectId': project.id})
+
+        assert len(data['tasksByProject']) == 5
+        assert data['tasksByProject'][0]['project']['organization']['name'] == "Test Org"
+
+    def test_reverse_relations_are_prefetched(self, django_assert_num_queries):
+        """Test tasks { comments } is prefetched for a single project."""
+        project = self._create_tasks()
+        query = """
+            query ($id: Int!) {
+                project(id: $id) {
+                    name
+                    tasks { title comments { content } }
+                }
+            }
+        """
+        # Project, its tasks, and every task's comments
+        with django_assert_num_queries(3):
+            data = execute(query, {'id': project.id})
+
+        assert len(data['project']['tasks']) == 5
+        assert data['project']['tasks'][0]['comments'][0]['content'] == "Comment"
+
+    def test_only_selected_columns_are_loaded(self, django_assert_num_queries):
+        """Test unselected columns are deferred on list queries."""
+        self._create_tasks(count=1)
+        with django_assert_num_queries(1) as captured:
+            execute("query { tasks { id title } }")
+
+        sql = captured.captured_queries[0]['sql']
+        assert '"tasks"."title"' in sql
+        assert '"tasks"."description"' not in sql
+
+    def test_single_object_text_columns_are_deferred(self, django_assert_num_queries):
+        """Test single-object roots and their joined rows skip unselected text columns."""
+        project = self._create_tasks(count=1)
+        task = project.tasks.get()
+        query = """
+            query ($id: Int!) {
+                task(id: $id) { title project { name organization { name } } }
+            }
+        """
+        with django_assert_num_queries(1) as captured:
+            data = execute(query, {'id': task.id})
+
+        assert data['task']['project']['organization']['name'] == "Test Org"
+        sql = captured.captured_queries[0]['sql']
+        assert '"tasks"."description"' not in sql
+        assert '"projects"."description"' not in sql
+
+        with django_assert_num_queries(1) as captured:
+            execute("query ($id: Int!) { task(id: $id) { description } }", {'id': task.id})
+        assert '"tasks"."description"' in captured.captured_queries[0]['sql']
+
+    def test_unprefetched_nested_lists_are_projected(self, django_assert_num_queries):
+        """Test querysets resolved below a mutation payload only load selected columns."""
+        project = self._create_tasks(count=1)
+        task = project.tasks.get()
+        query = """
+            mutation ($id: Int!) {
+                updateTask(id: $id, title: "Renamed") { task { comments { authorEmail } } }
+            }
+        """
+        # Savepoint, locking fetch, UPDATE, event, data version bump, counters
+        # read back, release, then the comments
+        with django_assert_num_queries(8) as captured:
+            data = execute(query, {'id': task.id})
+
+        assert data['updateTask']['task']['comments'] == [{'authorEmail': "test@example.com"}]
+        sql = captured.captured_queries[-1]['sql']
+        assert '"task_comments"."author_email"' in sql
+        assert '"task_comments"."content"' not in sql
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Test cursor-based connections."""
+
+    QUERY = """
+        query ($projectId: Int, $first: Int, $after: String) {
+            tasksConnection(projectId: $projectId, first: $first, after: $after) {
+                edges { cursor node { id title } }
+                pageInfo { hasNextPage endCursor }
+            }
+        }
+    """
+
+    def _create_project(self, task_count):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = Project.objects.create(organization=org, name="Test Project")
+        for i in range(task_count):
+            Task.objects.create(project=project, title=f"Task {i}")
+        return project
+
+    def test_pages_cover_every_task_once(self):
+        """Test walking the cursors returns every task newest first."""
+        project = self._create_project(7)
+        seen = []
+        after = None
+        while True:
+            data = execute(self.QUERY, {'projectId': project.id, 'first': 3, 'after': after})
+            connection = data['tasksConnection']
+            seen.extend(edge['node']['title'] for edge in connection['edges'])
+            if not connection['pageInfo']['hasNextPage']:
+                break
+            after = connection['pageInfo']['endCursor']
+
+        assert seen == [f"Task {i}" for i in reversed(range(7))]
+
+    def test_page_size_is_capped(self, settings):
+        """Test 'first' above GRAPHQL_MAX_PAGE_SIZE is clamped."""
+        settings.GRAPHQL_MAX_PAGE_SIZE = 2
+        project = self._create_project(5)
+        data = execute(self.QUERY, {'projectId': project.id, 'first': 1000})
+
+        assert len(data['tasksConnection']['edges']) == 2
+        assert data['tasksConnection']['pageInfo']['hasNextPage'] is True
+
+    def test_invalid_cursor(self):
+        """Test a malformed cursor is reported as an error."""
+        result = schema.execute(
+            self.QUERY,
+            variables={'after': 'not-a-cursor'},
+            context_value=RequestFactory().post('/graphql/'),
+        )
+        assert result.errors
+        assert "Invalid cursor" in result.errors[0].message
+
+    def test_list_fields_are_capped(self, settings):
+        """Test plain list fields return at most GRAPHQL_MAX_PAGE_SIZE rows."""
+        settings.GRAPHQL_MAX_PAGE_SIZE = 2
+        project = self._create_project(5)
+        data = execute(
+            'query ($projectId: Int!) '
+            '{ tasks { id } tasksByProject(projectId: $projectId) { id } }',
+            {'projectId': project.id},
+        )
+
+        assert len(data['tasks']) == 2
+        assert len(data['tasksByProject']) == 2
+
+    def test_list_fields_take_first_and_offset(self):
+        """Test 'first' and 'offset' page through a plain list field."""
+        project = self._create_project(5)
+        data = execute(
+            'query ($projectId: Int!) '
+            '{ tasksByProject(projectId: $projectId, first: 2, offset: 1) { title } }',
+            {'projectId': project.id},
+        )
+
+        assert [task['title'] for task in data['tasksByProject']] == ["Task 3", "Task 2"]
+
+    def test_negative_offset_is_rejected(self):
+        """Test a negative 'offset' is reported as an error."""
+        result = schema.execute(
+            'query { tasks(offset: -1) { id } }',
+            context_value=RequestFactory().post('/graphql/'),
+        )
+        assert "'offset' must not be negative" in result.errors[0].message
+
+
+class TestDocumentCache:
+    """Test the parsed-and-validated document cache."""
+
+    def test_repeat_queries_hit_the_cache(self):
+        """Test the second lookup of a query is a hit."""
+        from graphql_api.documents import DocumentCache
+
+        cache = DocumentCache(max_size=10)
+        first = cache.get(schema.graphql_schema, "query { organizations { id } }")
+        second = cache.get(schema.graphql_schema, "query { organizations { id } }")
+
+        assert first is second
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    def test_validation_errors_are_cached(self):
+        """Test invalid documents keep their validation errors."""
+        from graphql_api.documents import DocumentCache
+
+        cache = DocumentCache(max_size=10)
+        entry = cache.get(schema.graphql_schema, "query { noSuchField }")
+
+        assert entry.errors
+        assert cache.get(schema.graphql_schema, "query { noSuchField }").errors == entry.errors
+
+    def test_least_recently_used_entries_are_evicted(self):
+        """Test the cache never grows past max_size."""
+        from graphql_api.documents import DocumentCache
+
+        cache = DocumentCache(max_size=2)
+        for field in ('id', 'name', 'slug'):
+            cache.get(schema.graphql_schema, f"query {{ organizations {{ {field} }} }}")
+
+        assert cache.stats()['size'] == 2
+        cache.get(schema.graphql_schema, "query { organizations { id } }")
+        assert cache.stats()['misses'] == 4
+
+
+@pytest.mark.django_db
+class TestGraphQLView:
+    """Test the /graphql/ endpoint."""
+
+    def test_post_query(self, client):
+        """Test a query executes through the cached view."""
+        Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        response = client.post(
+            '/graphql/',
+            {'query': 'query { organizations { name } }'},
+            content_type='application/json',
+        )
+        assert response.status_code == 200
+        assert response.json()['data']['organizations'] == [{'name': "Test Org"}]
+
+    def test_get_mutation_is_rejected(self, client):
+        """Test mutations are still refused over GET."""
+        response = client.get(
+            '/graphql/',
+            {'query': 'mutation { deleteTask(id: 1) { success } }'},
+            HTTP_ACCEPT='application/json',
+        )
+        assert response.status_code == 405
+
+
+@pytest.mark.django_db
+class TestBatchedOperations:
+    """Test many operations sent as one JSON array."""
+
+    @pytest.fixture
+    def project(self, organization_factory, project_factory):
+        return project_factory(organization_factory())
+
+    def post(self, client, operations):
+        return client.post('/graphql/', operations, content_type='application/json')
+
+    def test_batch_shares_loaders(self, client, project, task_factory, django_assert_num_queries):
+        """Test each operation gets a result and later ones reuse loaded counts."""
+        task = task_factory(project)
+        TaskComment.objects.create(task=task, content="Comment", author_email="a@example.com")
+
+        # Tasks twice, the comment counts once
+        with django_assert_num_queries(3):
+            response = self.post(client, [
+                {'query': 'query { tasks { id commentCount } }'},
+                {'query': 'query Counts { tasks { commentCount } }', 'id': 'counts'},
+            ])
+
+        assert response.status_code == 200
+        first, second = response.json()
+        assert first['data'] == {'tasks': [{'id': str(task.id), 'commentCount': 1}]}
+        assert second['data'] == {'tasks': [{'commentCount': 1}]}
+        assert second['id'] == 'counts'
+
+    def test_operations_after_a_mutation_see_the_write(self, client, project, task_factory):
+        """Test loaders are reset after a mutation in the batch."""
+        task = task_factory(project)
+        response = self.post(client, [
+            {'query': 'query { tasks { commentCount } }'},
+            {
+                'query': (
+                    'mutation ($id: Int!) { addTaskComment(taskId: $id, content: "Hi", '
+                    'authorEmail: "a@example.com") { success } }'
+                ),
+                'variables': {'id': task.id},
+            },
+            {'query': 'query { tasks { commentCount } }'},
+        ])
+
+        before, created, after = response.json()
+        assert before['data']['tasks'] == [{'commentCount': 0}]
+        assert created['data']['addTaskComment']['success'] is True
+        assert after['data']['tasks'] == [{'commentCount': 1}]
+
+    def test_batch_size_is_limited(self, client, settings):
+        """Test batches over GRAPHQL_MAX_BATCH_SIZE are rejected."""
+        settings.GRAPHQL_MAX_BATCH_SIZE = 2
+        response = self.post(client, [{'query': 'query { organizations { id } }'}] * 3)
+
+        assert response.status_code == 400
+        assert "maximum of 2" in response.json()['errors'][0]['message']
+
+        settings.GRAPHQL_MAX_BATCH_SIZE = 0
+        response = self.post(client, [{'query': 'query { organizations { id } }'}])
+        assert response.status_code == 400
+
+    def test_async_view_batch(self, project):
+        """Test the async view answers a batch with an array of results."""
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+        from graphql_api.views import AsyncGraphQLView
+
+        request = AsyncRequestFactory().post(
+            '/graphql/',
+            [
+                {'query': 'query { projects { name taskCount } }'},
+                {'query': 'query { organizations { name } }'},
+            ],
+            content_type='application/json',
+        )
+        response = async_to_sync(AsyncGraphQLView.as_view())(request)
+
+        assert response.status_code == 200
+        projects, organizations = json.loads(response.content)
+        assert projects['data']['projects'] == [{'name': "Test Project", 'taskCount': 0}]
+        assert organizations['data']['organizations'] == [{'name': project.organization.name}]
+
+
+@pytest.mark.django_db
+class TestPersistedQueries:
+    """Test automatic persisted queries and cacheable GET responses."""
+
+    QUERY = 'query { organizations { name } }'
+
+    def _extensions(self, query):
+        from graphql_api.documents import hash_document
+        return {'persistedQuery': {'version': 1, 'sha256Hash': hash_document(query)}}
+
+    def test_unknown_hash_then_register(self, client):
+        """Test an unknown hash is rejected, then works once registered."""
+        import json
+        from django.core.cache import cache
+        cache.clear()
+        extensions = self._extensions(self.QUERY)
+
+        response = client.post(
+            '/graphql/', {'extensions': extensions}, content_type='application/json'
+        )
+        assert response.json()['errors'][0]['message'] == "PersistedQueryNotFound"
+
+        response = client.post(
+            '/graphql/',
+            {'query': self.QUERY, 'extensions': extensions},
+            content_type='application/json',
+        )
+        assert response.json()['data'] == {'organizations': []}
+
+        response = client.get(
+            '/graphql/',
+            {'extensions': json.dumps(extensions)},
+            HTTP_ACCEPT='application/json',
+        )
+        assert response.status_code == 200
+        assert response.json()['data'] == {'organizations': []}
+
+    def test_hash_mismatch(self, client):
+        """Test a query that does not match its hash is refused."""
+        response = client.post(
+            '/graphql/',
+            {'query': self.QUERY, 'extensions': self._extensions('query { tasks { id } }')},
+            content_type='application/json',
+        )
+        assert response.json()['errors'][0]['message'] == "provided sha does not match query"
+
+    def test_frontend_operations_are_seeded(self):
+        """Test the registry knows the frontend's queries without registration."""
+        from graphql_api.persisted import get_persisted_query_registry
+
+        registry = get_persisted_query_registry()
+        assert any('query GetProjects' in document for document in registry.seeded.values())
+        for operation in ('mutation CreateTask(', 'mutation UpdateTask(', 'mutation DeleteTask('):
+            assert any(operation in document for document in registry.seeded.values()), operation
+
+    def test_seeded_hashes_match_client_hashes(self, client, settings):
+        """Test seeded operations are found by the hash of their printed form."""
+        import hashlib
+        from graphql import parse, print_ast
+        from graphql_api.persisted import extract_documents, get_persisted_query_registry
+
+        path = settings.GRAPHQL_PERSISTED_QUERIES_SEED_DIRS[0] / 'queries.ts'
+        documents = extract_documents(path.read_text(encoding='utf-8'))
+        assert documents
+        # Persisted-query links hash the printed document, not the template text
+        hashes = {
+            document: hashlib.sha256(print_ast(parse(document)).encode('utf-8')).hexdigest()
+            for document in documents
+        }
+        response = client.post(
+            '/graphql/',
+            {'extensions': {'persistedQuery': {
+                'version': 1,
+                'sha256Hash': hashes[next(d for d in documents if 'query GetOrganizations' in d)],
+            }}},
+            content_type='application/json',
+        )
+        assert response.json()['data'] == {'organizations': []}
+
+        registry = get_persisted_query_registry()
+        for document, sha256_hash in hashes.items():
+            assert registry.get(sha256_hash) is not None, document
+
+    def test_get_response_has_etag(self, client):
+        """Test GET queries are cacheable and honour If-None-Match."""
+        response = client.get(
+            '/graphql/', {'query': self.QUERY}, HTTP_ACCEPT='application/json'
+        )
+        assert response.status_code == 200
+        assert 'no-cache' in response['Cache-Control']
+        assert not response.cookies
+
+        response = client.get(
+            '/graphql/',
+            {'query': self.QUERY},
+            HTTP_ACCEPT='application/json',
+            HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        assert response.status_code == 304
+
+
+@pytest.mark.django_db
+class TestQueryCost:
+    """Test static cost analysis and reporting."""
+
+    def _post(self, client, query, variables=None):
+        return client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+        )
+
+    def test_cost_is_reported(self, client):
+        """Test estimated and actual cost are returned in extensions."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        Project.objects.create(organization=org, name="Project 1")
+        Project.objects.create(organization=org, name="Project 2")
+
+        response = self._post(client, 'query { projects { name organization { name } } }')
+        cost = response.json()['extensions']['cost']
+
+        # Up to GRAPHQL_MAX_PAGE_SIZE (100) projects with one organization each
+        assert cost['estimated'] == 200
+        assert cost['actual'] == 4
+
+    def test_list_cost_uses_first(self, client):
+        """Test capped list fields are estimated from the requested size."""
+        response = self._post(client, 'query { projects(first: 5) { name tasks { id } } }')
+
+        # 5 projects with an unbounded list of 50 tasks each
+        assert response.json()['extensions']['cost']['estimated'] == 255
+
+    def test_connection_cost_uses_first(self, client):
+        """Test connections are estimated from the requested page size."""
+        response = self._post(
+            client,
+            'query ($first: Int) { tasksConnection(first: $first) { edges { node { id } } } }',
+            {'first': 10},
+        )
+        # The connection, plus 10 edges with one node each
+        assert response.json()['extensions']['cost']['estimated'] == 21
+
+    def test_expensive_query_is_rejected(self, client, settings):
+        """Test operations over the budget are rejected without executing."""
+        settings.GRAPHQL_MAX_QUERY_COST = 1000
+        response = self._post(
+            client, 'query { projects { tasks { comments { id } } } }'
+        )
+        error = response.json()['errors'][0]
+
+        assert response.status_code == 400
+        assert error['extensions']['code'] == 'QUERY_TOO_COMPLEX'
+        assert 'data' not in response.json()
+
+    def test_deep_query_is_rejected(self, client, settings):
+        """Test operations nested deeper than the limit are rejected."""
+        settings.GRAPHQL_MAX_QUERY_DEPTH = 3
+        response = self._post(
+            client, 'query { tasks { project { organization { name } } } }'
+        )
+        assert "depth 4 exceeds" in response.json()['errors'][0]['message']
+
+
+@pytest.mark.django_db
+class TestMetrics:
+    """Test resolver metrics, the /metrics endpoint and DB stats headers."""
+
+    QUERY = 'query GetProjects { projects { name taskCount } }'
+
+    @pytest.fixture(autouse=True)
+    def registry(self):
+        from graphql_api.metrics import get_metrics_registry
+
+        registry = get_metrics_registry()
+        registry.reset()
+        yield registry
+        registry.reset()
+
+    def _post(self, client, query, **headers):
+        return client.post(
+            '/graphql/',
+            {'query': query},
+            content_type='application/json',
+            **headers,
+        )
+
+    def test_operation_and_resolvers_are_recorded(self, client, registry):
+        """Test calls and SQL are attributed to the operation and resolvers."""
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        Project.objects.create(organization=org, name="Project 1")
+        Project.objects.create(organization=org, name="Project 2")
+
+        self._post(client, self.QUERY)
+
+        operation = registry.operations[('GetProjects', 'query')]
+        assert operation.count == 1
+        assert operation.errors == 0
+        assert operation.db_queries == 1
+
+        projects = registry.resolvers[('GetProjects', 'Query.projects')]
+        task_count = registry.resolvers[('GetProjects', 'ProjectType.taskCount')]
+        assert projects.calls == 1
+        assert projects.db_queries == 1
+        assert task_count.calls == 2
+        # Counters are columns of the projects already loaded
+        assert task_count.db_queries == 0
+        # Default scalar resolvers are not timed
+        assert ('GetProjects', 'ProjectType.name') not in registry.resolvers
+
+    def test_operation_names_are_capped(self, client, registry):
+        """Test distinct operation names beyond the cap are folded into 'other'."""
+        registry.max_operations = 1
+        self._post(client, 'query First { organizations { name } }')
+        self._post(client, 'query Second { organizations { name } }')
+
+        assert ('First', 'query') in registry.operations
+        assert ('other', 'query') in registry.operations
+        assert ('Second', 'query') not in registry.operations
+
+    def test_metrics_endpoint(self, client):
+        """Test /metrics renders the Prometheus text format."""
+        self._post(client, self.QUERY)
+        response = client.get('/metrics')
+        body = response.content.decode()
+
+        assert response.status_code == 200
+        assert response['Content-Type'].startswith('text/plain')
+        assert 'graphql_operations_total{operation="GetProjects",type="query"} 1' in body
+        assert (
+            'graphql_resolver_duration_seconds_count'
+            '{operation="GetProjects",resolver="Query.projects"} 1'
+        ) in body
+        assert 'le="+Inf"' in body
+
+    def test_db_stats_headers_on_request(self, client):
+        """Test X-DB-Queries and X-DB-Time are only sent when asked for."""
+        response = self._post(client, self.QUERY)
+        assert 'X-DB-Queries' not in response
+
+        response = self._post(client, self.QUERY, HTTP_X_DB_STATS='1')
+        assert response['X-DB-Queries'] == '1'
+        assert float(response['X-DB-Time']) >= 0
+
+
+@pytest.mark.django_db
+class TestAsyncExecution:
+    """Test the async view and the async read paths."""
+
+    def _post(self, query, variables=None):
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+        from graphql_api.views import AsyncGraphQLView
+
+        request = AsyncRequestFactory().post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            headers={'X-DB-Stats': '1'},
+        )
+        return async_to_sync(AsyncGraphQLView.as_view())(request)
+
+    @pytest.fixture
+    def org(self):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        for name in ("Project 1", "Project 2"):
+            project = ProjectService.create_project(org.id, name)
+            TaskService.create_task(project.id, "Task 1", status='DONE')
+            task = TaskService.create_task(project.id, "Task 2")
+            task.comments.create(content="Comment", author_email="a@example.com")
+        return org
+
+    def test_nested_query(self, org):
+        """Test nested lists, loaders and joins resolve without blocking calls."""
+        query = '''
+            query {
+                projects {
+                    name
+                    taskCount
+                    completionRate
+                    organization { name projectCount }
+                    tasks { title commentCount }
+                }
+            }
+        '''
+        response = self._post(query)
+        body = json.loads(response.content)
+
+        assert 'errors' not in body, body
+        assert response.status_code == 200
+        assert body['data'] == execute(query)
+        # projects with their organizations + tasks prefetch + comment counts
+        assert response['X-DB-Queries'] == '3'
+
+    def test_root_fields_resolve_together(self, org):
+        """Test single-object, stats and connection root fields in one query."""
+        project = org.projects.first()
+        task = project.tasks.first()
+        response = self._post(
+            '''
+            query ($org: Int!, $project: Int!, $task: Int!) {
+                organization(id: $org) { name }
+                organizationStats(organizationId: $org) { totalTasks completedTasks }
+                project(id: $project) { name tasks { title } }
+                projectStats(projectId: $project) { completionRate }
+                task(id: $task) { title project { name organization { slug } } }
+                tasksConnection(first: 1) { edges { node { title project { name } } } }
+                missing: project(id: 0) { name }
+            }
+            ''',
+            {'org': org.id, 'project': project.id, 'task': task.id},
+        )
+        data = json.loads(response.content)['data']
+
+        assert data['organization'] == {'name': "Test Org"}
+        assert data['organizationStats'] == {'totalTasks': 4, 'completedTasks': 2}
+        assert len(data['project']['tasks']) == 2
+        assert data['projectStats'] == {'completionRate': 50.0}
+        assert data['task']['project']['organization'] == {'slug': "test-org"}
+        assert len(data['tasksConnection']['edges']) == 1
+        assert data['missing'] is None
+
+    def test_unjoined_foreign_key_is_loaded(self, org):
+        """Test a foreign key the optimizer did not join is loaded off the event loop."""
+        response = self._post('query { tasksByProject(projectId: %d) { title } }' % org.projects.first().id)
+        assert json.loads(response.content)['data']['tasksByProject']
+
+        comment = TaskComment.objects.first()
+        response = self._post(
+            'query ($task: Int!) { taskComments(taskId: $task) { task { project { name } } } }',
+            {'task': comment.task_id},
+        )
+        body = json.loads(response.content)
+        assert 'errors' not in body, body
+        assert body['data']['taskComments'][0]['task']['project']['name'].startswith("Project")
+
+    def test_workload(self, org):
+        """Test the workload counts are read with the async ORM."""
+        query = '''
+            query ($org: Int!) {
+                workload(organizationId: $org) { assigneeEmail openTasks byStatus { status count } }
+            }
+        '''
+        response = self._post(query, {'org': org.id})
+        body = json.loads(response.content)
+
+        assert 'errors' not in body, body
+        assert body['data'] == execute(query, {'org': org.id})
+        assert body['data']['workload'][0]['openTasks'] == 2
+
+    def test_mutation(self, org):
+        """Test mutations still run through the async view."""
+        response = self._post(
+            'mutation ($project: Int!) { createTask(projectId: $project, title: "New") { success } }',
+            {'project': org.projects.first().id},
+        )
+        assert json.loads(response.content)['data']['createTask']['success'] is True
+        assert Task.objects.filter(title="New").exists()
+
+    def test_service_read_paths(self, org):
+        """Test the async service methods match their sync counterparts."""
+        from asgiref.sync import async_to_sync
+        from apps.organizations.services import OrganizationService
+        from apps.projects.services import ProjectService
+        from apps.tasks.services import TaskService
+
+        project = org.projects.first()
+        assert async_to_sync(OrganizationService.aget_organization_stats)(org.id) == (
+            OrganizationService.get_organization_stats(org.id)
+        )
+        assert async_to_sync(ProjectService.aget_project_stats)(project.id) == (
+            ProjectService.get_project_stats(project.id)
+        )
+        assert len(async_to_sync(TaskService.aget_tasks_by_organization)(org.id)) == 4
+
+
+class WebSocketClient:
+    """Drives an ASGI WebSocket application in-process."""
+
+    def __init__(self, app):
+        import asyncio
+
+        self.app = app
+        self.incoming = asyncio.Queue()
+        self.outgoing = asyncio.Queue()
+        self.task = None
+
+    async def connect(self, path='/graphql/', subprotocols=('graphql-transport-ws',)):
+        import asyncio
+
+        scope = {'type': 'websocket', 'path': path, 'subprotocols': list(subprotocols)}
+        self.task = asyncio.ensure_future(self.app(scope, self.incoming.get, self.outgoing.put))
+        await self.incoming.put({'type': 'websocket.connect'})
+        return await self.outgoing.get()
+
+    async def send(self, message):
+        await self.incoming.put({'type': 'websocket.receive', 'text': json.dumps(message)})
+
+    async def receive(self):
+        import asyncio
+
+        message = await asyncio.wait_for(self.outgoing.get(), 5)
+        if message['type'] == 'websocket.send':
+            return json.loads(message['text'])
+        return message
+
+    async def disconnect(self):
+        await self.incoming.put({'type': 'websocket.disconnect'})
+        await self.task
+
+
+@pytest.mark.django_db
+class TestSubscriptions:
+    """Test GraphQL subscriptions over WebSocket."""
+
+    @pytest.fixture
+    def broker(self, monkeypatch):
+        from apps.core.events import InProcessBroker
+
+        broker = InProcessBroker()
+        monkeypatch.setattr('apps.core.events._broker', broker)
+        # Like the test client does for requests: connections stay inside
+        # the test transaction
+        monkeypatch.setattr('graphql_api.websocket.close_old_connections', lambda: None)
+        return broker
+
+    @pytest.fixture
+    def task(self):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        project = ProjectService.create_project(org.id, "Test Project")
+        return TaskService.create_task(project.id, "Task", status='DONE')
+
+    def _run(self, scenario):
+        from asgiref.sync import async_to_sync
+        from graphql_api.websocket import GraphQLWebSocketApp
+
+        async def run():
+            client = WebSocketClient(GraphQLWebSocketApp(schema))
+            try:
+                return await scenario(client)
+            finally:
+                if not client.task.done():
+                    await client.disconnect()
+
+        return async_to_sync(run)()
+
+    async def _subscribe(self, client, broker, query, variables, channel):
+        import asyncio
+
+        assert (await client.connect())['subprotocol'] == 'graphql-transport-ws'
+        await client.send({'type': 'connection_init'})
+        assert (await client.receive()) == {'type': 'connection_ack'}
+        await client.send({
+            'id': '1',
+            'type': 'subscribe',
+            'payload': {'query': query, 'variables': variables},
+        })
+        while channel not in broker._subscriptions:
+            await asyncio.sleep(0)
+
+    def test_task_changed(self, broker, task):
+        """Test task changes are pushed with the task's current state."""
+        from apps.tasks.events import task_channel
+
+        async def scenario(client):
+            await self._subscribe(
+                client,
+                broker,
+                '''subscription ($project: Int!) {
+                    taskChanged(projectId: $project) {
+                        action taskId task { title project { name } }
+                    }
+                }''',
+                {'project': task.project_id},
+                task_channel(task.project_id),
+            )
+            broker.publish(task_channel(task.project_id), {
+                'action': 'UPDATED', 'task_id': task.id, 'project_id': task.project_id,
+            })
+            updated = await client.receive()
+            broker.publish(task_channel(task.project_id), {
+                'action': 'DELETED', 'task_id': 0, 'project_id': task.project_id,
+            })
+            deleted = await client.receive()
+            await client.send({'id': '1', 'type': 'complete'})
+            return updated, deleted
+
+        updated, deleted = self._run(scenario)
+
+        assert updated == {'id': '1', 'type': 'next', 'payload': {'data': {'taskChanged': {
+            'action': 'UPDATED',
+            'taskId': task.id,
+            'task': {'title': "Task", 'project': {'name': "Test Project"}},
+        }}}}
+        assert deleted['payload']['data']['taskChanged']['task'] is None
+        assert not broker._subscriptions
+
+    def test_comment_added_and_project_stats(self, broker, task):
+        """Test comment and project statistics subscriptions."""
+        from apps.tasks.events import comment_channel, project_stats_channel
+
+        comment = TaskComment.objects.create(task=task, content="Hi", author_email="a@example.com")
+        org_id = task.project.organization_id
+
+        async def comment_scenario(client):
+            await self._subscribe(
+                client,
+                broker,
+                'subscription ($task: Int!) { commentAdded(taskId: $task) { content } }',
+                {'task': task.id},
+                comment_channel(task.id),
+            )
+            broker.publish(comment_channel(task.id), {'comment_id': comment.id, 'task_id': task.id})
+            return await client.receive()
+
+        async def stats_scenario(client):
+            await self._subscribe(
+                client,
+                broker,
+                '''subscription ($org: Int!) {
+                    projectStatsChanged(organizationId: $org) { projectId completionRate }
+                }''',
+                {'org': org_id},
+                project_stats_channel(org_id),
+            )
+            broker.publish(project_stats_channel(org_id), {
+                'project_id': task.project_id, 'organization_id': org_id,
+            })
+            return await client.receive()
+
+        assert self._run(comment_scenario)['payload']['data'] == {'commentAdded': {'content': "Hi"}}
+        assert self._run(stats_scenario)['payload']['data'] == {'projectStatsChanged': {
+            'projectId': task.project_id, 'completionRate': 100.0,
+        }}
+
+    def test_protocol_errors(self, broker):
+        """Test queries are refused and subscribing before init closes the socket."""
+        async def query_scenario(client):
+            await client.connect()
+            await client.send({'type': 'connection_init'})
+            await client.receive()
+            await client.send({'id': 'q', 'type': 'subscribe', 'payload': {'query': '{ organizations { id } }'}})
+            return await client.receive()
+
+        async def uninitialized_scenario(client):
+            await client.connect()
+            await client.send({'id': '1', 'type': 'subscribe', 'payload': {}})
+            return await client.receive()
+
+        async def wrong_protocol_scenario(client):
+            return await client.connect(subprotocols=('graphql-ws',))
+
+        error = self._run(query_scenario)
+        assert error['type'] == 'error'
+        assert "Only subscriptions" in error['payload'][0]['message']
+        assert self._run(uninitialized_scenario)['code'] == 4401
+        assert self._run(wrong_protocol_scenario)['code'] == 4406
+
+    def test_unexpected_failure_sends_error(self, broker, monkeypatch):
+        """Test a subscription failing outside GraphQL validation reports an error."""
+        async def failing_stream(*args, **kwargs):
+            raise RuntimeError("Broker unavailable")
+
+        monkeypatch.setattr('graphql_api.websocket.create_source_event_stream', failing_stream)
+
+        async def scenario(client):
+            await client.connect()
+            await client.send({'type': 'connection_init'})
+            await client.receive()
+            await client.send({
+                'id': '1',
+                'type': 'subscribe',
+                'payload': {'query': 'subscription { commentAdded(taskId: 1) { id } }'},
+            })
+            return await client.receive()
+
+        assert self._run(scenario) == {
+            'id': '1', 'type': 'error', 'payload': [{'message': "Internal server error"}],
+        }
+
+    def test_reused_operation_id_is_kept(self):
+        """Test a completed operation's cleanup does not drop a new one with the same ID."""
+        import asyncio
+        from asgiref.sync import async_to_sync
+        from graphql_api.websocket import GraphQLWebSocketApp, GraphQLWebSocketConnection
+
+        async def send(message):
+            pass
+
+        async def scenario():
+            connection = GraphQLWebSocketConnection(GraphQLWebSocketApp(schema), {}, send)
+            connection.acknowledged = True
+            connection.subscribe = lambda operation_id, payload: asyncio.Event().wait()
+            subscribe = json.dumps({'id': '1', 'type': 'subscribe', 'payload': {}})
+            await connection.handle(subscribe)
+            await connection.handle(json.dumps({'id': '1', 'type': 'complete'}))
+            await connection.handle(subscribe)
+            new_task = connection.operations['1']
+            for _ in range(3):
+                await asyncio.sleep(0)
+            kept = connection.operations.get('1') is new_task
+            new_task.cancel()
+            return kept
+
+        assert async_to_sync(scenario)()
+
+    def test_subscription_over_http_is_rejected(self, client):
+        """Test subscriptions sent to the HTTP endpoint get an error."""
+        response = client.post(
+            '/graphql/',
+            {'query': 'subscription { commentAdded(taskId: 1) { id } }'},
+            content_type='application/json',
+        )
+        assert "WebSocket" in response.json()['errors'][0]['message']
+
+
+@pytest.mark.django_db
+class TestBulkTaskMutations:
+    """Test bulk task mutations."""
+
+    @pytest.fixture
+    def project(self):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        return Project.objects.create(organization=org, name="Test Project")
+
+    def test_bulk_create_tasks(self, client, project, django_assert_max_num_queries):
+        """Test one request creates every valid task and reports the invalid ones."""
+        tasks = [{'title': f"Task {i}", 'status': 'IN_PROGRESS'} for i in range(200)]
+        tasks.append({'title': "Bad", 'priority': 'SOMEDAY'})
+
+        with django_assert_max_num_queries(8):
+            response = client.post(
+                '/graphql/',
+                {
+                    'query': '''mutation ($project: Int!, $org: Int, $tasks: [TaskInput!]!) {
+                        bulkCreateTasks(projectId: $project, organizationId: $org, tasks: $tasks) {
+                            success message tasks { id title project { name } }
+                            errors { index message }
+                        }
+                    }''',
+                    'variables': {'project': project.id, 'org': project.organization_id, 'tasks': tasks},
+                },
+                content_type='application/json',
+            )
+
+        payload = response.json()['data']['bulkCreateTasks']
+        assert payload['success'] is False
+        assert payload['message'] == "Created 200 of 201 tasks"
+        assert len(payload['tasks']) == 200
+        assert payload['tasks'][0]['project'] == {'name': "Test Project"}
+        assert payload['errors'][0]['index'] == 200
+        assert Task.objects.filter(project=project, status='IN_PROGRESS').count() == 200
+
+    def test_bulk_create_organizations(self, client, project):
+        """Test organizations are created with unique slugs and invalid items reported."""
+        response = client.post(
+            '/graphql/',
+            {
+                'query': '''mutation ($organizations: [OrganizationInput!]!) {
+                    bulkCreateOrganizations(organizations: $organizations) {
+                        success message organizations { slug } errors { index }
+                    }
+                }''',
+                'variables': {'organizations': [
+                    {'name': "Test Org", 'contactEmail': "a@example.com"},
+                    {'name': "New Org", 'contactEmail': "b@example.com", 'slug': "test-org"},
+                    {'name': "Bad Org", 'contactEmail': "nope"},
+                ]},
+            },
+            content_type='application/json',
+        )
+
+        assert response.json()['data']['bulkCreateOrganizations'] == {
+            'success': False,
+            'message': "Created 2 of 3 organizations",
+            'organizations': [{'slug': "test-org-1"}, {'slug': "test-org-2"}],
+            'errors': [{'index': 2}],
+        }
+
+    def test_bulk_transition_tasks(self, client, project):
+        """Test tasks are moved in one mutation with rejections reported."""
+        todo = Task.objects.create(project=project, title="Todo")
+        done = Task.objects.create(project=project, title="Done", status='DONE')
+
+        response = client.post(
+            '/graphql/',
+            {
+                'query': '''mutation ($ids: [Int!]!, $org: Int!) {
+                    bulkTransitionTasks(taskIds: $ids, toStatus: "DONE", organizationId: $org) {
+                        success message updatedIds rejected { taskId reason }
+                    }
+                }''',
+                'variables': {'ids': [todo.id, done.id], 'org': project.organization_id},
+            },
+            content_type='application/json',
+        )
+
+        assert response.json()['data']['bulkTransitionTasks'] == {
+            'success': False,
+            'message': "Moved 1 of 2 tasks to DONE",
+            'updatedIds': [todo.id],
+            'rejected': [{'taskId': done.id, 'reason': f"Task {done.id} is already DONE"}],
+        }
+
+
+@pytest.mark.django_db
+class TestMutationAggregates:
+    """Test task mutation payloads carry the counts the write changed."""
+
+    @pytest.fixture
+    def project(self, organization_factory, project_factory):
+        return project_factory(organization_factory())
+
+    AGGREGATES = '''
+        project { id taskCount todoTasks completedTasks completionRate }
+        projectStats { totalTasks inProgressTasks completedTasks completionRate }
+        organizationStats { totalTasks completedTasks }
+    '''
+
+    def mutate(self, client, query, variables=None):
+        response = client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+        )
+        body = response.json()
+        assert 'errors' not in body, body
+        return body['data']
+
+    def test_update_task_returns_updated_counts(self, client, project):
+        """Test the counts include the update made by the same mutation."""
+        task = TaskService.create_task(project.id, "Task 1")
+        TaskService.create_task(project.id, "Task 2")
+
+        data = self.mutate(
+            client,
+            'mutation ($id: Int!) { updateTask(id: $id, status: "DONE") { success %s } }'
+            % self.AGGREGATES,
+            {'id': task.id},
+        )
+
+        payload = data['updateTask']
+        assert payload['project'] == {
+            'id': str(project.id), 'taskCount': 2, 'todoTasks': 1,
+            'completedTasks': 1, 'completionRate': 50.0,
+        }
+        assert payload['projectStats'] == {
+            'totalTasks': 2, 'inProgressTasks': 0, 'completedTasks': 1, 'completionRate': 50.0,
+        }
+        assert payload['organizationStats'] == {'totalTasks': 2, 'completedTasks': 1}
+
+    def test_create_and_delete_task_return_counts(self, client, project):
+        """Test created and deleted tasks are reflected in the payload counts."""
+        data = self.mutate(
+            client,
+            'mutation ($project: Int!) { createTask(projectId: $project, title: "New", '
+            'status: "IN_PROGRESS") { task { id } %s } }' % self.AGGREGATES,
+            {'project': project.id},
+        )
+        created = data['createTask']
+        assert created['projectStats']['inProgressTasks'] == 1
+        assert created['organizationStats']['totalTasks'] == 1
+
+        data = self.mutate(
+            client,
+            'mutation ($id: Int!) { deleteTask(id: $id) { success %s } }' % self.AGGREGATES,
+            {'id': int(created['task']['id'])},
+        )
+        deleted = data['deleteTask']
+        assert deleted['success'] is True
+        assert deleted['project']['taskCount'] == 0
+        assert deleted['projectStats']['totalTasks'] == 0
+        assert deleted['organizationStats']['totalTasks'] == 0
+
+    def test_aggregates_are_read_inside_the_write(self, client, project, monkeypatch):
+        """Test the payload counts are the write's own, not ones changed after it."""
+        from django.db.models import F
+
+        task = TaskService.create_task(project.id, "Task")
+        update_task = TaskService.update_task
+
+        def update_then_another_writer(*args, **kwargs):
+            updated = update_task(*args, **kwargs)
+            Project.objects.filter(id=project.id).update(todo_task_count=F('todo_task_count') + 5)
+            Organization.objects.filter(id=project.organization_id).update(
+                todo_task_count=F('todo_task_count') + 5
+            )
+            return updated
+
+        monkeypatch.setattr(TaskService, 'update_task', staticmethod(update_then_another_writer))
+        data = self.mutate(
+            client,
+            'mutation ($id: Int!) { updateTask(id: $id, status: "DONE") { success %s } }'
+            % self.AGGREGATES,
+            {'id': task.id},
+        )
+
+        payload = data['updateTask']
+        assert payload['project']['taskCount'] == 1
+        assert payload['projectStats']['totalTasks'] == 1
+        assert payload['organizationStats'] == {'totalTasks': 1, 'completedTasks': 1}
+
+    def test_failed_mutation_has_no_aggregates(self, client, project):
+        """Test a rejected write returns null aggregates."""
+        data = self.mutate(client, 'mutation { deleteTask(id: 0) { success %s } }' % self.AGGREGATES)
+
+        assert data['deleteTask'] == {
+            'success': False, 'project': None, 'projectStats': None, 'organizationStats': None,
+        }
+
+
+@pytest.mark.django_db
+class TestConditionalRequests:
+    """Test version-based ETags and 304 responses."""
+
+    QUERY = 'query ($org: Int!) { projects(organizationId: $org) { name } }'
+
+    @pytest.fixture
+    def orgs(self):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        other = Organization.objects.create(
+            name="Other Org",
+            slug="other-org",
+            contact_email="other@example.com"
+        )
+        Project.objects.create(organization=org, name="Test Project")
+        return org, other
+
+    def _post(self, client, query, variables=None, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return client.post(
+            '/graphql/',
+            {'query': query, 'variables': variables or {}},
+            content_type='application/json',
+            **headers,
+        )
+
+    def test_unchanged_query_is_not_executed(self, client, orgs, django_assert_num_queries):
+        """Test a matching If-None-Match costs one version lookup and no resolvers."""
+        org, _ = orgs
+        response = self._post(client, self.QUERY, {'org': org.id})
+        etag = response['ETag']
+        assert response.json()['data']['projects'] == [{'name': "Test Project"}]
+
+        with django_assert_num_queries(1):
+            response = self._post(client, self.QUERY, {'org': org.id}, etag=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+        assert not response.content
+
+    def test_etag_follows_the_organizations_writes(
+        self, client, orgs, django_capture_on_commit_callbacks
+    ):
+        """Test writes change the ETag of their organization's queries only."""
+        from apps.projects.services import ProjectService
+
+        org, other = orgs
+        etag = self._post(client, self.QUERY, {'org': org.id})['ETag']
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProjectService.create_project(other.id, "Elsewhere")
+        assert self._post(client, self.QUERY, {'org': org.id}, etag=etag).status_code == 304
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProjectService.create_project(org.id, "New Project")
+        response = self._post(client, self.QUERY, {'org': org.id}, etag=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert len(response.json()['data']['projects']) == 2
+
+    def test_unscoped_queries_depend_on_every_organization(self, client, orgs):
+        """Test root fields without a tenant argument change with any write."""
+        from apps.projects.services import ProjectService
+
+        org, other = orgs
+        missing = self._post(client, 'query ($id: Int!) { project(id: $id) { name } }', {'id': 0})
+        everything = self._post(client, '{ projects { name } }')
+
+        ProjectService.create_project(other.id, "Elsewhere")
+
+        assert self._post(
+            client, 'query ($id: Int!) { project(id: $id) { name } }', {'id': 0}, etag=missing['ETag']
+        ).status_code == 200
+        assert self._post(client, '{ projects { name } }', etag=everything['ETag']).status_code == 200
+
+    def test_async_view(self, orgs):
+        """Test the async view answers If-None-Match the same way."""
+        from asgiref.sync import async_to_sync
+        from django.test import AsyncRequestFactory
+        from graphql_api.views import AsyncGraphQLView
+
+        org, _ = orgs
+
+        def post(**headers):
+            request = AsyncRequestFactory().post(
+                '/graphql/',
+                {'query': self.QUERY, 'variables': {'org': org.id}},
+                content_type='application/json',
+                headers=headers,
+            )
+            return async_to_sync(AsyncGraphQLView.as_view())(request)
+
+        etag = post()['ETag']
+        assert post(**{'If-None-Match': etag}).status_code == 304
+
+    def test_mutations_and_errors_have_no_etag(self, client, orgs):
+        """Test only successful queries carry an ETag."""
+        org, _ = orgs
+        response = self._post(
+            client,
+            'mutation ($org: Int!) { createProject(organizationId: $org, name: "P") { success } }',
+            {'org': org.id},
+        )
+        assert 'ETag' not in response
+        assert 'ETag' not in self._post(client, '{ organization(id: 1) { nope } }')
+
+    def test_time_dependent_queries_are_always_executed(self, client, orgs):
+        """Test overdueTasks gets no version ETag, so tasks falling overdue show up."""
+        org, _ = orgs
+        overdue = 'query ($org: Int!) { overdueTasks(organizationId: $org) { title } }'
+        due = '''query ($org: Int!, $from: DateTime!, $to: DateTime!) {
+            tasksDueBetween(organizationId: $org, from: $from, to: $to) { title }
+        }'''
+        variables = {'org': org.id, 'from': "2026-01-01T00:00:00Z", 'to': "2026-02-01T00:00:00Z"}
+
+        first = self._post(client, due, variables)
+        assert self._post(client, due, variables, first['ETag']).status_code == 304
+
+        response = self._post(client, overdue, {'org': org.id})
+        assert response.json()['data'] == {'overdueTasks': []}
+        assert 'ETag' not in response
+
+
+@pytest.mark.django_db
+class TestResultCache:
+    """Test the tenant-scoped result cache."""
+
+    QUERY = '''query ($org: Int!) {
+        organizationStats(organizationId: $org) { totalProjects }
+        projects(organizationId: $org) { name }
+    }'''
+
+    @pytest.fixture
+    def result_cache(self, monkeypatch):
+        from graphql_api.result_cache import ResultCache
+
+        result_cache = ResultCache(['organizationStats', 'projects'], ttl=60, stale_ttl=60)
+        # Refresh in the test's thread, which sees the test transaction
+        monkeypatch.setattr(result_cache, 'start_refresh', lambda function, *args: function(*args))
+        monkeypatch.setattr('graphql_api.result_cache._result_cache', result_cache)
+        return result_cache
+
+    @pytest.fixture
+    def orgs(self):
+        org = Organization.objects.create(
+            name="Test Org",
+            slug="test-org",
+            contact_email="test@example.com"
+        )
+        other = Organization.objects.create(
+            name="Other Org",
+            slug="other-org",
+            contact_email="other@example.com"
+        )
+        ProjectService.create_project(org.id, "Test Project")
+        return org, other
+
+    def _post(self, client, org, query=None):
+        return client.post(
+            '/graphql/',
+            {'query': query or self.QUERY, 'variables': {'org': org.id}},
+            content_type='application/json',
+        )
+
+    def test_repeat_query_is_served_from_cache(self, client, orgs, result_cache, django_assert_num_queries):
+        """Test the second request runs no resolver queries."""
+        org, _ = orgs
+        first = self._post(client, org)
+        assert first['X-Result-Cache'] == "MISS"
+
+        # Only the ETag's version lookup
+        with django_assert_num_queries(1):
+            second = self._post(client, org)
+        assert second['X-Result-Cache'] == "HIT"
+        assert second.json()['data'] == first.json()['data']
+
+        stats = result_cache.stats()
+        assert (stats['hits'], stats['misses'], stats['hit_ratio']) == (1, 1, 0.5)
+        assert stats['memory_bytes'] > 0
+
+    def test_writes_invalidate_their_organization(
+        self, client, orgs, result_cache, django_capture_on_commit_callbacks
+    ):
+        """Test a write evicts its own organization's results only."""
+        from apps.projects.services import ProjectService
+
+        org, other = orgs
+        self._post(client, org)
+        self._post(client, other)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProjectService.create_project(org.id, "New Project")
+
+        assert self._post(client, other)['X-Result-Cache'] == "HIT"
+        response = self._post(client, org)
+        assert response['X-Result-Cache'] == "MISS"
+        assert response.json()['data']['organizationStats'] == {'totalProjects': 2}
+
+    def test_multi_organization_stats(
+        self, client, orgs, result_cache, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        """Test organizationsStats is one query and invalidated by a write to any of its organizations."""
+        from apps.projects.services import ProjectService
+
+        org, other = orgs
+        result_cache.fields = frozenset(['organizationsStats'])
+        query = '''query ($ids: [Int!]!) {
+            organizationsStats(ids: $ids) { organizationId totalProjects }
+        }'''
+
+        def post():
+            return client.post(
+                '/graphql/',
+                {'query': query, 'variables': {'ids': [other.id, org.id, 0]}},
+                content_type='application/json',
+            )
+
+        # The ETag's version lookups (the unknown ID falls back to every
+        # organization's version) and the statistics
+        with django_assert_num_queries(3):
+            response = post()
+        assert response.json()['data']['organizationsStats'] == [
+            {'organizationId': other.id, 'totalProjects': 0},
+            {'organizationId': org.id, 'totalProjects': 1},
+        ]
+        assert post()['X-Result-Cache'] == "HIT"
+
+        with django_capture_on_commit_callbacks(execute=True):
+            ProjectService.create_project(other.id, "New Project")
+        response = post()
+        assert response['X-Result-Cache'] == "MISS"
+        assert response.json()['data']['organizationsStats'][0]['totalProjects'] == 1
+
+    def test_stale_result_is_served_and_refreshed(self, client, orgs, result_cache):
+        """Test expired entries are served once more while being refreshed."""
+        org, _ = orgs
+        self._post(client, org)
+        # Not committed, so the cached result is not invalidated
+        ProjectService.create_project(org.id, "Uncommitted")
+        result_cache.ttl = 0
+
+        stale = self._post(client, org)
+        assert stale['X-Result-Cache'] == "STALE"
+        assert stale.json()['data']['organizationStats'] == {'totalProjects': 1}
+
+        result_cache.ttl = 60
+        refreshed = self._post(client, org)
+        assert refreshed['X-Result-Cache'] == "HIT"
+        assert refreshed.json()['data']['organizationStats'] == {'totalProjects': 2}
+        assert result_cache.stats()['refreshes'] == 1
+
+    def test_unscoped_and_other_fields_are_not_cached(self, client, orgs, result_cache):
+        """Test only tenant-scoped operations on cached fields use the cache."""
+        org, _ = orgs
+        response = self._post(client, org, '{ projects { name } }')
+        assert 'X-Result-Cache' not in response
+        response = self._post(
+            client, org, 'query ($org: Int!) { projects(organizationId: $org) { name } organizations { name } }'
+        )
+        assert 'X-Result-Cache' not in response
+
+
+@pytest.mark.django_db
+class TestProjectBurndown:
+    """Test the burndown query over rolled-up snapshots."""
+
+    QUERY = '''query ($project: Int!, $from: Date!, $to: Date!) {
+        projectBurndown(projectId: $project, from: $from, to: $to) {
+            date remainingTasks completedTasks
+        }
+    }'''
+
+    def test_series_and_invalid_range(self, organization_factory, project_factory, task_factory):
+        """Test the series has a point per day and reversed ranges are errors."""
+        from datetime import timedelta
+        from django.utils import timezone
+
+        project = project_factory(organization_factory())
+        task_factory(project)
+        ProjectService.rollup_snapshots()
+        today = timezone.localdate()
+        yesterday = today - timedelta(days=1)
+
+        data = execute(self.QUERY, {
+            'project': project.id, 'from': yesterday.isoformat(), 'to': today.isoformat(),
+        })
+        assert data['projectBurndown'] == [
+            {'date': yesterday.isoformat(), 'remainingTasks': 0, 'completedTasks': 0},
+            {'date': today.isoformat(), 'remainingTasks': 1, 'completedTasks': 0},
+        ]
+
+        result = schema.execute(self.QUERY, variables={
+            'project': project.id, 'from': today.isoformat(), 'to': yesterday.isoformat(),
+        })
+        assert "'from' must not be after 'to'" in result.errors[0].message
+
+
+@pytest.mark.django_db
+class TestProjectFlowMetrics:
+    """Test the flow metrics query."""
+
+    QUERY = '''query ($project: Int!, $from: Date!, $to: Date!) {
+        projectFlowMetrics(projectId: $project, from: $from, to: $to) {
+            completedTasks
+            cycleTimeHours { p50 }
+            weeklyThroughput { weekStart completedTasks }
+            assignees { assigneeEmail completedTasks }
+        }
+    }'''
+
+    def test_tasks_done_today(self, organization_factory, project_factory):
+        """Test tasks completed through the services show up in the metrics."""
+        from django.utils import timezone
+
+        project = project_factory(organization_factory())
+        task = TaskService.create_task(project.id, "Task", assignee_email="a@example.com")
+        TaskService.update_task(task.id, status='DONE')
+        today = timezone.localdate().isoformat()
+
+        data = execute(self.QUERY, {'project': project.id, 'from': today, 'to': today})
+
+        metrics = data['projectFlowMetrics']
+        assert metrics['completedTasks'] == 1
+        assert metrics['cycleTimeHours']['p50'] >= 0
+        assert sum(week['completedTasks'] for week in metrics['weeklyThroughput']) == 1
+        assert metrics['assignees'] == [{'assigneeEmail': "a@example.com", 'completedTasks': 1}]
+
+
+@pytest.mark.django_db
+class TestWorkload:
+    """Test the workload and assignee queries."""
+
+    QUERY = '''query ($org: Int!, $email: String!) {
+        workload(organizationId: $org) {
+            assigneeEmail
+            openTasks
+            byStatus { status count }
+            byPriority { priority count }
+        }
+        tasksByAssignee(organizationId: $org, email: $email) { title }
+    }'''
+
+    def test_workload(self, organization_factory, project_factory):
+        """Test open task counts and the assignee's tasks are returned."""
+        project = project_factory(organization_factory())
+        TaskService.create_task(project.id, "Urgent", priority='URGENT', assignee_email="a@example.com")
+        TaskService.create_task(project.id, "Done", status='DONE', assignee_email="a@example.com")
+
+        data = execute(self.QUERY, {'org': project.organization_id, 'email': "a@example.com"})
+
+        assert len(data['workload']) == 1
+        workload = data['workload'][0]
+        assert workload['assigneeEmail'] == "a@example.com"
+        assert workload['openTasks'] == 1
+        assert {'status': 'TODO', 'count': 1} in workload['byStatus']
+        assert {'priority': 'URGENT', 'count': 1} in workload['byPriority']
+        assert {task['title'] for task in data['tasksByAssignee']} == {"Urgent", "Done"}
+
+
+@pytest.mark.django_db
+class TestOptimisticUpdates:
+    """Test versioned update mutations."""
+
+    QUERY = '''mutation ($id: Int!, $version: Int) {
+        updateTask(id: $id, title: "Edited", version: $version) {
+            success conflict message task { title version }
+        }
+    }'''
+
+    def test_stale_version_reports_conflict(self, organization_factory, project_factory):
+        """Test the first edit of a version applies and a second one reports a conflict."""
+        project = project_factory(organization_factory())
+        task = TaskService.create_task(project.id, "Task")
+
+        first = execute(self.QUERY, {'id': task.id, 'version': task.version})['updateTask']
+        second = execute(self.QUERY, {'id': task.id, 'version': task.version})['updateTask']
+
+        assert first == {
+            'success': True, 'conflict': False, 'message': "Task updated successfully",
+            'task': {'title': "Edited", 'version': 2},
+        }
+        assert second['success'] is False
+        assert second['conflict'] is True
+        assert second['task'] is None
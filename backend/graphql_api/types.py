@@ -0,0 +1,10 @@
+"""
+GraphQL types shared by the app schemas.
+"""
+import graphene
+
+
+class BulkItemErrorType(graphene.ObjectType):
+    """Why one item of a bulk mutation was rejected."""
+    index = graphene.Int(description="Position of the item in the input list")
+    message = graphene.String()
@@ -0,0 +1,699 @@
+"""
+GraphQL HTTP views.
+"""
+import hashlib
+import json
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection, transaction
+from django.http import HttpResponse, HttpResponseNotAllowed, HttpResponseNotModified
+from django.http.response import HttpResponseBadRequest
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags, quote_etag
+from django.views.decorators.http import require_GET
+from graphene_django.constants import MUTATION_ERRORS_FLAG
+from graphene_django.utils.utils import set_rollback
+from graphene_django.settings import graphene_settings
+from graphene_django.views import GraphQLView as BaseGraphQLView, HttpError
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast, validate_schema
+
+from graphql_api.cost import CostAnalyzer, QueryTooComplexError, check_cost
+from graphql_api.documents import get_document_cache, hash_document
+from graphql_api.etags import (
+    compute_etag, is_time_dependent, operation_scopes, organization_versions
+)
+from graphql_api.metrics import get_metrics_registry
+from graphql_api.result_cache import get_result_cache
+from graphql_api.persisted import (
+    PersistedQueryHashMismatch,
+    PersistedQueryNotFound,
+    get_persisted_query_registry,
+)
+
+
+class GraphQLView(BaseGraphQLView):
+    """
+    GraphQLView that reuses parsed and validated documents.
+
+    Repeat operations are looked up in the document cache and go straight
+    to execution. Clients may send an automatic-persisted-query hash
+    instead of the document, and successful queries sent over GET get
+    ``Cache-Control`` and ``ETag`` headers so a reverse proxy can serve them.
+    Queries get an ETag derived from the data versions of the organizations
+    they read, and ``If-None-Match`` is answered with 304 before execution.
+    Tenant-scoped queries listed in GRAPHQL_RESULT_CACHE_FIELDS are served
+    from the result cache.
+    Operations over the cost budget are rejected before execution, and the
+    estimated and actual cost are reported in the response ``extensions``.
+    Each operation is timed into the metrics registry, and clients sending
+    ``X-DB-Stats: 1`` get its SQL query count and time back as headers.
+    A JSON array of up to GRAPHQL_MAX_BATCH_SIZE operations is executed as
+    a batch: in order, in one request, sharing the request's loaders, and
+    answered with an array of results.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        request.graphql_operations = []
+        request.graphql_etag = None
+        if request.method.lower() != "get" or self.request_wants_html(request):
+            response = super().dispatch(request, *args, **kwargs)
+        else:
+            # Skip ensure_csrf_cookie: a Set-Cookie header would make the
+            # response uncacheable, and GET cannot run mutations anyway
+            response = super().dispatch.__wrapped__(self, request, *args, **kwargs)
+        return self.add_db_stats(request, self.add_cache_headers(request, response))
+
+    def add_cache_headers(self, request, response):
+        """
+        Turn a query response into 304 Not Modified or add its caching headers.
+
+        Args:
+            request: The HTTP request
+            response: The response built by dispatch
+
+        Returns:
+            The response to send
+        """
+        if getattr(request, "graphql_not_modified", False):
+            response = HttpResponseNotModified()
+            response["ETag"] = request.graphql_etag
+            if request.method.lower() == "get":
+                self.patch_cache_control(response)
+            return response
+        if getattr(request, "graphql_result_cache", None) and not self.batch:
+            response["X-Result-Cache"] = request.graphql_result_cache
+        if response.status_code == 200 and getattr(request, "graphql_cacheable", False):
+            return self.make_cacheable(request, response)
+        return response
+
+    def add_db_stats(self, request, response):
+        """
+        Report the request's SQL query count and time, if the client asked.
+
+        Args:
+            request: The HTTP request
+            response: The response to annotate
+
+        Returns:
+            The response, with ``X-DB-Queries`` and ``X-DB-Time`` (milliseconds)
+            when the request sent ``X-DB-Stats: 1`` and GRAPHQL_DB_STATS_HEADERS is on
+        """
+        if (
+            request.headers.get("X-DB-Stats") != "1"
+            or not getattr(settings, "GRAPHQL_DB_STATS_HEADERS", True)
+        ):
+            return response
+        operations = request.graphql_operations
+        response["X-DB-Queries"] = str(sum(metrics.db_queries for metrics in operations))
+        response["X-DB-Time"] = "%.3f" % (sum(metrics.db_time for metrics in operations) * 1000)
+        return response
+
+    def make_cacheable(self, request, response):
+        """
+        Add caching headers to a successful query response.
+
+        Responses get the version-based ETag computed before execution, or
+        for GET requests without one, a hash of the body. Only GET responses
+        are made cacheable by shared caches.
+
+        Args:
+            request: The HTTP request
+            response: JSON response with the query result
+
+        Returns:
+            The response, or 304 Not Modified if the client's ETag matches
+        """
+        etag = request.graphql_etag or quote_etag(hashlib.sha256(response.content).hexdigest())
+        response["ETag"] = etag
+        if request.method.lower() != "get":
+            return response
+        self.patch_cache_control(response)
+        return get_conditional_response(request, etag=etag, response=response) or response
+
+    def patch_cache_control(self, response):
+        """Add the Cache-Control and Vary headers of GET query responses."""
+        max_age = getattr(settings, "GRAPHQL_GET_CACHE_MAX_AGE", 0)
+        if max_age:
+            patch_cache_control(response, public=True, max_age=max_age)
+        else:
+            patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ["Accept"])
+
+    def get_etag(self, request, prepared):
+        """
+        Compute the version-based ETag of a read operation.
+
+        Args:
+            request: The HTTP request
+            prepared: The operation
+
+        Returns:
+            Quoted ETag, or None for mutations, batches, time-dependent
+            queries, or when GRAPHQL_CONDITIONAL_REQUESTS is off
+        """
+        if (
+            not prepared.is_query
+            or self.batch
+            or not getattr(settings, "GRAPHQL_CONDITIONAL_REQUESTS", True)
+            or is_time_dependent(prepared.document, prepared.operation_ast)
+        ):
+            return None
+        scopes = operation_scopes(prepared.document, prepared.operation_ast, prepared.variables)
+        return compute_etag(
+            self.schema.graphql_schema,
+            prepared.document_hash,
+            prepared.operation_name,
+            prepared.variables,
+            organization_versions(scopes),
+        )
+
+    def check_not_modified(self, request, prepared) -> bool:
+        """
+        Set the operation's ETag and check it against ``If-None-Match``.
+
+        Args:
+            request: The HTTP request
+            prepared: The operation
+
+        Returns:
+            True if the client's copy is current and execution can be skipped
+        """
+        etag = self.get_etag(request, prepared)
+        request.graphql_etag = etag
+        if etag is None or "HTTP_IF_NONE_MATCH" not in request.META:
+            return False
+        client_etags = parse_etags(request.META["HTTP_IF_NONE_MATCH"])
+        request.graphql_not_modified = "*" in client_etags or any(
+            client_etag.removeprefix("W/") == etag for client_etag in client_etags
+        )
+        return request.graphql_not_modified
+
+    def parse_body(self, request):
+        """
+        Parse the request body, switching to batch mode for a JSON array.
+
+        Raises:
+            HttpError: 400 if the body is invalid, or a batch is empty, larger
+                than GRAPHQL_MAX_BATCH_SIZE, or batching is disabled
+        """
+        if (
+            self.get_content_type(request) == "application/json"
+            and request.body.lstrip()[:1] == b"["
+        ):
+            max_size = getattr(settings, "GRAPHQL_MAX_BATCH_SIZE", 10)
+            if not max_size:
+                raise HttpError(HttpResponseBadRequest("Batched operations are disabled."))
+            self.batch = True
+            data = super().parse_body(request)
+            if len(data) > max_size:
+                raise HttpError(HttpResponseBadRequest(
+                    f"Batch of {len(data)} operations exceeds the maximum of {max_size}."
+                ))
+            if not all(isinstance(entry, dict) for entry in data):
+                raise HttpError(HttpResponseBadRequest("Batched operations must be JSON objects."))
+            return data
+        return super().parse_body(request)
+
+    def get_response(self, request, data, show_graphiql=False):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+
+        execution_result = self.execute_graphql_request(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        return self.format_response(request, execution_result, id, show_graphiql)
+
+    def format_response(self, request, execution_result, id=None, show_graphiql=False):
+        """
+        Serialize an execution result.
+
+        Args:
+            request: The HTTP request
+            execution_result: ExecutionResult, or None when GraphiQL renders
+            id: Operation ID within a batch
+            show_graphiql: Whether to pretty-print for GraphiQL
+
+        Returns:
+            Tuple of (JSON string or None, HTTP status code)
+        """
+        if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+            set_rollback()
+
+        status_code = 200
+        if execution_result:
+            response = {}
+
+            if execution_result.errors:
+                set_rollback()
+                response["errors"] = [
+                    self.format_error(e) for e in execution_result.errors
+                ]
+
+            if execution_result.errors and any(
+                not getattr(e, "path", None) for e in execution_result.errors
+            ):
+                status_code = 400
+            else:
+                response["data"] = execution_result.data
+
+            if execution_result.extensions:
+                response["extensions"] = execution_result.extensions
+
+            if self.batch:
+                response["id"] = id
+                response["status"] = status_code
+
+            result = self.json_encode(request, response, pretty=show_graphiql)
+        else:
+            result = None
+
+        return result, status_code
+
+    def get_persisted_query_hash(self, request, data):
+        """
+        Get the hash from ``extensions.persistedQuery``, if the client sent one.
+
+        Args:
+            request: The HTTP request
+            data: Parsed request body
+
+        Returns:
+            Hex SHA-256 string, or None
+        """
+        extensions = request.GET.get("extensions") or data.get("extensions")
+        if not extensions:
+            return None
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except ValueError:
+                raise HttpError(HttpResponseBadRequest("Extensions are invalid JSON."))
+        persisted = extensions.get("persistedQuery") if isinstance(extensions, dict) else None
+        if not isinstance(persisted, dict) or persisted.get("version") != 1:
+            return None
+        return persisted.get("sha256Hash")
+
+    def get_document(self, query):
+        """
+        Get the cached parse and validation result for a query.
+
+        Args:
+            query: GraphQL document source
+
+        Returns:
+            CachedDocument for the query
+        """
+        return get_document_cache().get(
+            self.schema.graphql_schema,
+            query,
+            self.validation_rules,
+            graphene_settings.MAX_VALIDATION_ERRORS,
+        )
+
+    def prepare_operation(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        """
+        Resolve, parse, validate and cost an operation without executing it.
+
+        Args:
+            request: The HTTP request
+            data: Parsed request body
+            query: GraphQL document source, may be None for persisted queries
+            variables: Operation variables
+            operation_name: Requested operation name
+            show_graphiql: Whether GraphiQL is being rendered
+
+        Returns:
+            PreparedOperation ready to execute, or the ExecutionResult (or None)
+            to respond with instead
+        """
+        persisted_hash = self.get_persisted_query_hash(request, data)
+        register_persisted = False
+        if persisted_hash:
+            if not query:
+                query = get_persisted_query_registry().get(persisted_hash)
+                if query is None:
+                    return ExecutionResult(errors=[PersistedQueryNotFound()])
+            elif hash_document(query) != persisted_hash:
+                return ExecutionResult(errors=[PersistedQueryHashMismatch()])
+            else:
+                # Sent in full after a PersistedQueryNotFound; remember it once valid
+                register_persisted = True
+
+        if not query:
+            if show_graphiql:
+                return None
+            raise HttpError(HttpResponseBadRequest("Must provide query string."))
+
+        schema = self.schema.graphql_schema
+
+        schema_validation_errors = validate_schema(schema)
+        if schema_validation_errors:
+            return ExecutionResult(data=None, errors=schema_validation_errors)
+
+        try:
+            cached = self.get_document(query)
+        except Exception as e:
+            return ExecutionResult(errors=[e])
+
+        document = cached.document
+        operation_ast = get_operation_ast(document, operation_name)
+
+        if (
+            request.method.lower() == "get"
+            and operation_ast is not None
+            and operation_ast.operation != OperationType.QUERY
+        ):
+            if show_graphiql:
+                return None
+
+            raise HttpError(
+                HttpResponseNotAllowed(
+                    ["POST"],
+                    "Can only perform a {} operation from a POST request.".format(
+                        operation_ast.operation.value
+                    ),
+                )
+            )
+
+        if cached.errors:
+            return ExecutionResult(data=None, errors=cached.errors)
+
+        if operation_ast is not None and operation_ast.operation == OperationType.SUBSCRIPTION:
+            return ExecutionResult(errors=[GraphQLError(
+                "Subscriptions are served over WebSocket at /graphql/"
+            )])
+
+        if register_persisted:
+            get_persisted_query_registry().register(persisted_hash, query)
+
+        prepared = PreparedOperation(
+            document, operation_ast, operation_name, variables, persisted_hash or hash_document(query)
+        )
+        if operation_ast is not None:
+            prepared.analyzer = CostAnalyzer(schema, document, operation_ast, variables)
+            try:
+                prepared.estimated_cost = check_cost(prepared.analyzer)
+            except QueryTooComplexError as e:
+                return ExecutionResult(errors=[e])
+        return prepared
+
+    def execute_graphql_request(
+        self, request, data, query, variables, operation_name, show_graphiql=False
+    ):
+        prepared = self.prepare_operation(
+            request, data, query, variables, operation_name, show_graphiql
+        )
+        if not isinstance(prepared, PreparedOperation):
+            return prepared
+        if self.check_not_modified(request, prepared):
+            return None
+        return self.run_operation(request, prepared)
+
+    def start_operation(self, request, prepared):
+        """
+        Create the metrics collector for an operation about to execute.
+
+        Args:
+            request: The HTTP request
+            prepared: The operation
+
+        Returns:
+            OperationMetrics, also set as ``request.graphql_metrics``
+        """
+        metrics = get_metrics_registry().collector(prepared.operation_name, prepared.operation_type)
+        request.graphql_metrics = metrics
+        request.graphql_operations.append(metrics)
+        return metrics
+
+    def finish_operation(self, request, prepared, metrics, result):
+        """
+        Record an executed operation and report its cost.
+
+        Args:
+            request: The HTTP request
+            prepared: The operation
+            metrics: Collector that wrapped the execution
+            result: ExecutionResult of the operation
+
+        Returns:
+            The result, with cost ``extensions`` added
+        """
+        request.graphql_metrics = None
+        if not prepared.is_query:
+            # Operations after a write (later in a batch) must not be served
+            # rows the loaders cached before it
+            request.loaders = None
+        get_metrics_registry().record(metrics, errors=bool(result.errors))
+        if prepared.analyzer is not None:
+            result.extensions = {
+                **(result.extensions or {}),
+                "cost": {
+                    "estimated": prepared.estimated_cost,
+                    "actual": prepared.analyzer.measure(result.data),
+                    "maximum": getattr(settings, "GRAPHQL_MAX_QUERY_COST", None),
+                },
+            }
+        return result
+
+    def run_operation(self, request, prepared):
+        """
+        Execute a prepared operation synchronously.
+
+        Args:
+            request: The HTTP request
+            prepared: The operation
+
+        Returns:
+            ExecutionResult
+        """
+        metrics = self.start_operation(request, prepared)
+        try:
+            with metrics:
+                result = self.execute_operation(request, prepared)
+        except Exception as e:
+            result = ExecutionResult(errors=[e])
+        return self.finish_operation(request, prepared, metrics, result)
+
+    def get_execute_options(self, request, prepared):
+        """Keyword arguments for ``graphql.execute``."""
+        execute_options = {
+            "root_value": self.get_root_value(request),
+            "context_value": self.get_context(request),
+            "variable_values": prepared.variables,
+            "operation_name": prepared.operation_name,
+            "middleware": self.get_middleware(request),
+        }
+        if self.execution_context_class:
+            execute_options["execution_context_class"] = self.execution_context_class
+        return execute_options
+
+    def execute_operation(self, request, prepared):
+        """
+        Execute a parsed and validated operation.
+
+        Mutations run in a transaction when ATOMIC_MUTATIONS is on.
+
+        Args:
+            request: The HTTP request, used as context
+            prepared: The operation
+
+        Returns:
+            ExecutionResult
+        """
+        schema = self.schema.graphql_schema
+        execute_options = self.get_execute_options(request, prepared)
+        operation_ast = prepared.operation_ast
+
+        if (
+            operation_ast is not None
+            and operation_ast.operation == OperationType.MUTATION
+            and (
+                graphene_settings.ATOMIC_MUTATIONS is True
+                or connection.settings_dict.get("ATOMIC_MUTATIONS", False) is True
+            )
+        ):
+            with transaction.atomic():
+                result = execute(schema, prepared.document, **execute_options)
+                if getattr(request, MUTATION_ERRORS_FLAG, False) is True:
+                    transaction.set_rollback(True)
+            return result
+
+        result = self.get_cached_result(request, prepared)
+        if result is None:
+            result = execute(schema, prepared.document, **execute_options)
+            self.cache_result(request, prepared, result)
+        request.graphql_cacheable = (
+            (request.method.lower() == "get" or request.graphql_etag is not None)
+            and operation_ast is not None
+            and not result.errors
+        )
+        return result
+
+    def get_cached_result(self, request, prepared):
+        """
+        Look an operation up in the result cache.
+
+        A stale entry is returned while a background refresh replaces it.
+
+        Args:
+            request: The HTTP request
+            prepared: The operation
+
+        Returns:
+            ExecutionResult from the cache, or None if it must be executed
+        """
+        result_cache = get_result_cache()
+        key = result_cache.get_key(prepared)
+        request.graphql_result_cache_key = key
+        if key is None:
+            return None
+        cached = result_cache.get(key)
+        if cached is None:
+            request.graphql_result_cache = "MISS"
+            return None
+        data, fresh = cached
+        if not fresh:
+            result_cache.refresh(
+                key, self.schema.graphql_schema, prepared, self.get_middleware(request)
+            )
+        request.graphql_result_cache = "HIT" if fresh else "STALE"
+        return ExecutionResult(data=data)
+
+    def cache_result(self, request, prepared, result):
+        """Store a successful result under the key ``get_cached_result`` computed."""
+        key = getattr(request, "graphql_result_cache_key", None)
+        if key is not None and not result.errors:
+            get_result_cache().set(key, result.data)
+
+
+class PreparedOperation:
+    """A parsed, validated and costed operation waiting to execute."""
+
+    __slots__ = (
+        'document', 'operation_ast', 'operation_name', 'variables', 'document_hash',
+        'analyzer', 'estimated_cost',
+    )
+
+    def __init__(self, document, operation_ast, operation_name, variables, document_hash=None):
+        self.document = document
+        self.document_hash = document_hash
+        self.operation_ast = operation_ast
+        if operation_ast is not None and operation_ast.name is not None:
+            operation_name = operation_name or operation_ast.name.value
+        self.operation_name = operation_name
+        self.variables = variables
+        self.analyzer = None
+        self.estimated_cost = None
+
+    @property
+    def operation_type(self) -> str:
+        if self.operation_ast is None:
+            return "unknown"
+        return self.operation_ast.operation.value
+
+    @property
+    def is_query(self) -> bool:
+        return self.operation_ast is not None and self.operation_ast.operation == OperationType.QUERY
+
+
+class AsyncGraphQLView(GraphQLView):
+    """
+    GraphQLView executing queries on the event loop.
+
+    Meant for ASGI deployments (GRAPHQL_ASYNC). Queries run with
+    ``request.graphql_async`` set, so resolvers and loaders use the async
+    ORM and independent root fields resolve concurrently; a request waiting
+    on Postgres no longer holds a worker thread. Their database work runs
+    in the request's sync thread, one query at a time on its connection.
+    Mutations are executed synchronously in that thread, as before.
+    """
+
+    view_is_async = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.graphql_operations = []
+        request.graphql_etag = None
+        try:
+            if request.method.lower() not in ("get", "post"):
+                raise HttpError(
+                    HttpResponseNotAllowed(
+                        ["GET", "POST"], "GraphQL only supports GET and POST requests."
+                    )
+                )
+
+            data = self.parse_body(request)
+            if self.graphiql and self.can_display_graphiql(request, data):
+                # GraphiQL is a static page; render it exactly as the sync view does
+                return await sync_to_async(super().dispatch)(request, *args, **kwargs)
+
+            if self.batch:
+                responses = [await self.get_response_async(request, entry) for entry in data]
+                result = "[{}]".format(",".join([response[0] for response in responses]))
+                status_code = (
+                    responses
+                    and max(responses, key=lambda response: response[1])[1]
+                    or 200
+                )
+            else:
+                result, status_code = await self.get_response_async(request, data)
+
+            response = HttpResponse(
+                status=status_code, content=result, content_type="application/json"
+            )
+        except HttpError as e:
+            response = e.response
+            response["Content-Type"] = "application/json"
+            response.content = self.json_encode(request, {"errors": [self.format_error(e)]})
+
+        return self.add_db_stats(request, self.add_cache_headers(request, response))
+
+    async def get_response_async(self, request, data):
+        query, variables, operation_name, id = self.get_graphql_params(request, data)
+        execution_result = await self.execute_graphql_request_async(
+            request, data, query, variables, operation_name
+        )
+        return self.format_response(request, execution_result, id)
+
+    async def execute_graphql_request_async(self, request, data, query, variables, operation_name):
+        prepared = self.prepare_operation(request, data, query, variables, operation_name)
+        if not isinstance(prepared, PreparedOperation):
+            return prepared
+        if not prepared.is_query:
+            return await sync_to_async(self.run_operation)(request, prepared)
+        if await sync_to_async(self.check_not_modified)(request, prepared):
+            return None
+
+        metrics = self.start_operation(request, prepared)
+        request.graphql_async = True
+        try:
+            async with metrics:
+                result = await sync_to_async(self.get_cached_result)(request, prepared)
+                if result is None:
+                    result = execute(
+                        self.schema.graphql_schema,
+                        prepared.document,
+                        **self.get_execute_options(request, prepared),
+                    )
+                    if isawaitable(result):
+                        result = await result
+                    await sync_to_async(self.cache_result)(request, prepared, result)
+        except Exception as e:
+            result = ExecutionResult(errors=[e])
+        finally:
+            request.graphql_async = False
+        request.graphql_cacheable = (
+            request.method.lower() == "get" or request.graphql_etag is not None
+        ) and not result.errors
+        return self.finish_operation(request, prepared, metrics, result)
+
+
+@require_GET
+def metrics_view(request):
+    """Expose resolver and operation metrics in the Prometheus text format."""
+    return HttpResponse(
+        get_metrics_registry().render(),
+        content_type="text/plain; version=0.0.4; charset=utf-8",
+    )
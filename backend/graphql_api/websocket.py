@@ -0,0 +1,236 @@
+"""
+GraphQL subscriptions over WebSocket.
+
+A plain ASGI application speaking the ``graphql-transport-ws`` protocol
+(the one implemented by the ``graphql-ws`` client library). Every
+``subscribe`` message starts a source event stream from the broker; each
+event is executed against the subscription's selection set with the
+usual middleware and a fresh context, so loaders never serve data from a
+previous event. Queries and mutations stay on ``POST /graphql/``.
+"""
+import asyncio
+import json
+import logging
+from functools import partial
+from inspect import isawaitable
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from graphene_django.settings import graphene_settings
+from graphene_django.views import instantiate_middleware
+from graphql import ExecutionResult, GraphQLError, OperationType, execute, get_operation_ast
+from graphql.execution import create_source_event_stream
+
+from graphql_api.cost import CostAnalyzer, QueryTooComplexError, check_cost
+from graphql_api.documents import get_document_cache
+
+PROTOCOL = 'graphql-transport-ws'
+
+logger = logging.getLogger(__name__)
+
+
+class SubscriptionContext(SimpleNamespace):
+    """Context passed to resolvers while executing a subscription event."""
+
+
+class GraphQLWebSocketApp:
+    """
+    ASGI application serving GraphQL subscriptions at one path.
+
+    Args:
+        schema: graphene Schema
+        path: Path to accept connections on
+    """
+
+    def __init__(self, schema, path='/graphql/'):
+        self.schema = schema
+        self.path = path
+        self.middleware = list(instantiate_middleware(graphene_settings.MIDDLEWARE))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'websocket':
+            raise ValueError(f"Unsupported ASGI scope type {scope['type']}")
+
+        message = await receive()
+        if message['type'] != 'websocket.connect':
+            return
+        if (
+            scope['path'].rstrip('/') != self.path.rstrip('/')
+            or PROTOCOL not in scope.get('subprotocols', ())
+        ):
+            await send({'type': 'websocket.close', 'code': 4406})
+            return
+        await send({'type': 'websocket.accept', 'subprotocol': PROTOCOL})
+        await GraphQLWebSocketConnection(self, scope, send).run(receive)
+
+
+class GraphQLWebSocketConnection:
+    """State of one ``graphql-transport-ws`` connection."""
+
+    def __init__(self, app, scope, send):
+        self.app = app
+        self.scope = scope
+        self._send = send
+        self.acknowledged = False
+        self.operations = {}
+
+    async def send(self, message: dict):
+        await self._send({'type': 'websocket.send', 'text': json.dumps(message)})
+
+    async def close(self, code: int, reason: str = ''):
+        await self._send({'type': 'websocket.close', 'code': code, 'reason': reason})
+
+    async def run(self, receive):
+        """Handle messages until the client disconnects or is closed."""
+        timeout = getattr(settings, 'GRAPHQL_WS_CONNECTION_INIT_TIMEOUT', 3)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        receive(), None if self.acknowledged else timeout
+                    )
+                except asyncio.TimeoutError:
+                    await self.close(4408, "Connection initialisation timeout")
+                    return
+                if message['type'] == 'websocket.disconnect':
+                    return
+                if not await self.handle(message.get('text') or message.get('bytes')):
+                    return
+        finally:
+            for task in self.operations.values():
+                task.cancel()
+
+    async def handle(self, text) -> bool:
+        """
+        Handle one client message.
+
+        Returns:
+            False once the connection has been closed
+        """
+        try:
+            message = json.loads(text)
+            message_type = message['type']
+        except (TypeError, ValueError, KeyError):
+            await self.close(4400, "Invalid message")
+            return False
+
+        if message_type == 'connection_init':
+            if self.acknowledged:
+                await self.close(4429, "Too many initialisation requests")
+                return False
+            self.acknowledged = True
+            await self.send({'type': 'connection_ack'})
+        elif message_type == 'ping':
+            await self.send({'type': 'pong'})
+        elif message_type == 'pong':
+            pass
+        elif message_type == 'subscribe':
+            if not self.acknowledged:
+                await self.close(4401, "Unauthorized")
+                return False
+            operation_id = message.get('id')
+            if operation_id in self.operations:
+                await self.close(4409, f"Subscriber for {operation_id} already exists")
+                return False
+            task = asyncio.ensure_future(self.subscribe(operation_id, message.get('payload') or {}))
+            self.operations[operation_id] = task
+            task.add_done_callback(partial(self.forget, operation_id))
+        elif message_type == 'complete':
+            task = self.operations.pop(message.get('id'), None)
+            if task is not None:
+                task.cancel()
+        else:
+            await self.close(4400, f"Unexpected message type {message_type}")
+            return False
+        return True
+
+    def forget(self, operation_id, task):
+        """Drop a finished operation, unless its ID was already reused."""
+        if self.operations.get(operation_id) is task:
+            del self.operations[operation_id]
+
+    async def subscribe(self, operation_id, payload: dict):
+        """Run one subscription, reporting unexpected failures to the client."""
+        try:
+            await self.run_subscription(operation_id, payload)
+        except Exception:
+            logger.exception("Subscription %s failed", operation_id)
+            await self.send_errors(operation_id, [GraphQLError("Internal server error")])
+
+    async def run_subscription(self, operation_id, payload: dict):
+        """Run one subscription until its stream ends or the client completes it."""
+        schema = self.app.schema.graphql_schema
+        variables = payload.get('variables') or {}
+        operation_name = payload.get('operationName')
+
+        try:
+            cached = get_document_cache().get(
+                schema, payload.get('query') or '', max_errors=graphene_settings.MAX_VALIDATION_ERRORS
+            )
+        except GraphQLError as error:
+            await self.send_errors(operation_id, [error])
+            return
+        if cached.errors:
+            await self.send_errors(operation_id, cached.errors)
+            return
+
+        operation_ast = get_operation_ast(cached.document, operation_name)
+        if operation_ast is None or operation_ast.operation != OperationType.SUBSCRIPTION:
+            await self.send_errors(operation_id, [GraphQLError(
+                "Only subscriptions are served over WebSocket; send queries and "
+                "mutations to POST /graphql/"
+            )])
+            return
+        try:
+            check_cost(CostAnalyzer(schema, cached.document, operation_ast, variables))
+        except QueryTooComplexError as error:
+            await self.send_errors(operation_id, [error])
+            return
+
+        stream = await create_source_event_stream(
+            schema, cached.document, None, self.context(), variables, operation_name
+        )
+        if isinstance(stream, ExecutionResult):
+            await self.send_errors(operation_id, stream.errors)
+            return
+
+        try:
+            async for event in stream:
+                result = await self.execute_event(cached.document, event, variables, operation_name)
+                await self.send({
+                    'id': operation_id,
+                    'type': 'next',
+                    'payload': result.formatted,
+                })
+        finally:
+            await stream.aclose()
+        await self.send({'id': operation_id, 'type': 'complete'})
+
+    def context(self):
+        """A fresh resolver context for the connection."""
+        return SubscriptionContext(scope=self.scope, graphql_async=True)
+
+    async def execute_event(self, document, event, variables, operation_name):
+        """Execute the subscription's selection set for one published event."""
+        await sync_to_async(close_old_connections)()
+        result = execute(
+            self.app.schema.graphql_schema,
+            document,
+            root_value=event,
+            context_value=self.context(),
+            variable_values=variables,
+            operation_name=operation_name,
+            middleware=self.app.middleware,
+        )
+        if isawaitable(result):
+            result = await result
+        return result
+
+    async def send_errors(self, operation_id, errors):
+        await self.send({
+            'id': operation_id,
+            'type': 'error',
+            'payload': [error.formatted for error in errors],
+        })
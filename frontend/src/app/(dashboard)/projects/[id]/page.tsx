@@ -37,7 +37,11 @@ export default function ProjectDetailPage({
   });
 
   const [deleteTask, { loading: deleting }] = useMutation(DELETE_TASK, {
-    refetchQueries: [{ query: GET_PROJECT, variables: { id: projectId } }],
+    update(cache, { data }, { variables }) {
+      if (!data?.deleteTask?.success || !variables) return;
+      cache.evict({ id: cache.identify({ __typename: "TaskType", id: String(variables.id) }) });
+      cache.gc();
+    },
   });
 
   if (loading) return <LoadingPage />;
@@ -5,7 +5,6 @@ import { useMutation } from "@apollo/client";
 import { Input, Textarea, Select } from "@/components/ui/Input";
 import { Button } from "@/components/ui/Button";
 import { CREATE_TASK, UPDATE_TASK } from "@/graphql/mutations";
-import { GET_TASKS_BY_PROJECT, GET_PROJECT } from "@/graphql/queries";
 import { Task } from "@/graphql/types";
 
 interface TaskFormProps {
@@ -32,19 +31,25 @@ export function TaskForm({
 
   const [errors, setErrors] = useState<{ [key: string]: string }>({});
 
+  // The payload carries the project's new counts; only list membership
+  // has to be patched into the cache by hand
   const [createTask, { loading: creating }] = useMutation(CREATE_TASK, {
-    refetchQueries: [
-      { query: GET_TASKS_BY_PROJECT, variables: { projectId } },
-      { query: GET_PROJECT, variables: { id: projectId } },
-    ],
+    update(cache, { data }) {
+      const created = data?.createTask?.task;
+      if (!created) return;
+      const ref = { __ref: cache.identify(created) as string };
+      cache.modify({
+        id: cache.identify({ __typename: "ProjectType", id: String(projectId) }),
+        fields: {
+          // Tasks are listed newest first
+          tasks: (existing = []) => [ref, ...existing],
+        },
+      });
+      cache.evict({ fieldName: "tasksByProject", args: { projectId } });
+    },
   });
 
-  const [updateTask, { loading: updating }] = useMutation(UPDATE_TASK, {
-    refetchQueries: [
-      { query: GET_TASKS_BY_PROJECT, variables: { projectId } },
-      { query: GET_PROJECT, variables: { id: projectId } },
-    ],
-  });
+  const [updateTask, { loading: updating }] = useMutation(UPDATE_TASK);
 
   const loading = creating || updating;
 
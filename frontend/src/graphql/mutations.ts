@@ -121,6 +121,10 @@ export const DELETE_PROJECT = gql`
 `;
 
 // Task Mutations
+// Task mutations return their project's updated counts, so the cached
+// project refreshes without a refetch. The selection is repeated inline
+// rather than shared through an interpolated fragment, which would keep
+// these documents out of the persisted-query manifest.
 export const CREATE_TASK = gql`
   mutation CreateTask(
     $projectId: Int!
@@ -152,6 +156,22 @@ export const CREATE_TASK = gql`
         priority
         assigneeEmail
         dueDate
+        commentCount
+        createdAt
+        comments {
+          id
+          content
+          authorEmail
+          createdAt
+        }
+      }
+      project {
+        id
+        taskCount
+        completedTasks
+        inProgressTasks
+        todoTasks
+        completionRate
       }
     }
   }
@@ -191,6 +211,14 @@ export const UPDATE_TASK = gql`
         assigneeEmail
         dueDate
       }
+      project {
+        id
+        taskCount
+        completedTasks
+        inProgressTasks
+        todoTasks
+        completionRate
+      }
     }
   }
 `;
@@ -200,6 +228,14 @@ export const DELETE_TASK = gql`
     deleteTask(id: $id, organizationId: $organizationId) {
       success
       message
+      project {
+        id
+        taskCount
+        completedTasks
+        inProgressTasks
+        todoTasks
+        completionRate
+      }
     }
   }
 `;